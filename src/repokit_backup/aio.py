@@ -0,0 +1,531 @@
+"""
+Asyncio API - Coroutine push, pull, diff, ls and transfer for embedding.
+
+``push_rclone``/``pull_rclone`` change the process working directory, set
+``RCLONE_CONFIG`` and block while rclone runs, so a service that manages many
+projects cannot call them from an event loop. The coroutines here take an
+explicit ``project_root`` instead: the project's rclone executable, config,
+registry and filter files are passed by absolute path, and the process cwd and
+environment are never modified. Calls for different projects can therefore run
+concurrently in one loop.
+
+rclone runs as an asyncio subprocess. Cancelling a coroutine terminates the
+rclone child (SIGTERM, then SIGKILL after ``CANCEL_GRACE`` seconds), waits for
+it to exit, records a failed status and re-raises ``CancelledError``.
+
+The coroutines cover the non-interactive transfer path: mappings and pins,
+push policies, ignore patterns, nested-remote excludes, tuning profiles,
+bandwidth limits and versioning. Interactive selection, VCS commits, journals, manifests,
+bundling, sharding and the rcd executor remain features of the CLI. Remotes
+that bundle small files or use the snapshot storage layout are refused, since
+a plain transfer would delete or copy the raw bundles or chunk store, and a
+push drops the remote's manifests and journals so the next CLI push compares
+the trees in full.
+"""
+
+import asyncio
+import os
+import pathlib
+import shutil
+import subprocess
+from typing import Callable
+
+from . import bundle, filters, journal, manifest, snapshots, tuning, versions
+from .paths import safe_name
+from .progress import JSON_STATS_ARGS, ProgressPrinter, StatsTracker, TransferResult
+from .rclone import (
+    _is_ucloud_remote,
+    _list_target_path,
+    _nested_remote_excludes,
+    _normalize_explicit_remote_path,
+    _normalize_search_pattern,
+    _rc_verbose_args,
+    _remote_name_from_uri,
+    _remote_root,
+)
+from .registry import load_all_registry, load_registry, update_sync_status
+
+# Seconds between terminating a cancelled rclone child and killing it.
+CANCEL_GRACE = 10.0
+LIST_TIMEOUT = 600
+
+
+def _root(project_root: str | os.PathLike[str]) -> pathlib.Path:
+    return pathlib.Path(project_root).expanduser().resolve()
+
+
+def _registry_path(root: pathlib.Path) -> str:
+    return str(root / "bin" / "rclone_remote.json")
+
+
+def _rclone_executable(root: pathlib.Path) -> str | None:
+    """The project's installed rclone (``bin/rclone-*/``), else rclone on PATH."""
+    for candidate in sorted((root / "bin").glob("rclone-*/rclone*"), reverse=True):
+        if candidate.is_file() and candidate.stem == "rclone":
+            return str(candidate)
+    return shutil.which("rclone")
+
+
+def _config_args(root: pathlib.Path, registry: dict, *endpoints: str) -> list[str] | None:
+    """``--config`` for the project; None when a UCloud config is required but missing."""
+    if any(_is_ucloud_remote(_remote_name_from_uri(str(e)), registry) for e in endpoints):
+        rclone_conf = root / "bin" / "rclone_ucloud.conf"
+        if not rclone_conf.exists():
+            print(f"[WARN] UCloud rclone config not found in {rclone_conf.parent}.")
+            return None
+    else:
+        rclone_conf = root / "bin" / "rclone.conf"
+    return ["--config", str(rclone_conf)]
+
+
+def _resolve_local(root: pathlib.Path, path: str | None) -> str | None:
+    if not path:
+        return None
+    local = pathlib.Path(path).expanduser()
+    return str(local if local.is_absolute() else (root / local).resolve())
+
+
+def _push_policy(meta) -> str:
+    if isinstance(meta, dict):
+        return str(meta.get("push_policy", "full")).strip().lower()
+    return "full"
+
+
+def requires_cli(meta) -> str | None:
+    """Why a remote can only be transferred by the CLI, or None when it can run here."""
+    if bundle.bundle_settings(meta) is not None:
+        return "bundled remote"
+    if snapshots.snapshot_layout(meta):
+        return "snapshot storage layout"
+    return None
+
+
+def _forget_push_state(root: pathlib.Path, remote_name: str) -> None:
+    """Drop the CLI's manifests and journals of a remote this module pushed to."""
+    name = safe_name(remote_name)
+    for directory in (manifest.MANIFEST_DIR, journal.JOURNAL_DIR):
+        for path in (root / directory).glob(f"{name}.*"):
+            path.unlink(missing_ok=True)
+
+
+def _ignore_patterns(root: pathlib.Path, local_path: str) -> list[str]:
+    """``[tool.rcloneignore]`` patterns when ``local_path`` is the project root."""
+    if pathlib.Path(local_path).resolve() != root:
+        return []
+    from repokit_common import toml_ignore
+
+    _, exclude_patterns = toml_ignore(
+        folder=local_path,
+        toml_path=str(root / "pyproject.toml"),
+        ignore_filename=".rcloneignore",
+        tool_name="rcloneignore",
+        toml_key="patterns",
+    )
+    return exclude_patterns
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    """Stop an rclone child: SIGTERM, then SIGKILL after ``CANCEL_GRACE``."""
+    if process.returncode is not None:
+        return
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), CANCEL_GRACE)
+    except ProcessLookupError:
+        pass
+    except (asyncio.TimeoutError, TimeoutError):
+        process.kill()
+        await process.wait()
+
+
+async def _run(
+    command: list[str],
+    cwd: pathlib.Path,
+    timeout: float | None = None,
+    on_stderr: Callable[[str], object] | None = None,
+    ok_codes: tuple[int, ...] = (0,),
+) -> str:
+    """
+    Run rclone and return its stdout. stderr lines go to ``on_stderr``.
+
+    Raises:
+        subprocess.CalledProcessError: On an exit code outside ``ok_codes``.
+        asyncio.TimeoutError: When ``timeout`` elapsed; the child is stopped.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=str(cwd),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    errors: list[str] = []
+
+    async def pump_stderr() -> None:
+        async for raw in process.stderr:
+            line = raw.decode("utf-8", errors="replace")
+            if on_stderr is not None:
+                on_stderr(line)
+            else:
+                errors.append(line)
+
+    try:
+        stdout, _, _ = await asyncio.wait_for(
+            asyncio.gather(process.stdout.read(), pump_stderr(), process.wait()), timeout
+        )
+    except BaseException:
+        # Cancellation or timeout: never leave rclone running on its own.
+        await _terminate(process)
+        raise
+    if process.returncode not in ok_codes:
+        raise subprocess.CalledProcessError(
+            process.returncode, command, output=stdout, stderr="".join(errors[-20:])
+        )
+    return stdout.decode("utf-8", errors="replace")
+
+
+async def _transfer(
+    root: pathlib.Path,
+    registry: dict,
+    remote_name: str,
+    src: str,
+    dst: str,
+    action: str,
+    operation: str,
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+    dry_run: bool = False,
+    verbose: int = 0,
+    transfer_timeout: float | None = None,
+    bwlimit: str | None = None,
+    backup_dir: str | None = None,
+) -> TransferResult:
+    """Run one rclone transfer for ``root`` and record its status in the registry."""
+    executable = _rclone_executable(root)
+    if executable is None:
+        print(f"Error: rclone is not installed for '{root}'; run 'repokit-backup init' there.")
+        return TransferResult(ok=False)
+    config_args = _config_args(root, registry, remote_name, src, dst)
+    if config_args is None:
+        return TransferResult(ok=False)
+    endpoints = tuning.endpoint_profiles(
+        [_remote_name_from_uri(src), _remote_name_from_uri(dst)], registry
+    )
+    # A plain transfer must never touch a snapshot chunk store.
+    store_exclude = [f"/{snapshots.STORE_ROOT}/**"]
+    rules = filters.compile_rules(include_patterns, store_exclude + list(exclude_patterns or []))
+    filter_file = filters.write_filter_file(
+        rules, f"{remote_name}.aio", directory=str(root / "bin" / "filters")
+    )
+    command = (
+        [executable, operation, src, dst]
+        + _rc_verbose_args(verbose)
+        + JSON_STATS_ARGS
+        + tuning.transfer_args(endpoints, {"bwlimit": bwlimit} if bwlimit else {})
+        + (["--filter-from", str(filter_file)] if filter_file is not None else [])
+        + config_args
+    )
+    if backup_dir is not None:
+        command += ["--backup-dir", backup_dir]
+    if dry_run:
+        command.append("--dry-run")
+
+    tracker = StatsTracker(printer=ProgressPrinter(label=remote_name), verbose=verbose)
+    try:
+        await _run(command, root, timeout=transfer_timeout, on_stderr=tracker.feed)
+        result = tracker.result(ok=True)
+        print(f"Transfer '{src}' -> '{dst}' completed ({result.summary()}).")
+    except asyncio.CancelledError:
+        result = tracker.result(ok=False)
+        print(f"Transfer '{src}' -> '{dst}' cancelled; rclone stopped.")
+        _record(root, remote_name, action, operation, result)
+        raise
+    except (asyncio.TimeoutError, TimeoutError):
+        result = tracker.result(ok=False)
+        print(
+            f"Transfer '{src}' -> '{dst}' exceeded the configured total transfer timeout "
+            f"of {transfer_timeout:g} seconds."
+        )
+    except (subprocess.CalledProcessError, OSError) as exc:
+        result = tracker.result(ok=False)
+        print(f"Failed to {operation} transfer '{src}' -> '{dst}': {exc}")
+    _record(root, remote_name, action, operation, result)
+    return result
+
+
+def _record(
+    root: pathlib.Path, remote_name: str, action: str, operation: str, result: TransferResult
+) -> None:
+    update_sync_status(
+        remote_name,
+        action=action,
+        operation=operation,
+        success=result.ok,
+        json_path=_registry_path(root),
+        result=result.to_dict(),
+    )
+
+
+async def push(
+    project_root: str | os.PathLike[str],
+    remote_name: str,
+    operation: str = "sync",
+    local_path: str | None = None,
+    remote_path: str | None = None,
+    include_patterns: list[str] | None = None,
+    dry_run: bool = False,
+    verbose: int = 0,
+    transfer_timeout: float | None = None,
+    bwlimit: str | None = None,
+) -> TransferResult:
+    """
+    Push a remote's mapped local folder of ``project_root``; see ``push_rclone``.
+
+    ``local_path`` and ``remote_path`` override the mapping;
+    ``include_patterns`` restricts the push like ``--search``/``--select``.
+    """
+    root = _root(project_root)
+    remote_key = (remote_name or "").strip().lower()
+    operation = operation.lower().strip()
+    if operation not in {"sync", "copy", "move"}:
+        print("Error: 'operation' must be either 'sync', 'copy', or 'move'")
+        return TransferResult(ok=False)
+    registry = load_all_registry(_registry_path(root))
+    meta = registry.get(remote_key)
+    push_policy = _push_policy(meta)
+    if push_policy == "pull-only":
+        print(f"Skipping '{remote_key}': push policy is pull-only.")
+        return TransferResult(ok=False)
+    if push_policy == "append-only" and operation in {"sync", "move"}:
+        print(f"Skipping '{remote_key}': push policy is append-only; use copy.")
+        return TransferResult(ok=False)
+    reason = requires_cli(meta)
+    if reason:
+        print(f"Skipping '{remote_key}': {reason}; use 'repokit-backup push'.")
+        return TransferResult(ok=False)
+
+    saved_remote, saved_local = load_registry(remote_key, _registry_path(root))
+    source = _resolve_local(root, local_path or saved_local)
+    target = _normalize_explicit_remote_path(remote_key, remote_path) or saved_remote
+    if not target or not source:
+        print(f"Remote '{remote_key}' needs a remote path and a local source to push.")
+        return TransferResult(ok=False)
+    if not os.path.exists(source):
+        print(f"Error: The folder '{source}' does not exist.")
+        return TransferResult(ok=False)
+    backup_dir = None
+    if versions.versioning_enabled(meta):
+        backup_dir = versions.backup_dir(target, target, versions.new_stamp())
+        if backup_dir is None:
+            print(f"Skipping '{remote_key}': versioning needs a remote path below the root.")
+            return TransferResult(ok=False)
+    excludes = _ignore_patterns(root, source) + _nested_remote_excludes(
+        remote_key, source, registry, root
+    )
+    try:
+        return await _transfer(
+            root,
+            registry,
+            remote_key,
+            source,
+            target,
+            action="push",
+            operation=operation,
+            include_patterns=include_patterns,
+            exclude_patterns=sorted(set(excludes)),
+            dry_run=dry_run,
+            verbose=verbose,
+            transfer_timeout=transfer_timeout,
+            bwlimit=bwlimit,
+            backup_dir=backup_dir,
+        )
+    finally:
+        if not dry_run:
+            # The destination changed outside the manifest's view.
+            _forget_push_state(root, remote_key)
+
+
+async def pull(
+    project_root: str | os.PathLike[str],
+    remote_name: str,
+    operation: str = "sync",
+    local_path: str | None = None,
+    remote_path: str | None = None,
+    include_patterns: list[str] | None = None,
+    dry_run: bool = False,
+    verbose: int = 0,
+    transfer_timeout: float | None = None,
+    bwlimit: str | None = None,
+) -> TransferResult:
+    """Pull a remote into its mapped folder of ``project_root``; see ``pull_rclone``."""
+    root = _root(project_root)
+    remote_key = (remote_name or "").strip().lower()
+    operation = operation.lower().strip()
+    if operation not in {"sync", "copy", "move"}:
+        print("Error: 'operation' must be either 'sync', 'copy', or 'move'")
+        return TransferResult(ok=False)
+    registry = load_all_registry(_registry_path(root))
+    meta = registry.get(remote_key)
+    push_policy = _push_policy(meta)
+    if push_policy in {"append-only", "pull-only"} and operation in {"sync", "move"}:
+        print(f"Policy '{push_policy}' only allows pull operation 'copy'; using copy.")
+        operation = "copy"
+    reason = requires_cli(meta)
+    if reason:
+        print(f"Skipping '{remote_key}': {reason}; use 'repokit-backup pull'.")
+        return TransferResult(ok=False)
+
+    saved_remote, saved_local = load_registry(remote_key, _registry_path(root))
+    if not (saved_remote and saved_local) and not local_path:
+        print(f"Remote '{remote_key}' has no saved mapping with a local path; pass local_path.")
+        return TransferResult(ok=False)
+    source = (
+        _normalize_explicit_remote_path(remote_key, remote_path)
+        or saved_remote
+        or _remote_root(remote_key)
+    )
+    destination = _resolve_local(root, local_path or saved_local)
+    try:
+        os.makedirs(destination, exist_ok=True)
+    except OSError as exc:
+        print(f"Error: Could not create pull destination '{destination}': {exc}")
+        return TransferResult(ok=False)
+    excludes = _ignore_patterns(root, destination) + _nested_remote_excludes(
+        remote_key, destination, registry, root
+    )
+    return await _transfer(
+        root,
+        registry,
+        remote_key,
+        source,
+        destination,
+        action="pull",
+        operation=operation,
+        include_patterns=include_patterns,
+        exclude_patterns=sorted(set(excludes)),
+        dry_run=dry_run,
+        verbose=verbose,
+        transfer_timeout=transfer_timeout,
+        bwlimit=bwlimit,
+    )
+
+
+async def transfer(
+    project_root: str | os.PathLike[str],
+    source_remote: str,
+    dest_remote: str,
+    operation: str = "copy",
+    dry_run: bool = True,
+    verbose: int = 0,
+    transfer_timeout: float | None = None,
+    bwlimit: str | None = None,
+) -> TransferResult:
+    """Transfer between two remotes mapped to the same folder; see ``transfer_between_remotes``."""
+    root = _root(project_root)
+    registry = load_all_registry(_registry_path(root))
+    source_key, dest_key = source_remote.strip().lower(), dest_remote.strip().lower()
+    src_meta, dst_meta = registry.get(source_key), registry.get(dest_key)
+    if not isinstance(src_meta, dict) or not isinstance(dst_meta, dict):
+        print(f"Error: One or both remotes not registered: {source_key}, {dest_key}")
+        return TransferResult(ok=False)
+    src_local = _resolve_local(root, src_meta.get("local_path"))
+    if not src_local or src_local != _resolve_local(root, dst_meta.get("local_path")):
+        print("Error: Both remotes must map the same local path.")
+        return TransferResult(ok=False)
+    if not src_meta.get("remote_path") or not dst_meta.get("remote_path"):
+        print("Error: One or both remotes do not have remote paths configured.")
+        return TransferResult(ok=False)
+    if operation not in {"copy", "sync"}:
+        print("Error: Only 'copy' or 'sync' operations are allowed for remote-to-remote transfers.")
+        return TransferResult(ok=False)
+    for key, meta in ((source_key, src_meta), (dest_key, dst_meta)):
+        reason = requires_cli(meta)
+        if reason:
+            print(f"Error: '{key}' cannot be transferred here: {reason}.")
+            return TransferResult(ok=False)
+    return await _transfer(
+        root,
+        registry,
+        f"{source_key}->{dest_key}",
+        src_meta["remote_path"],
+        dst_meta["remote_path"],
+        action="transfer",
+        operation=operation,
+        exclude_patterns=_ignore_patterns(root, src_local),
+        dry_run=dry_run,
+        verbose=verbose,
+        transfer_timeout=transfer_timeout,
+        bwlimit=bwlimit,
+    )
+
+
+async def ls(
+    project_root: str | os.PathLike[str],
+    remote_name: str,
+    sub_path: str = "",
+    search_pattern: str | None = None,
+) -> list[str] | None:
+    """List (or search) a remote path; directories end in ``/``. None on failure."""
+    root = _root(project_root)
+    remote_key = (remote_name or "").strip().lower()
+    executable = _rclone_executable(root)
+    registry = load_all_registry(_registry_path(root))
+    remote_path, _ = load_registry(remote_key, _registry_path(root))
+    target = _list_target_path(remote_key, remote_path, sub_path)
+    normalized_search, anchored_to_root = _normalize_search_pattern(search_pattern)
+    if normalized_search:
+        target = _remote_root(remote_key) if anchored_to_root else target
+        command = [executable, "lsf", target, "--recursive", "--include", normalized_search]
+    else:
+        command = [executable, "lsf", target, "--max-depth", "1"]
+    config_args = _config_args(root, registry, remote_key, target)
+    if executable is None or config_args is None:
+        print(f"Error: rclone or its config is not available for '{root}'.")
+        return None
+    try:
+        output = await _run(command + config_args, root, timeout=LIST_TIMEOUT)
+    except (subprocess.CalledProcessError, OSError, asyncio.TimeoutError, TimeoutError) as exc:
+        print(f"Failed to list remote entries at '{target}': {exc}")
+        return None
+    return [line.strip() for line in output.splitlines() if line.strip()]
+
+
+async def diff(project_root: str | os.PathLike[str], remote_name: str) -> list[str] | None:
+    """
+    Compare a mapping with ``rclone check --combined``. Returns the differing
+    lines (``+`` local only, ``-`` remote only, ``*`` differ, ``!`` error);
+    an empty list means identical. None on failure.
+    """
+    root = _root(project_root)
+    remote_key = (remote_name or "").strip().lower()
+    executable = _rclone_executable(root)
+    registry = load_all_registry(_registry_path(root))
+    remote_path, local_path = load_registry(remote_key, _registry_path(root))
+    local_path = _resolve_local(root, local_path)
+    if not remote_path or not local_path:
+        print(f"No path found for remote '{remote_key}'.")
+        return None
+    config_args = _config_args(root, registry, remote_key, remote_path)
+    if executable is None or config_args is None:
+        print(f"Error: rclone or its config is not available for '{root}'.")
+        return None
+    excludes = _ignore_patterns(root, local_path) + _nested_remote_excludes(
+        remote_key, local_path, registry, root
+    )
+    filter_file = filters.write_filter_file(
+        filters.compile_rules(None, excludes),
+        f"{remote_key}.diff",
+        directory=str(root / "bin" / "filters"),
+    )
+    command = (
+        [executable, "check", local_path, remote_path, "--combined", "-"]
+        + (["--filter-from", str(filter_file)] if filter_file is not None else [])
+        + config_args
+    )
+    try:
+        # rclone check exits 1 when the trees differ.
+        output = await _run(command, root, timeout=LIST_TIMEOUT, ok_codes=(0, 1))
+    except (subprocess.CalledProcessError, OSError, asyncio.TimeoutError, TimeoutError) as exc:
+        print(f"Failed to generate diff report: {exc}")
+        return None
+    return [line for line in output.splitlines() if line and not line.startswith("= ")]
@@ -0,0 +1,232 @@
+"""
+Throughput auto-tuner - Measure rclone settings against a live remote.
+
+A synthetic probe dataset (many small files plus a few large ones) is uploaded
+to and downloaded from a scratch prefix under the remote's mapped
+``remote_path``. Concurrency is swept first, then the backend chunk size with
+the best concurrency held fixed, so the number of trials grows linearly rather
+than with the product of both sweeps. The fastest settings are stored as the
+remote's tuning overrides and the scratch prefix is purged afterwards.
+"""
+
+import os
+import pathlib
+import secrets
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from .progress import format_bytes
+from .rclone import _ucloud_config_args
+from .registry import load_all_registry
+from .remote_types import get_base_remote_type
+from .tuning import CHUNK_SIZE_TYPES, configure_tuning, remote_profile, transfer_args
+
+SCRATCH_PREFIX = ".repokit-autotune"
+DEFAULT_TRANSFERS = (2, 4, 8, 16, 32)
+CHUNK_CANDIDATES: dict[str, tuple[str, ...]] = {
+    "s3": ("16M", "64M", "128M"),
+    "sftp": ("32k", "128k", "255k"),
+    "dropbox": ("16M", "64M", "128M"),
+    # OneDrive fragments must be multiples of 320 KiB.
+    "onedrive": ("5M", "10M", "20M"),
+    "drive": ("16M", "64M", "128M"),
+}
+# Rate limits would cap every trial alike and hide the differences measured.
+LIMITER_KEYS = ("bwlimit", "tpslimit")
+SMALL_FILE_COUNT = 64
+SMALL_FILE_SIZE = 64 * 1024
+LARGE_FILE_COUNT = 2
+LARGE_FILE_SIZE = 32 * 1024 * 1024
+
+Runner = Callable[[list[str]], None]
+
+
+@dataclass
+class Trial:
+    """One measured configuration; ``rate`` is bytes/s over upload and download."""
+
+    settings: dict
+    upload: float = 0.0
+    download: float = 0.0
+    rate: float = 0.0
+    error: str | None = None
+
+
+def _run_rclone(command: list[str]) -> None:
+    subprocess.run(command, check=True, capture_output=True, text=True)
+
+
+def write_probe_dataset(
+    target: pathlib.Path,
+    small_files: int = SMALL_FILE_COUNT,
+    small_size: int = SMALL_FILE_SIZE,
+    large_files: int = LARGE_FILE_COUNT,
+    large_size: int = LARGE_FILE_SIZE,
+) -> int:
+    """Write incompressible probe files under ``target`` and return their total size."""
+    (target / "small").mkdir(parents=True, exist_ok=True)
+    (target / "large").mkdir(parents=True, exist_ok=True)
+    total = 0
+    for index in range(small_files):
+        (target / "small" / f"probe-{index:04d}.bin").write_bytes(os.urandom(small_size))
+        total += small_size
+    block = 4 * 1024 * 1024
+    for index in range(large_files):
+        with open(target / "large" / f"probe-{index:02d}.bin", "wb") as handle:
+            remaining = large_size
+            while remaining > 0:
+                step = min(block, remaining)
+                handle.write(os.urandom(step))
+                remaining -= step
+        total += large_size
+    return total
+
+
+def _scratch_path(remote_path: str, token: str) -> str:
+    prefix, _sep, tail = remote_path.partition(":")
+    tail = tail.rstrip("/")
+    name = f"{SCRATCH_PREFIX}-{token}"
+    return f"{prefix}:{tail}/{name}" if tail else f"{prefix}:{name}"
+
+
+def _candidates(backend: str, base: dict, transfers: tuple[int, ...]) -> tuple[list, list]:
+    transfer_sweep = [
+        {"transfers": count, "checkers": max(count * 2, 8)} for count in sorted(set(transfers))
+    ]
+    rclone_type = get_base_remote_type(backend)
+    chunk_sweep = (
+        [{"chunk_size": size} for size in CHUNK_CANDIDATES[rclone_type]]
+        if rclone_type in CHUNK_SIZE_TYPES and "chunk_size" in base
+        else []
+    )
+    return transfer_sweep, chunk_sweep
+
+
+def _measure(
+    runner: Runner,
+    backend: str,
+    profile: dict,
+    probe_dir: pathlib.Path,
+    scratch: str,
+    trial_name: str,
+    probe_bytes: int,
+    config_args: list[str],
+) -> Trial:
+    trial = Trial(settings=dict(profile))
+    remote_dir = f"{scratch}/{trial_name}"
+    flags = transfer_args([(backend, profile)]) + config_args
+    with tempfile.TemporaryDirectory(prefix="repokit-autotune-") as download_dir:
+        try:
+            started = time.monotonic()
+            runner(["rclone", "copy", str(probe_dir), remote_dir] + flags)
+            trial.upload = time.monotonic() - started
+            started = time.monotonic()
+            runner(["rclone", "copy", remote_dir, download_dir] + flags)
+            trial.download = time.monotonic() - started
+        except (subprocess.CalledProcessError, OSError) as exc:
+            trial.error = str(exc)
+            return trial
+    elapsed = trial.upload + trial.download
+    trial.rate = (2 * probe_bytes) / elapsed if elapsed > 0 else 0.0
+    return trial
+
+
+def autotune_remote(
+    remote_name: str,
+    transfers: tuple[int, ...] = DEFAULT_TRANSFERS,
+    probe_dir: str | os.PathLike[str] | None = None,
+    apply: bool = True,
+    runner: Runner | None = None,
+    json_path: str = "./bin/rclone_remote.json",
+) -> dict | None:
+    """
+    Sweep transfer settings against a remote and store the fastest.
+
+    Args:
+        remote_name: Registered remote with a mapped ``remote_path``
+        transfers: Concurrency levels to try (checkers follow as 2x)
+        probe_dir: Existing directory to use as the probe dataset; a synthetic
+            dataset is generated when omitted
+        apply: Write the winning settings into the registry entry
+        runner: Callable executing one rclone command; raises
+            ``subprocess.CalledProcessError`` on failure
+
+    Returns:
+        The winning settings, or None if the remote could not be tuned.
+    """
+    runner = runner or _run_rclone
+    registry = load_all_registry(json_path)
+    key = (remote_name or "").strip().lower()
+    meta = registry.get(key)
+    if not isinstance(meta, dict):
+        print(f"Remote '{remote_name}' not found in registry.")
+        return None
+    remote_path = meta.get("remote_path")
+    if not remote_path:
+        print(f"Remote '{key}' has no mapped remote path; map or pin one before autotuning.")
+        return None
+
+    backend, profile = remote_profile(key, registry)
+    base = {name: value for name, value in profile.items() if name not in LIMITER_KEYS}
+    config_args = _ucloud_config_args(registry, key)
+    if config_args is None:
+        return None
+
+    scratch = _scratch_path(remote_path, secrets.token_hex(4))
+    transfer_sweep, chunk_sweep = _candidates(backend, base, tuple(transfers))
+    trials: list[Trial] = []
+    with tempfile.TemporaryDirectory(prefix="repokit-probe-") as generated:
+        if probe_dir is not None:
+            probe_path = pathlib.Path(probe_dir).resolve()
+            probe_bytes = sum(p.stat().st_size for p in probe_path.rglob("*") if p.is_file())
+        else:
+            probe_path = pathlib.Path(generated)
+            probe_bytes = write_probe_dataset(probe_path)
+        print(
+            f"Autotuning '{key}' ({backend}) with {format_bytes(probe_bytes)} probe data "
+            f"in {scratch}"
+        )
+        try:
+            best = dict(base)
+            for stage in (transfer_sweep, chunk_sweep):
+                stage_trials = []
+                for candidate in stage:
+                    profile = {**best, **candidate}
+                    trial = _measure(
+                        runner,
+                        backend,
+                        profile,
+                        probe_path,
+                        scratch,
+                        f"trial-{len(trials):02d}",
+                        probe_bytes,
+                        config_args,
+                    )
+                    trials.append(trial)
+                    stage_trials.append(trial)
+                    label = ", ".join(f"{name}={value}" for name, value in candidate.items())
+                    if trial.error:
+                        print(f"  {label}: failed ({trial.error})")
+                    else:
+                        print(f"  {label}: {format_bytes(trial.rate)}/s")
+                succeeded = [trial for trial in stage_trials if not trial.error]
+                if succeeded:
+                    best = max(succeeded, key=lambda trial: trial.rate).settings
+        finally:
+            try:
+                runner(["rclone", "purge", scratch] + config_args)
+            except (subprocess.CalledProcessError, OSError) as exc:
+                print(f"[WARN] Could not remove autotune scratch data at {scratch}: {exc}")
+
+    if not any(not trial.error for trial in trials):
+        print(f"Autotune failed for '{key}': no trial completed.")
+        return None
+
+    winner = {name: best[name] for name in ("transfers", "checkers", "chunk_size") if name in best}
+    print(f"Best settings for '{key}': {', '.join(f'{k}={v}' for k, v in winner.items())}")
+    if apply and not configure_tuning(key, updates=winner, json_path=json_path):
+        return None
+    return winner
@@ -0,0 +1,167 @@
+"""
+Batch runs - Push every remote of many project roots under one budget.
+
+``repokit-backup batch --roots-file roots.txt`` reads one project root per
+line, loads each root's ``bin/rclone_remote.json`` and plans a push for every
+mapped remote. All pushes share one scheduler: at most ``--jobs`` run at once
+across projects, with the usual per-backend caps. The pushes use the asyncio
+API (``aio.push``), which works from an explicit project root, so no process
+changes directory and rclone is not re-verified per project. A consolidated
+JSON report lists every push, its stats and every skipped remote.
+"""
+
+import asyncio
+import json
+import pathlib
+import time
+from datetime import datetime
+
+from . import aio
+from .rclone import _remote_backend
+from .registry import load_all_registry
+from .scheduler import Job, print_summary, resolve_backend_limits, run_jobs
+
+
+def read_roots(roots_file: str | pathlib.Path) -> list[pathlib.Path]:
+    """
+    Read project roots, one per line; blank lines and ``#`` comments are
+    skipped and relative paths are resolved against the file's directory.
+    """
+    path = pathlib.Path(roots_file).expanduser()
+    roots: list[pathlib.Path] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        text = line.split("#", 1)[0].strip()
+        if not text:
+            continue
+        root = pathlib.Path(text).expanduser()
+        root = (root if root.is_absolute() else path.parent / root).resolve()
+        if root not in roots:
+            roots.append(root)
+    return roots
+
+
+def plan_batch(
+    roots: list[pathlib.Path], operation: str = "sync", **push_kwargs
+) -> tuple[list[tuple[pathlib.Path, str, Job]], list[dict]]:
+    """
+    One push job per mapped remote of every root; returns ``(planned, skipped)``.
+
+    Remotes without a full mapping or whose push policy forbids ``operation``
+    are skipped with a reason, as ``push --remote all`` does, and so are
+    remotes only the CLI can push (``aio.requires_cli``).
+    """
+    planned: list[tuple[pathlib.Path, str, Job]] = []
+    skipped: list[dict] = []
+    for root in roots:
+        registry = load_all_registry(str(root / "bin" / "rclone_remote.json"))
+        if not registry:
+            skipped.append({"root": str(root), "remote": None, "reason": "no registry"})
+            continue
+        for remote, meta in registry.items():
+            meta = meta if isinstance(meta, dict) else {}
+            policy = str(meta.get("push_policy", "full")).strip().lower()
+            reason = None
+            if not meta.get("remote_path") or not meta.get("local_path"):
+                reason = "no full mapping"
+            elif policy == "pull-only":
+                reason = "pull-only policy"
+            elif policy == "append-only" and operation in {"sync", "move"}:
+                reason = f"append-only policy forbids {operation}"
+            else:
+                reason = aio.requires_cli(meta)
+            if reason:
+                skipped.append({"root": str(root), "remote": remote, "reason": reason})
+                continue
+
+            def run(root=root, remote=remote):
+                return asyncio.run(aio.push(root, remote, operation=operation, **push_kwargs))
+
+            job = Job(
+                name=f"{root.name}/{remote}", backend=_remote_backend(remote, registry), run=run
+            )
+            planned.append((root, remote, job))
+    return planned, skipped
+
+
+def write_report(
+    path: str | pathlib.Path,
+    planned: list[tuple[pathlib.Path, str, Job]],
+    outcomes: list,
+    skipped: list[dict],
+    elapsed: float,
+) -> pathlib.Path:
+    """Write the consolidated JSON report of a batch run."""
+    results = []
+    for (root, remote, _job), outcome in zip(planned, outcomes):
+        to_dict = getattr(outcome.result, "to_dict", None)
+        results.append(
+            {
+                "root": str(root),
+                "remote": remote,
+                "backend": outcome.backend,
+                "status": getattr(outcome.result, "status", "ok" if outcome.ok else "failed"),
+                "elapsed": round(outcome.elapsed, 3),
+                "result": to_dict() if callable(to_dict) else None,
+                "error": outcome.error,
+            }
+        )
+    report = {
+        "finished": datetime.now().isoformat(),
+        "elapsed": round(elapsed, 3),
+        "succeeded": sum(1 for outcome in outcomes if outcome.ok),
+        "failed": sum(1 for outcome in outcomes if not outcome.ok),
+        "skipped": skipped,
+        "results": results,
+    }
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
+def run_batch(
+    roots_file: str | pathlib.Path,
+    operation: str = "sync",
+    jobs: int = 4,
+    backend_limits: dict[str, int] | None = None,
+    report_path: str | pathlib.Path | None = None,
+    **push_kwargs,
+) -> bool:
+    """
+    Push every mapped remote of every root in ``roots_file`` with at most
+    ``jobs`` transfers in flight. Returns True when every planned push
+    succeeded; skipped remotes do not count as failures.
+    """
+    try:
+        roots = read_roots(roots_file)
+    except OSError as exc:
+        print(f"Error: Could not read roots file '{roots_file}': {exc}")
+        return False
+    if not roots:
+        print(f"Error: No project roots listed in '{roots_file}'.")
+        return False
+
+    planned, skipped = plan_batch(roots, operation=operation, **push_kwargs)
+    print(
+        f"Batch: {len(planned)} pushes across {len(roots)} project roots "
+        f"({len(skipped)} skipped), {jobs} at a time."
+    )
+    started = time.monotonic()
+    outcomes = run_jobs(
+        [job for _root, _remote, job in planned],
+        max_jobs=jobs,
+        backend_limits=resolve_backend_limits(backend_limits),
+    )
+    elapsed = time.monotonic() - started
+    print_summary(
+        outcomes,
+        action="batch push",
+        skipped={
+            f"{pathlib.Path(item['root']).name}/{item['remote'] or '*'}": item["reason"]
+            for item in skipped
+        },
+    )
+    if report_path is None:
+        report_path = f"batch-report-{datetime.now():%Y%m%d-%H%M%S}.json"
+    print(f"Report written to {write_report(report_path, planned, outcomes, skipped, elapsed)}")
+    return all(outcome.ok for outcome in outcomes)
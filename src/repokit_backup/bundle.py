@@ -0,0 +1,471 @@
+"""
+Small-file bundling - Pack directories of tiny files into indexed tar shards.
+
+Pushing millions of small files over SFTP is dominated by per-file round
+trips. Directories whose project-relative path matches one of a remote's
+``bundle`` patterns are packed into uncompressed tar shards of bounded size and
+uploaded under ``<remote_path>/.repokit-bundles/<dir>/`` next to an
+``index.json`` sidecar. The index records every member's byte offset, so one
+file can be restored with a ranged read (``rclone cat --offset --count``)
+instead of downloading its shard.
+
+Files keep the shard they were first packed into, so adding or changing a file
+only rebuilds the shard that holds it; unchanged shards are never rebuilt or
+re-uploaded. The main rclone transfer excludes bundled directories and the
+bundle tree itself.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import tarfile
+from typing import Any, Callable
+
+from .filters import FilterMatcher, compile_rules
+from .paths import join_remote, safe_name, safe_target
+
+BUNDLE_ROOT = ".repokit-bundles"
+STATE_DIR = "./bin/bundles"
+INDEX_NAME = "index.json"
+DEFAULT_SHARD_SIZE = 256 * 1024 * 1024
+# Restore with ranged reads when the needed bytes are below this share of a shard.
+RANGED_READ_FRACTION = 0.25
+_SHARD_NAME = re.compile(r"^shard-(\d+)\.tar$")
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+# Executes one rclone command and returns its stdout; raises CalledProcessError.
+Runner = Callable[[list[str]], bytes]
+
+
+def _run_rclone(command: list[str]) -> bytes:
+    return subprocess.run(command, check=True, capture_output=True).stdout
+
+
+def parse_shard_size(value: str | int) -> int:
+    """
+    Parse a shard size such as ``256M`` or ``1G`` into bytes.
+
+    Raises:
+        ValueError: If the size is malformed or not positive.
+    """
+    match = re.fullmatch(r"(\d+)([kKmMgGtT]?)", str(value).strip())
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid shard size '{value}'; use a size such as 256M or 1G.")
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
+
+
+def bundle_settings(meta: dict | None) -> tuple[list[str], int] | None:
+    """Return ``(patterns, shard_size)`` from a registry entry, or None when disabled."""
+    config = meta.get("bundle") if isinstance(meta, dict) else None
+    if not isinstance(config, dict) or not config.get("patterns"):
+        return None
+    try:
+        shard_size = parse_shard_size(config.get("shard_size") or DEFAULT_SHARD_SIZE)
+    except ValueError as exc:
+        print(f"[WARN] {exc} Using {DEFAULT_SHARD_SIZE // 1024**2}M.")
+        shard_size = DEFAULT_SHARD_SIZE
+    return [str(pattern).strip("/") for pattern in config["patterns"]], shard_size
+
+
+def matching_dirs(
+    src: str | os.PathLike[str], patterns: list[str], matcher: FilterMatcher | None = None
+) -> list[str]:
+    """
+    Return project-relative directories matching ``patterns`` (outermost
+    only); directories excluded by ``matcher`` are skipped.
+    """
+    root = pathlib.Path(src)
+    matches: list[str] = []
+    for current, dirnames, _files in os.walk(root):
+        dirnames.sort()
+        kept = []
+        for name in dirnames:
+            relative = (pathlib.Path(current) / name).relative_to(root).as_posix()
+            if relative in {BUNDLE_ROOT, "bin"}:
+                continue
+            if matcher is not None and matcher.prunes(f"{relative}/"):
+                continue
+            if any(fnmatch.fnmatchcase(relative, pattern) for pattern in patterns):
+                matches.append(relative)
+            else:
+                kept.append(name)
+        dirnames[:] = kept
+    return matches
+
+
+def _scan(
+    directory: pathlib.Path, prefix: str = "", matcher: FilterMatcher | None = None
+) -> dict[str, tuple[int, int]]:
+    """
+    Size and mtime of the files below ``directory``; ``matcher`` sees their
+    paths below ``prefix``, the directory's path relative to the push source.
+    """
+    files: dict[str, tuple[int, int]] = {}
+    for current, dirnames, filenames in os.walk(directory):
+        base = pathlib.Path(current).relative_to(directory).as_posix()
+        base = "" if base == "." else f"{base}/"
+        if matcher is not None:
+            dirnames[:] = [d for d in dirnames if not matcher.prunes(f"{prefix}/{base}{d}/")]
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = pathlib.Path(current) / name
+            if path.is_symlink():
+                continue
+            if matcher is not None and not matcher.includes(f"{prefix}/{base}{name}"):
+                continue
+            stat = path.stat()
+            files[f"{base}{name}"] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def _member_key(member: dict) -> tuple:
+    return member["path"], member["size"], member["mtime_ns"]
+
+
+def plan_shards(
+    files: dict[str, tuple[int, int]], previous: dict, shard_size: int
+) -> dict[str, list[str]]:
+    """
+    Assign files to shards, keeping every file in the shard that already holds
+    it. New files fill the most recent shard, then open new ones.
+    """
+    assigned: dict[str, list[str]] = {}
+    totals: dict[str, int] = {}
+    placed: set[str] = set()
+    for name, shard in sorted((previous.get("shards") or {}).items()):
+        members = [m["path"] for m in shard.get("members", []) if m["path"] in files]
+        if members:
+            assigned[name] = members
+            totals[name] = sum(files[path][0] for path in members)
+            placed.update(members)
+
+    numbers = [int(match.group(1)) for name in assigned if (match := _SHARD_NAME.match(name))]
+    next_number = max(numbers, default=-1) + 1
+    current = max(assigned, default=None)
+    for path in sorted(set(files) - placed):
+        size = files[path][0]
+        if current is None or (assigned[current] and totals[current] + size > shard_size):
+            current = f"shard-{next_number:05d}.tar"
+            next_number += 1
+            assigned[current] = []
+            totals[current] = 0
+        assigned[current].append(path)
+        totals[current] += size
+    return assigned
+
+
+def build_shard(directory: pathlib.Path, members: list[str], target: pathlib.Path) -> list[dict]:
+    """Write an uncompressed tar of ``members`` and return their index entries."""
+    entries: list[dict] = []
+    with tarfile.open(target, "w", format=tarfile.PAX_FORMAT) as archive:
+        for relative in sorted(members):
+            path = directory / relative
+            info = archive.gettarinfo(str(path), arcname=relative)
+            with open(path, "rb") as handle:
+                archive.addfile(info, handle)
+            # addfile() works on a copy of ``info``; the data block ends at the
+            # archive offset, padded to the 512-byte tar record size.
+            padded = -(-info.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+            entries.append(
+                {
+                    "path": relative,
+                    "size": info.size,
+                    "mtime_ns": path.stat().st_mtime_ns,
+                    "offset": archive.offset - padded,
+                    "length": info.size,
+                }
+            )
+    return entries
+
+
+def _state_path(remote_key: str, relative_dir: str) -> pathlib.Path:
+    # The hash keeps directories that differ only in unsafe characters apart.
+    digest = hashlib.sha256(relative_dir.encode("utf-8")).hexdigest()[:12]
+    safe = safe_name(relative_dir, default="", lower=False)
+    return pathlib.Path(STATE_DIR) / remote_key / f"{safe}-{digest}.json"
+
+
+def _load_index(path: pathlib.Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _remote_index(runner: Runner, remote_dir: str, config_args: list[str]) -> dict:
+    try:
+        data = json.loads(
+            runner(["rclone", "cat", join_remote(remote_dir, INDEX_NAME)] + config_args)
+        )
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def push_bundles(
+    remote_key: str,
+    src: str,
+    dst: str,
+    patterns: list[str],
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    config_args: list[str] | None = None,
+    dry_run: bool = False,
+    runner: Runner | None = None,
+    transfer: bool = True,
+    exclude_patterns: list[str] | None = None,
+) -> tuple[bool, list[str]]:
+    """
+    Pack and upload matching directories; return ``(ok, exclude_patterns)``.
+
+    The returned patterns keep the main transfer away from bundled directories
+    and from the bundle tree on the remote. ``transfer=False`` only computes
+    them, for ``--shard`` slices that leave the bundles to slice 1. Files
+    matching the push's ``exclude_patterns`` are never packed.
+    """
+    runner = runner or _run_rclone
+    config_args = config_args or []
+    matcher = FilterMatcher(compile_rules(None, exclude_patterns)) if exclude_patterns else None
+    directories = matching_dirs(src, patterns, matcher)
+    excludes = [f"/{BUNDLE_ROOT}/**"] + [f"/{relative}/**" for relative in directories]
+    if not transfer:
+        return True, excludes
+    ok = True
+    for relative in directories:
+        directory = pathlib.Path(src) / relative
+        remote_dir = join_remote(dst, BUNDLE_ROOT, relative)
+        state_path = _state_path(remote_key, relative)
+        previous = _load_index(state_path) or _remote_index(runner, remote_dir, config_args)
+        files = _scan(directory, relative, matcher)
+        assignment = plan_shards(files, previous, shard_size)
+        previous_shards = previous.get("shards") or {}
+        changed = [
+            name
+            for name, members in assignment.items()
+            if sorted(_member_key(m) for m in previous_shards.get(name, {}).get("members", []))
+            != sorted((path, *files[path]) for path in members)
+        ]
+        removed = sorted(set(previous_shards) - set(assignment))
+        if not changed and not removed:
+            print(f"Bundle '{relative}': {len(assignment)} shards unchanged.")
+            continue
+        print(
+            f"Bundle '{relative}': {len(files)} files in {len(assignment)} shards "
+            f"({len(changed)} to upload, {len(removed)} to remove)."
+        )
+        if dry_run:
+            continue
+
+        staging = pathlib.Path(STATE_DIR) / remote_key / "staging" / relative
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        index: dict[str, Any] = {
+            "version": 1,
+            "directory": relative,
+            "shards": {name: previous_shards[name] for name in assignment if name not in changed},
+        }
+        try:
+            for name in changed:
+                entries = build_shard(directory, assignment[name], staging / name)
+                index["shards"][name] = {
+                    "size": (staging / name).stat().st_size,
+                    "members": entries,
+                }
+            (staging / INDEX_NAME).write_text(json.dumps(index, indent=2), encoding="utf-8")
+            runner(["rclone", "copy", str(staging), remote_dir] + config_args)
+            for name in removed:
+                runner(["rclone", "deletefile", join_remote(remote_dir, name)] + config_args)
+        except (subprocess.CalledProcessError, OSError) as exc:
+            print(f"Failed to upload bundle '{relative}': {exc}")
+            ok = False
+            continue
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        state_path.write_text(json.dumps(index, indent=2), encoding="utf-8")
+    return ok, excludes
+
+
+def _write_member(target: pathlib.Path, data: bytes, member: dict) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+    os.utime(target, ns=(member["mtime_ns"], member["mtime_ns"]))
+
+
+def extract_file(
+    remote_dir: str,
+    index: dict,
+    relative: str,
+    target: str | os.PathLike[str],
+    config_args: list[str] | None = None,
+    runner: Runner | None = None,
+) -> bool:
+    """Restore one bundled file with a ranged read of its shard."""
+    runner = runner or _run_rclone
+    for name, shard in (index.get("shards") or {}).items():
+        for member in shard.get("members", []):
+            if member["path"] != relative:
+                continue
+            data = runner(
+                [
+                    "rclone",
+                    "cat",
+                    "--offset",
+                    str(member["offset"]),
+                    "--count",
+                    str(member["length"]),
+                    join_remote(remote_dir, name),
+                ]
+                + (config_args or [])
+            )
+            _write_member(pathlib.Path(target), data, member)
+            return True
+    return False
+
+
+def _needs_restore(root: pathlib.Path, member: dict) -> bool:
+    try:
+        stat = safe_target(root, member["path"]).stat()
+    except OSError:
+        return True
+    return (stat.st_size, stat.st_mtime_ns) != (member["size"], member["mtime_ns"])
+
+
+def pull_bundles(
+    remote_key: str,
+    src: str,
+    dst: str,
+    config_args: list[str] | None = None,
+    dry_run: bool = False,
+    runner: Runner | None = None,
+    transfer: bool = True,
+) -> tuple[bool, list[str]]:
+    """
+    Unpack bundled directories from ``src`` into ``dst``; return
+    ``(ok, exclude_patterns)`` for the main pull.
+
+    Only missing or changed files are restored. A shard is downloaded whole
+    unless the needed bytes are a small share of it, in which case each file
+    is fetched with a ranged read. ``transfer=False`` only lists the bundled
+    directories.
+    """
+    runner = runner or _run_rclone
+    config_args = config_args or []
+    bundle_root = join_remote(src, BUNDLE_ROOT)
+    try:
+        listing = runner(
+            ["rclone", "lsf", "-R", "--files-only", "--include", INDEX_NAME, bundle_root]
+            + config_args
+        )
+    except (subprocess.CalledProcessError, OSError):
+        # No bundle tree on the remote.
+        return True, []
+    relatives = [
+        str(pathlib.PurePosixPath(line).parent)
+        for line in listing.decode("utf-8").splitlines()
+        if line.strip()
+    ]
+    excludes = [f"/{BUNDLE_ROOT}/**"] + [f"/{relative}/**" for relative in relatives]
+    if not transfer:
+        return True, excludes
+    ok = True
+    for relative in relatives:
+        remote_dir = join_remote(bundle_root, relative)
+        index = _remote_index(runner, remote_dir, config_args)
+        root = pathlib.Path(dst) / relative
+        restored = 0
+        try:
+            for name, shard in sorted((index.get("shards") or {}).items()):
+                needed = [m for m in shard.get("members", []) if _needs_restore(root, m)]
+                if not needed or dry_run:
+                    restored += len(needed)
+                    continue
+                needed_bytes = sum(member["length"] for member in needed)
+                shard_bytes = sum(member["length"] for member in shard.get("members", []))
+                if needed_bytes < RANGED_READ_FRACTION * shard_bytes:
+                    for member in needed:
+                        extract_file(
+                            remote_dir,
+                            {"shards": {name: {"members": [member]}}},
+                            member["path"],
+                            safe_target(root, member["path"]),
+                            config_args=config_args,
+                            runner=runner,
+                        )
+                else:
+                    staging = pathlib.Path(STATE_DIR) / remote_key / "download" / name
+                    staging.parent.mkdir(parents=True, exist_ok=True)
+                    runner(
+                        ["rclone", "copyto", join_remote(remote_dir, name), str(staging)]
+                        + config_args
+                    )
+                    try:
+                        with open(staging, "rb") as handle:
+                            for member in needed:
+                                handle.seek(member["offset"])
+                                data = handle.read(member["length"])
+                                _write_member(safe_target(root, member["path"]), data, member)
+                    finally:
+                        staging.unlink(missing_ok=True)
+                restored += len(needed)
+        except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+            print(f"Failed to restore bundle '{relative}': {exc}")
+            ok = False
+            continue
+        verb = "would restore" if dry_run else "restored"
+        print(f"Bundle '{relative}': {verb} {restored} files.")
+    return ok, excludes
+
+
+def configure_bundle(
+    remote_name: str,
+    patterns: list[str] | None = None,
+    shard_size: str | None = None,
+    clear: bool = False,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """Update and print the bundling configuration of a registered remote."""
+    from .registry import load_all_registry, set_bundle
+
+    registry = load_all_registry(json_path)
+    key = (remote_name or "").strip().lower()
+    meta = registry.get(key)
+    if not isinstance(meta, dict):
+        print(f"Remote '{remote_name}' not found in registry.")
+        return False
+
+    config = dict(meta.get("bundle") or {})
+    if clear:
+        config = {}
+    if patterns:
+        merged = list(config.get("patterns") or [])
+        for pattern in patterns:
+            if pattern.strip("/") and pattern.strip("/") not in merged:
+                merged.append(pattern.strip("/"))
+        config["patterns"] = merged
+    if shard_size is not None:
+        try:
+            parse_shard_size(shard_size)
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            return False
+        config["shard_size"] = str(shard_size).strip()
+    if clear or patterns or shard_size is not None:
+        if not set_bundle(key, config if config.get("patterns") else None, json_path=json_path):
+            return False
+        meta["bundle"] = config if config.get("patterns") else None
+
+    settings = bundle_settings(meta)
+    if settings is None:
+        print(f"Bundling is disabled for '{key}'.")
+    else:
+        bundle_patterns, size = settings
+        print(
+            f"Bundling for '{key}': {', '.join(bundle_patterns)} (shards up to {size // 1024**2} MiB)"
+        )
+    return True
@@ -11,6 +11,12 @@ import pathlib
 import sys
 
 from .remote_types import CANONICAL_BACKENDS, normalize_backend
+from .scheduler import parse_backend_limit
+from .mounts import validate_cache_size
+from .priority import parse_class
+from .sharding import parse_slice
+from .tuning import validate_bwlimit
+from .watchdog import parse_rate
 
 # from ..common import ensure_correct_kernel
 
@@ -29,6 +35,87 @@ def _parse_transfer_timeout(value: str) -> float | None:
     return None if timeout == 0 else timeout
 
 
+def _parse_stall_floor(value: str) -> float:
+    """Parse a throughput floor in bytes/s such as ``10K``."""
+    try:
+        return parse_rate(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _parse_count(value: str) -> int:
+    """Parse a non-negative count."""
+    try:
+        count = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("must be zero or a positive integer") from exc
+    if count < 0:
+        raise argparse.ArgumentTypeError("must be zero or a positive integer")
+    return count
+
+
+def _parse_jobs(value: str) -> int:
+    """Parse a positive worker count."""
+    try:
+        jobs = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("must be a positive integer") from exc
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer")
+    return jobs
+
+
+def _parse_backend_limit(value: str) -> tuple[str, int]:
+    """Parse a ``BACKEND=N`` concurrency cap."""
+    try:
+        return parse_backend_limit(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _parse_bwlimit(value: str) -> str:
+    """Parse an rclone bandwidth limit or timetable."""
+    try:
+        return validate_bwlimit(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _parse_cache_size(value: str) -> str:
+    """Parse a VFS cache size cap such as ``10G``."""
+    try:
+        return validate_cache_size(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _parse_priority_class(value: str) -> list[str]:
+    """Parse one priority class of comma-separated globs."""
+    try:
+        return parse_class(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _parse_slice(value: str) -> tuple[int, int]:
+    """Parse an ``i/N`` slice of an array job."""
+    try:
+        return parse_slice(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _parse_transfer_levels(value: str) -> tuple[int, ...]:
+    """Parse a comma-separated list of positive transfer counts."""
+    try:
+        levels = tuple(int(part) for part in value.split(",") if part.strip())
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("must be comma-separated positive integers") from exc
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError("must be comma-separated positive integers")
+    return levels
+
+
 def _repokit_common_module():
     """Import Common only after the CLI has selected its project root."""
     import repokit_common
@@ -89,7 +176,7 @@ def _resolve_cli_project_root(
                 f"Error: --project-root does not exist or is not a directory: {resolved_root}"
             )
         return resolved_root
-    if command == "init":
+    if command in {"init", "batch"}:
         return pathlib.Path.cwd().resolve()
     # Auto-detection intentionally imports Common while still in the caller's
     # directory. For --project-root and init, import happens after chdir below.
@@ -299,7 +386,15 @@ def main():
         list_supported_remote_types,
         setup_rclone,
     )
-    from .registry import set_push_policy, set_remote_pin
+    from . import mounts, rcd
+    from .registry import set_detect_renames, set_push_policy, set_remote_pin, set_versioning
+    from .autotune import DEFAULT_TRANSFERS, autotune_remote
+    from .bundle import configure_bundle
+    from .sharding import finalize
+    from .snapshots import configure_snapshots
+    from .tuning import configure_tuning
+    from .verify import verify_remote
+    from .versions import DEFAULT_KEEP_DAILY, DEFAULT_KEEP_WEEKLY, prune_versions
 
     parser = argparse.ArgumentParser(description="Backup manager CLI using rclone")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -316,6 +411,15 @@ def main():
         dest="project_root",
         help="Explicit project root directory (overrides auto-detection).",
     )
+    parser.add_argument(
+        "--executor",
+        choices=list(rcd.EXECUTORS),
+        default=None,
+        help=(
+            "How rclone operations run: one subprocess per call (default) or a persistent "
+            f"per-project `rclone rcd` daemon. Also read from ${rcd.EXECUTOR_ENV}."
+        ),
+    )
 
     # Init command
     subparsers.add_parser(
@@ -354,10 +458,195 @@ def main():
     policy.add_argument(
         "--set",
         dest="policy_value",
-        required=True,
         choices=["full", "append-only", "pull-only"],
         help="Policy value to set",
     )
+    policy.add_argument(
+        "--detect-renames",
+        dest="detect_renames",
+        choices=["on", "off"],
+        help="Turn local renames into server-side moves on incremental syncs",
+    )
+    policy.add_argument(
+        "--versioning",
+        choices=["on", "off"],
+        help="Keep files that pushes replace or delete in dated buckets next to the remote path",
+    )
+
+    # Prune command
+    prune = subparsers.add_parser(
+        "prune", help="Delete version buckets of a remote that fall outside retention"
+    )
+    prune.add_argument("--remote", required=True, help="Remote name")
+    prune.add_argument(
+        "--keep-daily",
+        dest="keep_daily",
+        type=_parse_count,
+        default=DEFAULT_KEEP_DAILY,
+        metavar="N",
+        help=f"Keep the newest bucket of each of the last N days (default {DEFAULT_KEEP_DAILY}).",
+    )
+    prune.add_argument(
+        "--keep-weekly",
+        dest="keep_weekly",
+        type=_parse_count,
+        default=DEFAULT_KEEP_WEEKLY,
+        metavar="N",
+        help=f"Keep the newest bucket of each of the last N weeks (default {DEFAULT_KEEP_WEEKLY}).",
+    )
+
+    # Tune command
+    tune = subparsers.add_parser(
+        "tune", help="Show or edit rclone transfer tuning for a configured remote"
+    )
+    tune.add_argument("--remote", required=True, help="Remote name")
+    tune.add_argument("--transfers", type=_parse_jobs, metavar="N", help="Parallel file transfers")
+    tune.add_argument("--checkers", type=_parse_jobs, metavar="N", help="Parallel checkers")
+    tune.add_argument("--buffer-size", dest="buffer_size", metavar="SIZE", help="e.g. 32M")
+    tune.add_argument(
+        "--multi-thread-streams",
+        dest="multi_thread_streams",
+        type=_parse_jobs,
+        metavar="N",
+        help="Streams used for multi-thread transfers of large files",
+    )
+    tune.add_argument(
+        "--chunk-size", dest="chunk_size", metavar="SIZE", help="Backend upload chunk size"
+    )
+    tune.add_argument(
+        "--tpslimit", type=float, metavar="N", help="API transactions per second (0 = unlimited)"
+    )
+    tune.add_argument(
+        "--bwlimit",
+        type=_parse_bwlimit,
+        metavar="RATE|TIMETABLE",
+        help="Bandwidth limit or timetable, e.g. '08:00,10M 18:00,off' (off = unlimited)",
+    )
+    tune.add_argument(
+        "--retries",
+        type=_parse_jobs,
+        metavar="N",
+        help="rclone whole-transfer attempts (default: 1, failed files are retried alone)",
+    )
+    tune.add_argument(
+        "--reset", action="store_true", help="Clear overrides and return to backend defaults"
+    )
+
+    # Autotune command
+    autotune = subparsers.add_parser(
+        "autotune", help="Measure transfer settings against a remote and store the fastest"
+    )
+    autotune.add_argument("--remote", required=True, help="Remote name")
+    autotune.add_argument(
+        "--transfers",
+        dest="transfer_levels",
+        type=_parse_transfer_levels,
+        default=DEFAULT_TRANSFERS,
+        metavar="N,N,...",
+        help="Concurrency levels to try (default: 2,4,8,16,32).",
+    )
+    autotune.add_argument(
+        "--probe-dir",
+        dest="probe_dir",
+        help="Use an existing directory as the probe dataset instead of synthetic files.",
+    )
+    autotune.add_argument(
+        "--no-apply",
+        dest="apply",
+        action="store_false",
+        help="Report the best settings without saving them.",
+    )
+
+    # Bundle command
+    bundle = subparsers.add_parser(
+        "bundle", help="Show or edit small-file bundling for a configured remote"
+    )
+    bundle.add_argument("--remote", required=True, help="Remote name")
+    bundle.add_argument(
+        "--pattern",
+        dest="bundle_patterns",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Project-relative directory glob to bundle (repeatable), e.g. data/raw/*",
+    )
+    bundle.add_argument(
+        "--shard-size", dest="shard_size", metavar="SIZE", help="Maximum shard size (default 256M)"
+    )
+    bundle.add_argument("--clear", action="store_true", help="Disable bundling for the remote")
+
+    # Snapshots command
+    snapshots_parser = subparsers.add_parser(
+        "snapshots", help="Show or set the storage layout of a remote and list its snapshots"
+    )
+    snapshots_parser.add_argument("--remote", required=True, help="Remote name")
+    snapshots_parser.add_argument(
+        "--layout",
+        choices=["mirror", "snapshots"],
+        help="mirror: plain copy of the local tree, snapshots: deduplicated chunk store",
+    )
+
+    # Batch command
+    batch = subparsers.add_parser(
+        "batch", help="Push every mapped remote of many project roots under one job budget"
+    )
+    batch.add_argument(
+        "--roots-file",
+        dest="roots_file",
+        required=True,
+        help="File with one project root per line (# comments allowed).",
+    )
+    batch.add_argument(
+        "--mode",
+        choices=["sync", "copy", "move"],
+        default="sync",
+        help="sync: mirror (default), copy: no deletes, move: delete source after",
+    )
+    batch.add_argument(
+        "--jobs",
+        type=_parse_jobs,
+        default=4,
+        metavar="N",
+        help="Maximum concurrent pushes across all projects (default 4).",
+    )
+    batch.add_argument(
+        "--backend-jobs",
+        dest="backend_jobs",
+        type=_parse_backend_limit,
+        action="append",
+        default=[],
+        metavar="BACKEND=N",
+        help="Per-backend concurrency cap (repeatable), e.g. dropbox=2.",
+    )
+    batch.add_argument(
+        "--report",
+        metavar="PATH",
+        help="Where to write the JSON report (default batch-report-<timestamp>.json).",
+    )
+    batch.add_argument(
+        "--transfer-timeout",
+        type=_parse_transfer_timeout,
+        metavar="SECONDS",
+        help="Total limit per push; 0 or omission allows unlimited duration.",
+    )
+    batch.add_argument(
+        "--bwlimit",
+        type=_parse_bwlimit,
+        metavar="RATE|TIMETABLE",
+        help="Bandwidth limit or timetable for every push; overrides the remotes' tuning.",
+    )
+
+    # Finalize command
+    finalize_parser = subparsers.add_parser(
+        "finalize", help="Record the combined sync status of a --shard I/N run"
+    )
+    finalize_parser.add_argument("--remote", required=True, help="Remote name")
+    finalize_parser.add_argument(
+        "--action",
+        choices=["push", "pull"],
+        default="push",
+        help="Which sliced transfer to finalize (default: push).",
+    )
 
     # Add command
     add = subparsers.add_parser("add", help="Add a remote and folder mapping")
@@ -498,6 +787,101 @@ def main():
         metavar="SECONDS",
         help="Total transfer limit per remote; 0 or omission allows unlimited duration.",
     )
+    push.add_argument(
+        "--stall-timeout",
+        type=_parse_transfer_timeout,
+        metavar="SECONDS",
+        help="Stop and restart rclone after this long without progress; 0 or omission "
+        "disables stall detection.",
+    )
+    push.add_argument(
+        "--stall-floor",
+        type=_parse_stall_floor,
+        metavar="RATE",
+        help="Throughput below which a transfer counts as stalled (default: 1K bytes/s).",
+    )
+    push.add_argument(
+        "--jobs",
+        type=_parse_jobs,
+        default=1,
+        metavar="N",
+        help="Maximum number of remotes pushed concurrently with --remote all (default: 1).",
+    )
+    push.add_argument(
+        "--backend-jobs",
+        dest="backend_jobs",
+        type=_parse_backend_limit,
+        action="append",
+        default=[],
+        metavar="BACKEND=N",
+        help="Per-backend concurrency cap (repeatable), e.g. dropbox=2.",
+    )
+    push.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="Ignore the journal of an interrupted push and transfer the full tree.",
+    )
+    push.add_argument(
+        "--full-scan",
+        dest="incremental",
+        action="store_false",
+        help="Ignore the manifest of the last push and let rclone compare the full trees.",
+    )
+    push.add_argument(
+        "--fan-out",
+        dest="fan_out",
+        action="store_true",
+        help="With --remote all, scan each shared local source once and push its remotes together.",
+    )
+    push.add_argument(
+        "--detect-renames",
+        dest="detect_renames",
+        action="store_true",
+        default=None,
+        help="Move renamed files on the remote instead of uploading them again "
+        "(default: the remote's policy setting).",
+    )
+    push.add_argument(
+        "--no-detect-renames",
+        dest="detect_renames",
+        action="store_false",
+        help="Upload renamed files again even if the remote enables rename detection.",
+    )
+    push.add_argument(
+        "--plan-out",
+        dest="plan_out",
+        metavar="FILE",
+        help="With --dry-run, save the files to copy and delete as a plan for --plan.",
+    )
+    push.add_argument(
+        "--plan",
+        metavar="FILE",
+        help="Execute a plan saved by --plan-out without listing the trees again; "
+        "rejected if the local files changed since.",
+    )
+
+    push.add_argument(
+        "--shards",
+        type=_parse_jobs,
+        default=1,
+        metavar="N",
+        help="Split the transfer into N concurrent rclone processes balanced by size.",
+    )
+    push.add_argument(
+        "--shard",
+        dest="slice_spec",
+        type=_parse_slice,
+        metavar="I/N",
+        help="Transfer only slice I of N (stable path hash), e.g. one Slurm array task; "
+        "combine the results with 'finalize'.",
+    )
+    push.add_argument(
+        "--bwlimit",
+        type=_parse_bwlimit,
+        metavar="RATE|TIMETABLE",
+        help="Bandwidth limit or timetable for this run; overrides the remote's tuning.",
+    )
 
     # Pull command
     pull = subparsers.add_parser("pull", help="Pull/restore from remote")
@@ -549,6 +933,54 @@ def main():
         metavar="SECONDS",
         help="Total transfer limit; 0 or omission allows unlimited duration.",
     )
+    pull.add_argument(
+        "--stall-timeout",
+        type=_parse_transfer_timeout,
+        metavar="SECONDS",
+        help="Stop and restart rclone after this long without progress; 0 or omission "
+        "disables stall detection.",
+    )
+    pull.add_argument(
+        "--stall-floor",
+        type=_parse_stall_floor,
+        metavar="RATE",
+        help="Throughput below which a transfer counts as stalled (default: 1K bytes/s).",
+    )
+
+    pull.add_argument(
+        "--shards",
+        type=_parse_jobs,
+        default=1,
+        metavar="N",
+        help="Split the transfer into N concurrent rclone processes balanced by size.",
+    )
+    pull.add_argument(
+        "--shard",
+        dest="slice_spec",
+        type=_parse_slice,
+        metavar="I/N",
+        help="Transfer only slice I of N (stable path hash), e.g. one Slurm array task; "
+        "combine the results with 'finalize'.",
+    )
+    pull.add_argument(
+        "--bwlimit",
+        type=_parse_bwlimit,
+        metavar="RATE|TIMETABLE",
+        help="Bandwidth limit or timetable for this run; overrides the remote's tuning.",
+    )
+    pull.add_argument(
+        "--snapshot",
+        metavar="ID",
+        help="Snapshot to restore from a remote with the snapshot layout (default: latest).",
+    )
+    pull.add_argument(
+        "--priority",
+        nargs="*",
+        type=_parse_priority_class,
+        metavar="GLOBS",
+        help="Restore class by class: each comma-separated glob list in order, then the "
+        "rest; without globs, small files first (up to 1 MiB, up to 100 MiB, the rest).",
+    )
 
     # Delete command
     delete = subparsers.add_parser("delete", help="Delete a remote and its mapping")
@@ -558,6 +990,63 @@ def main():
     diff = subparsers.add_parser("diff", help="Generate a diff report for a remote")
     diff.add_argument("--remote", required=True, help="Remote name")
 
+    # Verify command
+    verify = subparsers.add_parser(
+        "verify", help="Compare local file hashes with the hashes stored on a remote"
+    )
+    verify.add_argument("--remote", required=True, help="Remote name or 'all'")
+    verify.add_argument(
+        "--jobs",
+        type=_parse_jobs,
+        default=None,
+        metavar="N",
+        help="Number of files hashed concurrently (default: CPU count, at most 32).",
+    )
+    verify.add_argument(
+        "--rehash",
+        action="store_true",
+        help="Hash every local file again instead of reusing cached digests of unchanged files.",
+    )
+
+    # Daemon command
+    daemon = subparsers.add_parser(
+        "daemon", help="Start, stop, or inspect the persistent rclone rcd daemon"
+    )
+    daemon.add_argument("daemon_action", choices=["start", "stop", "status"])
+
+    # Mount commands
+    mount = subparsers.add_parser(
+        "mount", help="Mount a remote's backup and fetch files on demand through a VFS cache"
+    )
+    mount.add_argument("--remote", required=True, help="Remote name")
+    mount.add_argument("--mountpoint", required=True, help="Empty local directory to mount at")
+    mount.add_argument(
+        "--remote-path",
+        dest="remote_path",
+        help="Override the mounted path on the remote (default: the mapped remote path).",
+    )
+    mount.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        type=_parse_cache_size,
+        default=mounts.DEFAULT_CACHE_SIZE,
+        metavar="SIZE",
+        help=f"Size cap of the cache under ./bin/cache (default {mounts.DEFAULT_CACHE_SIZE}).",
+    )
+    mount.add_argument(
+        "--writable",
+        action="store_true",
+        help="Allow changes through the mount (read-only by default; needs the full policy).",
+    )
+    unmount = subparsers.add_parser("unmount", help="Unmount mounts started by 'mount'")
+    unmount_target = unmount.add_mutually_exclusive_group(required=True)
+    unmount_target.add_argument("--mountpoint", help="Mountpoint to unmount")
+    unmount_target.add_argument(
+        "--remote", dest="unmount_remote", help="Unmount every mount of this remote"
+    )
+    unmount_target.add_argument("--all", action="store_true", help="Unmount every active mount")
+    subparsers.add_parser("mounts", help="List active mounts and their cache use")
+
     # Transfer command (remote-to-remote)
     transfer = subparsers.add_parser("transfer", help="Transfer data between two remotes")
     transfer.add_argument("--source", required=True, help="Source remote name")
@@ -574,8 +1063,48 @@ def main():
         metavar="SECONDS",
         help="Total transfer limit; 0 or omission allows unlimited duration.",
     )
+    transfer.add_argument(
+        "--stall-timeout",
+        type=_parse_transfer_timeout,
+        metavar="SECONDS",
+        help="Stop and restart rclone after this long without progress; 0 or omission "
+        "disables stall detection.",
+    )
+    transfer.add_argument(
+        "--stall-floor",
+        type=_parse_stall_floor,
+        metavar="RATE",
+        help="Throughput below which a transfer counts as stalled (default: 1K bytes/s).",
+    )
+
+    transfer.add_argument(
+        "--bwlimit",
+        type=_parse_bwlimit,
+        metavar="RATE|TIMETABLE",
+        help="Bandwidth limit or timetable for this run; overrides the remote's tuning.",
+    )
 
     args = parser.parse_args()
+    if getattr(args, "executor", None):
+        os.environ[rcd.EXECUTOR_ENV] = args.executor
+
+    if args.command == "batch":
+        # Each listed root is used as is; the current directory is not bootstrapped.
+        from .batch import run_batch
+
+        if not run_batch(
+            args.roots_file,
+            operation=args.mode,
+            jobs=args.jobs,
+            backend_limits=dict(args.backend_jobs),
+            report_path=args.report,
+            dry_run=args.dry_run,
+            verbose=args.verbose,
+            transfer_timeout=args.transfer_timeout,
+            bwlimit=args.bwlimit,
+        ):
+            sys.exit(1)
+        return
 
     try:
         bin_dir, pyproject_path = _bootstrap_project_runtime(install_rclone)
@@ -694,6 +1223,29 @@ def main():
             if getattr(args, "search_pattern", None) and getattr(args, "select", None) is not None:
                 print("Error: use either --search or --select for push, not both.")
                 sys.exit(2)
+            if getattr(args, "shards", 1) > 1 and (
+                getattr(args, "search_pattern", None) or getattr(args, "select", None) is not None
+            ):
+                print("Error: --shards cannot be combined with --search or --select.")
+                sys.exit(2)
+            if getattr(args, "shards", 1) > 1 and getattr(args, "slice_spec", None):
+                print("Error: use either --shards or --shard, not both.")
+                sys.exit(2)
+            plan_out = getattr(args, "plan_out", None)
+            plan = getattr(args, "plan", None)
+            if plan_out and plan:
+                print("Error: use either --plan-out or --plan, not both.")
+                sys.exit(2)
+            if plan_out and not args.dry_run:
+                print("Error: --plan-out requires --dry-run.")
+                sys.exit(2)
+            if (plan_out or plan) and (
+                remote == "all"
+                or getattr(args, "shards", 1) > 1
+                or getattr(args, "slice_spec", None)
+            ):
+                print("Error: plans apply to a single remote without --shards or --shard.")
+                sys.exit(2)
             mode = getattr(args, "mode", "sync")
             ok = push_rclone(
                 remote_name=remote,
@@ -705,6 +1257,19 @@ def main():
                 select_path=getattr(args, "select", None),
                 search_pattern=getattr(args, "search_pattern", None),
                 transfer_timeout=getattr(args, "transfer_timeout", None),
+                jobs=getattr(args, "jobs", 1),
+                backend_limits=dict(getattr(args, "backend_jobs", None) or []),
+                resume=getattr(args, "resume", True),
+                incremental=getattr(args, "incremental", True),
+                bwlimit=getattr(args, "bwlimit", None),
+                stall_timeout=getattr(args, "stall_timeout", None),
+                stall_floor=getattr(args, "stall_floor", None),
+                fan_out=getattr(args, "fan_out", False),
+                detect_renames=getattr(args, "detect_renames", None),
+                shards=getattr(args, "shards", 1),
+                slice_spec=getattr(args, "slice_spec", None),
+                plan_out=plan_out,
+                plan=plan,
             )
             if not ok:
                 sys.exit(1)
@@ -713,6 +1278,14 @@ def main():
             if getattr(args, "search_pattern", None) and getattr(args, "select", None) is not None:
                 print("Error: use either --search or --select for pull, not both.")
                 sys.exit(2)
+            if getattr(args, "shards", 1) > 1 and (
+                getattr(args, "search_pattern", None) or getattr(args, "select", None) is not None
+            ):
+                print("Error: --shards cannot be combined with --search or --select.")
+                sys.exit(2)
+            if getattr(args, "shards", 1) > 1 and getattr(args, "slice_spec", None):
+                print("Error: use either --shards or --shard, not both.")
+                sys.exit(2)
             mode = getattr(args, "mode", "sync")
             ok = pull_rclone(
                 remote_name=remote,
@@ -724,6 +1297,13 @@ def main():
                 select_path=getattr(args, "select", None),
                 search_pattern=getattr(args, "search_pattern", None),
                 transfer_timeout=getattr(args, "transfer_timeout", None),
+                bwlimit=getattr(args, "bwlimit", None),
+                stall_timeout=getattr(args, "stall_timeout", None),
+                stall_floor=getattr(args, "stall_floor", None),
+                shards=getattr(args, "shards", 1),
+                slice_spec=getattr(args, "slice_spec", None),
+                snapshot=getattr(args, "snapshot", None),
+                priority_globs=getattr(args, "priority", None),
             )
             if not ok:
                 sys.exit(1)
@@ -741,6 +1321,9 @@ def main():
         elif args.command == "diff":
             if not generate_diff_report(remote_name=remote):
                 sys.exit(1)
+        elif args.command == "verify":
+            if not verify_remote(remote, jobs=args.jobs, rehash=args.rehash):
+                sys.exit(1)
         elif args.command == "ls":
             if not list_remote_entries(
                 remote_name=remote,
@@ -749,9 +1332,87 @@ def main():
             ):
                 sys.exit(1)
         elif args.command == "policy":
-            ok = set_push_policy(remote_name=remote, push_policy=getattr(args, "policy_value", ""))
+            policy_value = getattr(args, "policy_value", None)
+            renames_value = getattr(args, "detect_renames", None)
+            versioning_value = getattr(args, "versioning", None)
+            if policy_value is None and renames_value is None and versioning_value is None:
+                print("Error: policy needs at least one of --set, --detect-renames, --versioning.")
+                sys.exit(2)
+            ok = True
+            if policy_value is not None:
+                ok = set_push_policy(remote_name=remote, push_policy=policy_value)
+            if ok and renames_value is not None:
+                ok = set_detect_renames(remote_name=remote, enabled=renames_value == "on")
+            if ok and versioning_value is not None:
+                ok = set_versioning(remote_name=remote, enabled=versioning_value == "on")
             if not ok:
                 sys.exit(2)
+        elif args.command == "prune":
+            if not prune_versions(
+                remote,
+                keep_daily=args.keep_daily,
+                keep_weekly=args.keep_weekly,
+                dry_run=args.dry_run,
+            ):
+                sys.exit(1)
+        elif args.command == "tune":
+            updates = {
+                key: getattr(args, key, None)
+                for key in (
+                    "transfers",
+                    "checkers",
+                    "buffer_size",
+                    "multi_thread_streams",
+                    "chunk_size",
+                    "tpslimit",
+                    "bwlimit",
+                    "retries",
+                )
+            }
+            if not configure_tuning(
+                remote_name=remote, updates=updates, reset=getattr(args, "reset", False)
+            ):
+                sys.exit(2)
+        elif args.command == "bundle":
+            if not configure_bundle(
+                remote_name=remote,
+                patterns=args.bundle_patterns,
+                shard_size=args.shard_size,
+                clear=args.clear,
+            ):
+                sys.exit(2)
+        elif args.command == "snapshots":
+            if not configure_snapshots(remote_name=remote, layout=args.layout):
+                sys.exit(2)
+        elif args.command == "mount":
+            if args.dry_run:
+                print("Error: mount cannot run with --dry-run.")
+                sys.exit(2)
+            if not mounts.mount_remote(
+                remote,
+                args.mountpoint,
+                remote_path=args.remote_path,
+                cache_size=args.cache_size,
+                writable=args.writable,
+            ):
+                sys.exit(1)
+        elif args.command == "finalize":
+            if not finalize(remote, action=args.action):
+                sys.exit(1)
+        elif args.command == "autotune":
+            if args.dry_run:
+                print("Error: autotune uploads probe data and cannot run with --dry-run.")
+                sys.exit(2)
+            if (
+                autotune_remote(
+                    remote_name=remote,
+                    transfers=args.transfer_levels,
+                    probe_dir=getattr(args, "probe_dir", None),
+                    apply=args.apply,
+                )
+                is None
+            ):
+                sys.exit(1)
 
     elif args.command == "transfer":
         # Remote-to-remote transfer
@@ -764,6 +1425,9 @@ def main():
             dry_run=dry_run,
             verbose=args.verbose,
             transfer_timeout=getattr(args, "transfer_timeout", None),
+            bwlimit=getattr(args, "bwlimit", None),
+            stall_timeout=getattr(args, "stall_timeout", None),
+            stall_floor=getattr(args, "stall_floor", None),
         ):
             sys.exit(1)
 
@@ -777,6 +1441,23 @@ def main():
             list_remotes()
         elif args.command == "types":
             list_supported_remote_types()
+        elif args.command == "daemon":
+            if args.daemon_action == "start":
+                if rcd.ensure_daemon() is None:
+                    sys.exit(1)
+                rcd.daemon_status()
+            elif args.daemon_action == "stop":
+                rcd.stop_daemon()
+            elif not rcd.daemon_status():
+                sys.exit(1)
+        elif args.command == "unmount":
+            if not mounts.unmount(
+                mountpoint=args.mountpoint,
+                remote_name=args.unmount_remote,
+            ):
+                sys.exit(1)
+        elif args.command == "mounts":
+            mounts.mount_status()
         else:
             parser.print_help()
             sys.exit(2)
@@ -0,0 +1,202 @@
+"""
+Filter compilation - Turn include/exclude pattern lists into one rclone filter file.
+
+Passing every pattern as its own ``--include``/``--exclude`` argument makes the
+command line grow with ``--select`` picks, nested remotes and the
+``pyproject.toml`` ignore list, and rclone then evaluates the whole
+unoptimized rule list for every file. Patterns are instead compiled into a
+single ``--filter-from`` file:
+
+- duplicates are removed and ``dir/`` + ``dir/**`` pairs collapse to ``dir/**``
+- rules that can never match because a broader earlier rule already decides
+  every path they cover (``data/**`` shadows ``data/raw/**``) are dropped
+- excludes come first, then includes, then a final ``- **`` when anything is
+  included; an excluded path therefore stays excluded even inside a
+  selection, whatever order rclone would have parsed separate flags in
+
+``FilterMatcher`` evaluates the same rules in Python for local scans that
+should not start an rclone process.
+"""
+
+import pathlib
+import re
+from dataclasses import dataclass
+
+from .paths import safe_name
+
+FILTER_DIR = "./bin/filters"
+_GLOB_CHARS = re.compile(r"[*?\[\]{}]")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One rclone filter rule; ``pattern`` uses rclone glob syntax."""
+
+    include: bool
+    pattern: str
+
+    @property
+    def line(self) -> str:
+        return f"{'+' if self.include else '-'} {self.pattern}"
+
+
+def _normalized(patterns: list[str] | None) -> list[str]:
+    seen: list[str] = []
+    for pattern in patterns or []:
+        text = str(pattern).strip()
+        if text and text not in seen:
+            seen.append(text)
+    # ``dir/`` only matches the directory, which ``dir/**`` matches as well.
+    return [p for p in seen if not (p.endswith("/") and f"{p}**" in seen)]
+
+
+def _literal_dir(pattern: str) -> str | None:
+    """Return ``dir`` for a ``dir/**`` pattern without glob characters."""
+    if not pattern.endswith("/**"):
+        return None
+    directory = pattern[:-3]
+    if not directory.strip("/") or _GLOB_CHARS.search(directory):
+        return None
+    return directory
+
+
+def _shadows(broad: str, narrow: str) -> bool:
+    """True when every path matched by ``narrow`` is also matched by ``broad``."""
+    if broad in {"**", "/**"} or broad == narrow:
+        return True
+    directory = _literal_dir(broad)
+    if directory is None:
+        return False
+    if directory.startswith("/"):
+        # Anchored at the transfer root: only anchored patterns below it.
+        return narrow.startswith(f"{directory}/")
+    # Unanchored: matches below ``dir`` at any depth, including the root.
+    return narrow.lstrip("/").startswith(f"{directory}/")
+
+
+def compile_rules(
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+) -> list[Rule]:
+    """Compile include and exclude patterns into a minimized ordered rule list."""
+    ordered = [Rule(False, p) for p in _normalized(exclude_patterns)] + [
+        Rule(True, p) for p in _normalized(include_patterns)
+    ]
+    rules: list[Rule] = []
+    for rule in ordered:
+        # rclone stops at the first matching rule, so a rule shadowed by any
+        # earlier one is unreachable.
+        if any(_shadows(kept.pattern, rule.pattern) for kept in rules):
+            continue
+        # A later rule of the same kind that is broader makes this one redundant.
+        later = [
+            other
+            for other in ordered[ordered.index(rule) + 1 :]
+            if other.include == rule.include and other.pattern != rule.pattern
+        ]
+        if any(_shadows(other.pattern, rule.pattern) for other in later):
+            continue
+        rules.append(rule)
+    if any(rule.include for rule in rules) and not any(
+        rule.pattern in {"**", "/**"} for rule in rules
+    ):
+        rules.append(Rule(False, "**"))
+    return rules
+
+
+def write_filter_file(
+    rules: list[Rule], name: str, directory: str = FILTER_DIR
+) -> pathlib.Path | None:
+    """Write ``rules`` to ``<directory>/<name>.filter``; None when there are no rules."""
+    if not rules:
+        return None
+    path = pathlib.Path(directory) / f"{safe_name(name, default='transfer')}.filter"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"{rule.line}\n" for rule in rules), encoding="utf-8")
+    return path.resolve()
+
+
+def glob_to_regex(pattern: str) -> re.Pattern:
+    """Translate an rclone glob into a regex matched against ``/``-separated paths."""
+    anchored = pattern.startswith("/")
+    body = pattern.lstrip("/")
+    out: list[str] = []
+    index = 0
+    in_brace = False
+    while index < len(body):
+        char = body[index]
+        if body.startswith("**", index):
+            out.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = body.find("]", index + 1)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                out.append(f"[{body[index + 1 : end]}]")
+                index = end
+        elif char == "{":
+            in_brace = True
+            out.append("(?:")
+        elif char == "}" and in_brace:
+            in_brace = False
+            out.append(")")
+        elif char == "," and in_brace:
+            out.append("|")
+        elif char == "\\" and index + 1 < len(body):
+            index += 1
+            out.append(re.escape(body[index]))
+        else:
+            out.append(re.escape(char))
+        index += 1
+    prefix = "^" if anchored else "(^|/)"
+    return re.compile(f"{prefix}{''.join(out)}$")
+
+
+class FilterMatcher:
+    """Evaluate compiled rules against relative file paths like rclone does."""
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = [(rule.include, glob_to_regex(rule.pattern)) for rule in rules]
+        # Excludes ahead of every include prune whole directories (``dir/`` or
+        # ``...**``); the closing ``- **`` must not prune included trees.
+        self.dir_excludes = []
+        for rule in rules:
+            if rule.include:
+                break
+            if rule.pattern.endswith("/") or rule.pattern.endswith("**"):
+                self.dir_excludes.append(glob_to_regex(rule.pattern))
+
+    def prunes(self, directory: str) -> bool:
+        """Return whether the directory ``directory`` (ending in ``/``) is excluded."""
+        return any(regex.search(directory) for regex in self.dir_excludes)
+
+    def includes(self, relative: str) -> bool:
+        """Return whether ``relative`` (a file path) passes the filter."""
+        path = relative.replace("\\", "/").lstrip("/")
+        parts = path.split("/")
+        for depth in range(1, len(parts)):
+            if self.prunes("/".join(parts[:depth]) + "/"):
+                return False
+        for include, regex in self.rules:
+            if regex.search(path):
+                return include
+        return True
+
+
+class CombinedMatcher:
+    """Union of several matchers, for one scan shared by several transfers."""
+
+    def __init__(self, matchers: list[FilterMatcher]):
+        self.matchers = matchers
+
+    def prunes(self, directory: str) -> bool:
+        return all(matcher.prunes(directory) for matcher in self.matchers)
+
+    def includes(self, relative: str) -> bool:
+        return any(matcher.includes(relative) for matcher in self.matchers)
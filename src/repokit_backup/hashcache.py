@@ -0,0 +1,159 @@
+"""
+Hash cache - Reuse local file digests across runs.
+
+Hashing every local file on each verification costs hours of disk I/O on a
+large project. ``HashCache`` keeps one row per (device, inode, hash type) in
+``./bin/hashcache.sqlite`` with the file's size and mtime at hashing time and
+the binary digest. A cached digest is used only while size and mtime are
+unchanged; any other file is hashed again and its row replaced, so the cache
+stays as large as the set of files hashed. A digest is stored only if the file
+did not change while it was being hashed.
+"""
+
+import os
+import pathlib
+import sqlite3
+import threading
+from typing import Callable
+
+HASH_CACHE_PATH = "./bin/hashcache.sqlite"
+# Cached digests are written in batches of this many rows.
+COMMIT_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    hash_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    PRIMARY KEY (dev, ino, hash_type)
+) WITHOUT ROWID
+"""
+
+
+class HashCache:
+    """
+    SQLite-backed digest cache, safe to share between threads.
+
+    Raises:
+        sqlite3.Error: If the cache file cannot be opened or is not a cache.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] = HASH_CACHE_PATH):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        # (dev, ino, hash_type) -> row not yet written
+        self._pending: dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        try:
+            # WAL lets other processes read while this one writes.
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+        except sqlite3.Error:
+            self._db.close()
+            raise
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def get(self, stat: os.stat_result, hash_type: str) -> str | None:
+        """The cached hex digest of an unchanged file, else None."""
+        key = (stat.st_dev, stat.st_ino, hash_type)
+        with self._lock:
+            pending = self._pending.get(key)
+            row = (
+                pending[3:]
+                if pending is not None
+                else self._db.execute(
+                    "SELECT size, mtime_ns, digest FROM hashes "
+                    "WHERE dev = ? AND ino = ? AND hash_type = ?",
+                    key,
+                ).fetchone()
+            )
+            hit = row is not None and (row[0], row[1]) == (stat.st_size, stat.st_mtime_ns)
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return bytes(row[2]).hex() if hit else None
+
+    def put(self, stat: os.stat_result, hash_type: str, digest: str) -> None:
+        """Remember the hex ``digest`` of the file described by ``stat``."""
+        row = (
+            stat.st_dev,
+            stat.st_ino,
+            hash_type,
+            stat.st_size,
+            stat.st_mtime_ns,
+            bytes.fromhex(digest),
+        )
+        with self._lock:
+            self._pending[row[:3]] = row
+            if len(self._pending) >= COMMIT_EVERY:
+                self._flush()
+
+    def digest(
+        self,
+        path: str | os.PathLike[str],
+        hash_type: str,
+        compute: Callable[[str | os.PathLike[str], str], str],
+        refresh: bool = False,
+    ) -> str:
+        """
+        Hex digest of ``path``: cached when unchanged, otherwise ``compute(path,
+        hash_type)`` and stored. ``refresh`` ignores the cached value.
+        """
+        before = os.stat(path)
+        if not refresh:
+            cached = self.get(before, hash_type)
+            if cached is not None:
+                return cached
+        value = compute(path, hash_type)
+        after = os.stat(path)
+        if (after.st_size, after.st_mtime_ns) == (before.st_size, before.st_mtime_ns):
+            self.put(before, hash_type, value)
+        return value
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                list(self._pending.values()),
+            )
+            self._db.commit()
+        except sqlite3.Error as exc:
+            # A lost batch only means those files are hashed again next time.
+            print(f"[WARN] Could not update hash cache '{self.path}': {exc}")
+        self._pending = {}
+
+    def flush(self) -> None:
+        """Write buffered digests."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._flush()
+            finally:
+                self._db.close()
+
+
+def open_cache(path: str | os.PathLike[str] = HASH_CACHE_PATH) -> HashCache | None:
+    """Open the hash cache, or warn and return None when it is unusable."""
+    try:
+        return HashCache(path)
+    except (sqlite3.Error, OSError) as exc:
+        print(f"[WARN] Hash cache '{path}' unavailable ({exc}); hashing without it.")
+        return None
@@ -0,0 +1,193 @@
+"""
+Transfer journal - Resume interrupted pushes without re-checking the tree.
+
+While a push runs, every file rclone reports as copied or moved is appended to
+``./bin/journal/<remote>.jsonl`` together with the local size and mtime it had
+at that moment. Lines are flushed as they are written, so the journal survives
+a transfer timeout or an HPC scheduler killing the job. A successful push
+deletes the journal; the next push of the same source, destination, operation
+and filters finds the leftover journal and sends rclone only the files still
+pending via ``--files-from`` with ``--no-traverse``.
+"""
+
+import hashlib
+import json
+import pathlib
+import subprocess
+import threading
+from datetime import datetime
+from typing import TextIO
+
+from .paths import safe_name
+from .progress import DONE_PREFIXES
+
+JOURNAL_DIR = "./bin/journal"
+
+
+def transfer_key(
+    src: str,
+    dst: str,
+    operation: str,
+    include_patterns: list[str] | None,
+    exclude_patterns: list[str] | None,
+) -> str:
+    """Fingerprint of a transfer; a journal only resumes the identical transfer."""
+    payload = json.dumps(
+        {
+            "src": str(pathlib.Path(src).resolve()),
+            "dst": dst,
+            "operation": operation,
+            "include": sorted(include_patterns or []),
+            "exclude": sorted(exclude_patterns or []),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def list_files(path: str, args: list[str]) -> list[str]:
+    """
+    List the files below a local path or remote URI, relative to it, with
+    ``rclone lsf``; ``args`` adds filter and config arguments.
+    """
+    completed = subprocess.run(
+        ["rclone", "lsf", "-R", "--files-only", str(path)] + args,
+        check=True,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    return [line for line in completed.stdout.splitlines() if line]
+
+
+class TransferJournal:
+    """Append-only record of files confirmed transferred in one push generation."""
+
+    def __init__(self, remote_name: str, src: str, key: str, directory: str = JOURNAL_DIR):
+        self.remote_name = remote_name
+        self.src = pathlib.Path(src)
+        self.key = key
+        self.path = pathlib.Path(directory) / f"{safe_name(remote_name)}.jsonl"
+        self.pending_path = pathlib.Path(directory) / f"{safe_name(remote_name)}.pending"
+        self.confirmed: dict[str, tuple[int, int]] = {}
+        self.generation: str | None = None
+        self.resumable = False
+        self._handle: TextIO | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(
+        cls,
+        remote_name: str,
+        src: str,
+        dst: str,
+        operation: str,
+        include_patterns: list[str] | None = None,
+        exclude_patterns: list[str] | None = None,
+        directory: str = JOURNAL_DIR,
+    ) -> "TransferJournal":
+        """
+        Load the journal left by an interrupted identical push, or start a new
+        generation (discarding a journal for a different transfer).
+        """
+        key = transfer_key(src, dst, operation, include_patterns, exclude_patterns)
+        journal = cls(remote_name, src, key, directory=directory)
+        journal._load()
+        if not journal.resumable:
+            journal.path.parent.mkdir(parents=True, exist_ok=True)
+            journal.generation = datetime.now().isoformat()
+            header = {"key": key, "generation": journal.generation, "src": str(src), "dst": dst}
+            journal.path.write_text(json.dumps(header) + "\n", encoding="utf-8")
+        journal._handle = open(journal.path, "a", encoding="utf-8")
+        return journal
+
+    def _load(self) -> None:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except json.JSONDecodeError:
+            return
+        if not isinstance(header, dict) or header.get("key") != self.key:
+            return
+        self.generation = header.get("generation")
+        self.resumable = True
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from a killed process.
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("path"), str):
+                self.confirmed[entry["path"]] = (entry.get("size"), entry.get("mtime_ns"))
+
+    def _stat(self, relative: str) -> tuple[int, int] | None:
+        try:
+            stat = (self.src / relative).stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def confirm(self, relative: str, source_stat: tuple[int, int] | None = None) -> None:
+        """Append one transferred file; ``source_stat`` defaults to a fresh local stat."""
+        if source_stat is None:
+            source_stat = self._stat(relative) or (None, None)
+        size, mtime_ns = source_stat
+        with self._lock:
+            if self._handle is None or self.confirmed.get(relative) == (size, mtime_ns):
+                return
+            self.confirmed[relative] = (size, mtime_ns)
+            self._handle.write(
+                json.dumps({"path": relative, "size": size, "mtime_ns": mtime_ns}) + "\n"
+            )
+            self._handle.flush()
+
+    def record(self, record: dict) -> None:
+        """Consume one rclone JSON log record and journal confirmed files."""
+        message = str(record.get("msg", ""))
+        obj = record.get("object")
+        if obj and str(record.get("level", "")).lower() == "info":
+            if message.startswith(DONE_PREFIXES):
+                self.confirm(str(obj))
+
+    def record_transferred(self, items: list[dict]) -> None:
+        """Consume ``core/transferred`` items from the rc API."""
+        for item in items or []:
+            if item.get("error") or item.get("checked") or not item.get("name"):
+                continue
+            self.confirm(str(item["name"]))
+
+    def pending(self, files: list[str]) -> list[str]:
+        """Return ``files`` that are unconfirmed or changed since confirmation."""
+        return [
+            relative
+            for relative in files
+            if relative not in self.confirmed or self._stat(relative) != self.confirmed[relative]
+        ]
+
+    def write_pending(self, files: list[str]) -> pathlib.Path:
+        """Write a ``--files-from`` list next to the journal."""
+        self.pending_path.write_text(
+            "".join(f"{relative}\n" for relative in files), encoding="utf-8"
+        )
+        return self.pending_path.resolve()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def complete(self) -> None:
+        """Finish the generation: the push succeeded, so nothing is left to resume."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.pending_path.unlink(missing_ok=True)
+
+
+def discard(remote_name: str, directory: str = JOURNAL_DIR) -> None:
+    """Drop any journal for ``remote_name`` so the next push starts fresh."""
+    for suffix in (".jsonl", ".pending"):
+        (pathlib.Path(directory) / f"{safe_name(remote_name)}{suffix}").unlink(missing_ok=True)
@@ -0,0 +1,159 @@
+"""
+Push manifests - Compute a push's change set locally.
+
+After every successful push from a local source, the state of each
+transferred file (path, size, mtime, inode) is saved to
+``./bin/manifests/<remote>.json``. The next identical push (same source,
+destination, operation and filters) scans the local tree, compares it with the
+manifest and hands rclone only the added and modified files (``--files-from``
+with ``--no-traverse``), so neither tree has to be listed in full. Files
+deleted locally are removed from the destination with a targeted ``rclone
+delete`` when the operation is ``sync``. When nothing changed, rclone is not
+started at all.
+
+The manifest assumes the destination is only written by these pushes; use
+``push --full-scan`` after changing the remote by other means.
+"""
+
+import json
+import os
+import pathlib
+from dataclasses import dataclass, field
+
+from .filters import CombinedMatcher, FilterMatcher
+from .paths import safe_name
+
+MANIFEST_DIR = "./bin/manifests"
+MANIFEST_VERSION = 1
+
+# path -> (size, mtime_ns, inode)
+Entries = dict[str, tuple[int, int, int]]
+
+
+def scan(
+    src: str | os.PathLike[str], matcher: FilterMatcher | CombinedMatcher | None = None
+) -> Entries:
+    """
+    Stat every regular file below ``src`` that passes ``matcher``.
+
+    Symlinks are skipped, as rclone does by default; directories excluded by
+    the filter are not descended into.
+    """
+    root = pathlib.Path(src)
+    entries: Entries = {}
+    stack = [""]
+    while stack:
+        prefix = stack.pop()
+        try:
+            iterator = os.scandir(root / prefix if prefix else root)
+        except OSError:
+            continue
+        with iterator:
+            for entry in iterator:
+                relative = f"{prefix}{entry.name}"
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir():
+                        if matcher is None or not matcher.prunes(f"{relative}/"):
+                            stack.append(f"{relative}/")
+                        continue
+                    if matcher is not None and not matcher.includes(relative):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries[relative] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    return entries
+
+
+def select(entries: Entries, matcher: FilterMatcher) -> Entries:
+    """Narrow a shared scan to the files that pass one transfer's filter."""
+    return {path: state for path, state in entries.items() if matcher.includes(path)}
+
+
+@dataclass
+class ChangeSet:
+    """Difference between a manifest and the current local tree."""
+
+    added: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+    @property
+    def upload(self) -> list[str]:
+        return sorted(self.added + self.modified)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.modified)} modified, {len(self.deleted)} deleted"
+        )
+
+
+def diff(previous: Entries, current: Entries) -> ChangeSet:
+    """Compare two scans; any change of size, mtime or inode counts as modified."""
+    changes = ChangeSet()
+    for relative, state in current.items():
+        if relative not in previous:
+            changes.added.append(relative)
+        elif tuple(previous[relative]) != state:
+            changes.modified.append(relative)
+    changes.deleted = sorted(set(previous) - set(current))
+    changes.added.sort()
+    changes.modified.sort()
+    return changes
+
+
+class Manifest:
+    """Saved local state of the last successful push of one remote."""
+
+    def __init__(self, remote_name: str, directory: str = MANIFEST_DIR):
+        base = pathlib.Path(directory) / safe_name(remote_name)
+        self.path = base.with_name(f"{base.name}.json")
+        self.upload_path = base.with_name(f"{base.name}.upload")
+        self.delete_path = base.with_name(f"{base.name}.delete")
+
+    def load(self, key: str) -> Entries | None:
+        """Return the saved entries for transfer ``key``, or None if unusable."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return None
+        if data.get("key") != key or not isinstance(data.get("files"), dict):
+            return None
+        return {path: tuple(state) for path, state in data["files"].items()}
+
+    def save(self, key: str, entries: Entries) -> None:
+        """Atomically replace the manifest with ``entries``."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": MANIFEST_VERSION,
+            "key": key,
+            "files": {path: list(state) for path, state in sorted(entries.items())},
+        }
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def write_lists(self, changes: ChangeSet) -> tuple[pathlib.Path, pathlib.Path | None]:
+        """Write ``--files-from`` lists for uploads and (if any) deletions."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.upload_path.write_text(
+            "".join(f"{relative}\n" for relative in changes.upload), encoding="utf-8"
+        )
+        if not changes.deleted:
+            self.delete_path.unlink(missing_ok=True)
+            return self.upload_path.resolve(), None
+        self.delete_path.write_text(
+            "".join(f"{relative}\n" for relative in changes.deleted), encoding="utf-8"
+        )
+        return self.upload_path.resolve(), self.delete_path.resolve()
+
+    def discard(self) -> None:
+        for path in (self.path, self.upload_path, self.delete_path):
+            path.unlink(missing_ok=True)
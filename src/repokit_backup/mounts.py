@@ -0,0 +1,338 @@
+"""
+On-demand mounts - Browse a remote's backup without pulling all of it.
+
+``mount`` starts ``rclone mount`` on the mapped remote path (or the remote
+root) in the background with a full VFS cache: files are downloaded only when
+they are opened, kept under ``./bin/cache/<remote>`` for repeated reads and
+evicted oldest first once the cache exceeds its size cap. Mounts are
+read-only unless ``writable`` is set, which requires the ``full`` policy.
+
+Active mounts are recorded in ``./bin/mounts.json`` with the rclone process
+id, so ``unmount`` and ``mounts`` work across CLI invocations. Entries whose
+process has exited are dropped whenever the state is read.
+"""
+
+import json
+import os
+import pathlib
+import re
+import shutil
+import signal
+import subprocess
+import time
+from datetime import datetime
+
+from .progress import format_bytes
+
+STATE_FILE = "./bin/mounts.json"
+CACHE_DIR = "./bin/cache"
+LOG_DIR = "./bin/mounts"
+DEFAULT_CACHE_SIZE = "10G"
+# Directory listings are cached this long; the remote is a backup, not a live tree.
+DIR_CACHE_TIME = "5m"
+STARTUP_TIMEOUT = 15.0  # seconds
+STOP_TIMEOUT = 10.0  # seconds
+POLL_INTERVAL = 0.2  # seconds
+_SIZE_PATTERN = re.compile(r"^\d+(\.\d+)?[kKMGTP]?$")
+
+
+def validate_cache_size(value: str) -> str:
+    """
+    Validate a VFS cache cap such as ``10G`` or ``500M``.
+
+    Raises:
+        ValueError: If the size is malformed or zero.
+    """
+    text = str(value).strip()
+    if not _SIZE_PATTERN.match(text) or float(text.rstrip("kKMGTP")) <= 0:
+        raise ValueError(f"Invalid cache size '{value}'; use a size such as 500M or 10G.")
+    return text
+
+
+def _read_state(state_path: pathlib.Path) -> dict:
+    try:
+        data = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_state(state_path: pathlib.Path, data: dict) -> None:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_suffix(state_path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    tmp.replace(state_path)
+
+
+def _pid_alive(pid: int | None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user.
+        return True
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _running(mountpoint: str, entry: dict) -> bool:
+    """Whether the rclone process of a recorded mount still runs."""
+    if os.name == "nt":
+        # Signal 0 would terminate the process on Windows; WinFsp removes the
+        # mountpoint when rclone exits.
+        return os.path.exists(mountpoint)
+    return _pid_alive(entry.get("pid"))
+
+
+def _is_mounted(mountpoint: str) -> bool:
+    try:
+        return os.path.ismount(mountpoint)
+    except OSError:
+        return False
+
+
+def active_mounts(state_path: str = STATE_FILE) -> dict[str, dict]:
+    """``mountpoint -> entry`` of the mounts whose rclone process still runs."""
+    path = pathlib.Path(state_path).resolve()
+    state = _read_state(path)
+    active = {
+        mountpoint: entry
+        for mountpoint, entry in state.items()
+        if isinstance(entry, dict) and _running(mountpoint, entry)
+    }
+    if active != state:
+        _write_state(path, active)
+    return active
+
+
+def mount_command(
+    source: str,
+    mountpoint: str,
+    cache_dir: str,
+    cache_size: str = DEFAULT_CACHE_SIZE,
+    writable: bool = False,
+    config_args: list[str] | None = None,
+) -> list[str]:
+    """The ``rclone mount`` command for ``source`` with a size-capped full VFS cache."""
+    command = [
+        "rclone",
+        "mount",
+        source,
+        mountpoint,
+        "--vfs-cache-mode",
+        "full",
+        "--vfs-cache-max-size",
+        cache_size,
+        "--cache-dir",
+        cache_dir,
+        "--dir-cache-time",
+        DIR_CACHE_TIME,
+    ]
+    if not writable:
+        command.append("--read-only")
+    return command + (config_args or [])
+
+
+def _log_tail(log_path: pathlib.Path, lines: int = 5) -> str:
+    try:
+        text = log_path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return ""
+    return "\n".join(text.splitlines()[-lines:])
+
+
+def mount_remote(
+    remote_name: str,
+    mountpoint: str,
+    remote_path: str | None = None,
+    cache_size: str = DEFAULT_CACHE_SIZE,
+    writable: bool = False,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """
+    Mount a remote's mapped path (``remote_path`` overrides it) at ``mountpoint``
+    and wait until the mount is up. Returns False if rclone could not mount.
+    """
+    from . import bundle, snapshots
+    from .rclone import _normalize_explicit_remote_path, _remote_root, _ucloud_config_args
+    from .registry import load_all_registry
+
+    registry = load_all_registry(json_path)
+    key = (remote_name or "").strip().lower()
+    meta = registry.get(key)
+    if not isinstance(meta, dict):
+        print(f"Remote '{remote_name}' not found in registry.")
+        return False
+    if snapshots.snapshot_layout(meta):
+        print(
+            f"Error: '{key}' stores deduplicated snapshots, which cannot be browsed as files; "
+            "use 'pull --snapshot' to restore one."
+        )
+        return False
+    policy = str(meta.get("push_policy", "full")).strip().lower()
+    if writable and policy != "full":
+        print(f"Error: '{key}' has the {policy} policy; a writable mount needs 'full'.")
+        return False
+
+    source = _normalize_explicit_remote_path(key, remote_path) or meta.get("remote_path")
+    if not source:
+        source = _remote_root(key)
+        print(f"Remote '{key}' has no saved remote path; mounting the remote root '{source}'.")
+    config_args = _ucloud_config_args(registry, key, str(source))
+    if config_args is None:
+        return False
+
+    target = pathlib.Path(mountpoint).expanduser().resolve()
+    for active, entry in active_mounts().items():
+        # Two rclone processes must not share one VFS cache directory.
+        if entry.get("remote") == key:
+            print(f"Error: '{key}' is already mounted at '{active}'; unmount it first.")
+            return False
+    if _is_mounted(str(target)):
+        print(f"Error: '{target}' is already a mountpoint.")
+        return False
+    if os.name != "nt":
+        # WinFsp creates the mountpoint itself; FUSE needs an empty directory.
+        try:
+            target.mkdir(parents=True, exist_ok=True)
+            occupied = any(target.iterdir())
+        except OSError as exc:
+            print(f"Error: Cannot use '{target}' as a mountpoint: {exc}")
+            return False
+        if occupied:
+            print(f"Error: Mountpoint '{target}' is not empty.")
+            return False
+
+    cache_dir = (pathlib.Path(CACHE_DIR) / key).resolve()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    log_path = (pathlib.Path(LOG_DIR) / f"{key}.log").resolve()
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    command = mount_command(
+        str(source), str(target), str(cache_dir), cache_size, writable, config_args
+    )
+    popen_kwargs: dict = {}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0) | (
+            getattr(subprocess, "DETACHED_PROCESS", 0)
+        )
+    else:
+        popen_kwargs["start_new_session"] = True
+    try:
+        with open(log_path, "ab") as log_handle:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=log_handle,
+                stderr=log_handle,
+                **popen_kwargs,
+            )
+    except OSError as exc:
+        print(f"Error: Could not start rclone mount: {exc}")
+        return False
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline and process.poll() is None:
+        if _is_mounted(str(target)):
+            break
+        time.sleep(POLL_INTERVAL)
+    if process.poll() is not None or not _is_mounted(str(target)):
+        if process.poll() is None:
+            process.terminate()
+        print(f"Error: rclone could not mount '{source}' at '{target}' (see {log_path}).")
+        tail = _log_tail(log_path)
+        if tail:
+            print(tail)
+        return False
+
+    state_path = pathlib.Path(STATE_FILE).resolve()
+    state = _read_state(state_path)
+    state[str(target)] = {
+        "remote": key,
+        "source": str(source),
+        "pid": process.pid,
+        "cache_dir": str(cache_dir),
+        "cache_size": cache_size,
+        "writable": writable,
+        "started": datetime.now().isoformat(timespec="seconds"),
+    }
+    _write_state(state_path, state)
+    print(
+        f"Mounted '{source}' at '{target}' ({'read-write' if writable else 'read-only'}, "
+        f"cache up to {cache_size} in {cache_dir})."
+    )
+    if bundle.bundle_settings(meta) is not None:
+        print("Note: bundled directories appear as tar shards under .repokit-bundles/.")
+    return True
+
+
+def _force_unmount(mountpoint: str) -> bool:
+    """Unmount with the platform's tool after rclone failed to unmount on exit."""
+    for tool in (["fusermount3", "-u"], ["fusermount", "-u"], ["umount"]):
+        if shutil.which(tool[0]) is None:
+            continue
+        if subprocess.run(tool + [mountpoint], capture_output=True).returncode == 0:
+            return True
+    return False
+
+
+def unmount(
+    mountpoint: str | None = None,
+    remote_name: str | None = None,
+) -> bool:
+    """
+    Unmount one mountpoint, every mount of ``remote_name``, or every mount
+    when both are None. rclone unmounts itself when it is terminated.
+    """
+    mounts = active_mounts()
+    if mountpoint is not None:
+        target = str(pathlib.Path(mountpoint).expanduser().resolve())
+        selected = [target] if target in mounts else []
+    else:
+        key = (remote_name or "").strip().lower()
+        selected = [path for path, entry in mounts.items() if not key or entry.get("remote") == key]
+    if not selected:
+        print("No matching active mounts.")
+        return mountpoint is None and remote_name is None
+
+    unmounted: list[str] = []
+    for target in selected:
+        pid = int(mounts[target]["pid"])
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+        deadline = time.monotonic() + STOP_TIMEOUT
+        while time.monotonic() < deadline and _running(target, mounts[target]):
+            time.sleep(POLL_INTERVAL)
+        if _is_mounted(target) and not _force_unmount(target):
+            print(f"Error: '{target}' is still mounted; close programs that use it and retry.")
+            continue
+        unmounted.append(target)
+        print(f"Unmounted '{target}' ({mounts[target].get('source')}).")
+    state_path = pathlib.Path(STATE_FILE).resolve()
+    state = _read_state(state_path)
+    for target in unmounted:
+        state.pop(target, None)
+    _write_state(state_path, state)
+    return len(unmounted) == len(selected)
+
+
+def mount_status() -> bool:
+    """Print the active mounts with their cache use; returns True if there are any."""
+    mounts = active_mounts()
+    if not mounts:
+        print("No active mounts.")
+        return False
+    for target, entry in sorted(mounts.items()):
+        cache_dir = pathlib.Path(entry.get("cache_dir") or CACHE_DIR)
+        used = sum(path.stat().st_size for path in cache_dir.rglob("*") if path.is_file())
+        print(
+            f"{target}: {entry.get('source')} (pid {entry.get('pid')}, "
+            f"{'read-write' if entry.get('writable') else 'read-only'}, since "
+            f"{entry.get('started')}, cache {format_bytes(used)} of {entry.get('cache_size')})"
+        )
+    return True
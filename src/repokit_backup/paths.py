@@ -0,0 +1,37 @@
+"""
+Path helpers - State file names, remote paths and restore targets.
+"""
+
+import pathlib
+import re
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def safe_name(name: str | None, default: str = "remote", lower: bool = True) -> str:
+    """
+    ``name`` as a file name: characters other than letters, digits, ``.``,
+    ``_`` and ``-`` become ``_``; ``default`` when nothing is left.
+    Remote and state names are lowercased unless ``lower`` is False.
+    """
+    text = (name or "").strip()
+    return _UNSAFE.sub("_", text.lower() if lower else text) or default
+
+
+def join_remote(base: str, *parts: str) -> str:
+    """Join ``parts`` below a remote path or bare remote root (``name:``)."""
+    tail = "/".join(part.strip("/") for part in parts if part)
+    return f"{base.rstrip('/')}/{tail}" if not base.endswith(":") else f"{base}{tail}"
+
+
+def safe_target(root: pathlib.Path, relative: str) -> pathlib.Path:
+    """
+    The local path of ``relative`` below ``root``.
+
+    Raises:
+        ValueError: If ``relative`` (from a bundle index or snapshot) leaves ``root``.
+    """
+    target = (root / relative).resolve()
+    if root.resolve() not in target.parents:
+        raise ValueError(f"Unsafe path outside {root}: {relative}")
+    return target
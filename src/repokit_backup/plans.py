@@ -0,0 +1,161 @@
+"""
+Transfer plans - Save a dry run's change set and execute exactly that set.
+
+``push --dry-run --plan-out plan.json`` asks rclone for a combined report
+(``--combined``) while it compares the trees, and saves the files to copy
+(with their local size and mtime) and the destination files to delete. ``push
+--plan plan.json`` later sends exactly those files with ``--files-from`` and
+``--no-traverse`` and deletes the listed files, so neither tree is listed a
+second time. A plan is rejected when it was made for another transfer or when
+any file to copy changed or vanished since the dry run.
+"""
+
+import json
+import os
+import pathlib
+from datetime import datetime
+
+from .paths import safe_name
+
+PLAN_VERSION = 1
+PLAN_DIR = "./bin/plans"
+# Stale files named in a rejection message; the count is always given.
+_STALE_SHOWN = 10
+
+
+def read_combined(path: str | os.PathLike[str]) -> tuple[list[str], list[str]]:
+    """
+    Parse an rclone ``--combined`` report into ``(copy, delete)``: files
+    missing on or differing from the destination, and files only on it.
+    """
+    copy: list[str] = []
+    delete: list[str] = []
+    for line in pathlib.Path(path).read_text(encoding="utf-8").splitlines():
+        symbol, _sep, relative = line.partition(" ")
+        if not relative:
+            continue
+        if symbol in {"+", "*"}:
+            copy.append(relative)
+        elif symbol == "-":
+            delete.append(relative)
+    return sorted(copy), sorted(delete)
+
+
+def build_plan(
+    remote_name: str,
+    src: str,
+    dst: str,
+    operation: str,
+    key: str,
+    copy: list[str],
+    delete: list[str],
+) -> dict:
+    """Plan of one push, with the local size and mtime of every file to copy."""
+    files = []
+    for relative in copy:
+        try:
+            stat = (pathlib.Path(src) / relative).stat()
+        except OSError:
+            continue
+        files.append({"path": relative, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    return {
+        "version": PLAN_VERSION,
+        "created": datetime.now().isoformat(),
+        "remote": remote_name,
+        "src": str(pathlib.Path(src).resolve()),
+        "dst": dst,
+        "operation": operation,
+        "key": key,
+        "bytes": sum(item["size"] for item in files),
+        "copy": files,
+        "delete": sorted(delete) if operation == "sync" else [],
+    }
+
+
+def save_plan(path: str | os.PathLike[str], plan: dict) -> pathlib.Path:
+    """Atomically write ``plan`` as JSON."""
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(plan, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_plan(path: str | os.PathLike[str]) -> dict:
+    """
+    Read a plan written by ``save_plan``.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If it is not a plan of a supported version.
+    """
+    data = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != PLAN_VERSION
+        or not isinstance(data.get("copy"), list)
+        or not isinstance(data.get("delete"), list)
+    ):
+        raise ValueError(f"'{path}' is not a repokit-backup transfer plan.")
+    return data
+
+
+def check_plan(plan: dict, src: str, dst: str, operation: str, key: str) -> list[str]:
+    """
+    Reasons ``plan`` cannot run as the push of ``src`` to ``dst``; empty when
+    it is still current. Every file to copy must have its planned size and
+    mtime, and no file to delete may exist locally again.
+    """
+    if plan.get("key") != key:
+        expected = {"src": str(pathlib.Path(src).resolve()), "dst": dst, "operation": operation}
+        differing = [name for name, value in expected.items() if plan.get(name) != value]
+        return [
+            f"it was made for a different {', '.join(differing) or 'filter set'} "
+            f"({', '.join(f'{name}={plan.get(name)!r}' for name in differing) or 'filters'})"
+        ]
+    stale = []
+    for item in plan["copy"]:
+        try:
+            stat = (pathlib.Path(src) / item["path"]).stat()
+        except OSError:
+            stale.append(f"{item['path']} (missing)")
+            continue
+        if stat.st_size != item.get("size") or stat.st_mtime_ns != item.get("mtime_ns"):
+            stale.append(f"{item['path']} (changed)")
+    for relative in plan["delete"]:
+        if os.path.lexists(pathlib.Path(src) / relative):
+            stale.append(f"{relative} (recreated)")
+    if not stale:
+        return []
+    shown = ", ".join(stale[:_STALE_SHOWN])
+    more = f" and {len(stale) - _STALE_SHOWN} more" if len(stale) > _STALE_SHOWN else ""
+    return [f"{len(stale)} files changed since the dry run: {shown}{more}"]
+
+
+def write_lists(
+    plan: dict, state_name: str, directory: str = PLAN_DIR
+) -> tuple[pathlib.Path | None, pathlib.Path | None]:
+    """Write ``--files-from`` lists for the plan's copies and deletions (None when empty)."""
+    base = pathlib.Path(directory) / safe_name(state_name)
+    base.parent.mkdir(parents=True, exist_ok=True)
+    lists = []
+    for suffix, files in (
+        ("upload", [item["path"] for item in plan["copy"]]),
+        ("delete", plan["delete"]),
+    ):
+        path = base.with_name(f"{base.name}.{suffix}")
+        if files:
+            path.write_text("".join(f"{relative}\n" for relative in files), encoding="utf-8")
+            lists.append(path.resolve())
+        else:
+            path.unlink(missing_ok=True)
+            lists.append(None)
+    return lists[0], lists[1]
+
+
+def combined_report_path(state_name: str, directory: str = PLAN_DIR) -> pathlib.Path:
+    """Where the dry run's ``--combined`` report is written."""
+    path = pathlib.Path(directory) / f"{safe_name(state_name)}.combined"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.resolve()
@@ -0,0 +1,130 @@
+"""
+Priority restore - Pull a remote in ordered classes, most urgent files first.
+
+A plain pull restores files in whatever order rclone lists them, so code and
+configuration may arrive only after terabytes of bulk data. A prioritized pull
+restores one class of files after another. A class is a list of globs
+(``*.py,*.toml``); each class excludes the globs of the classes before it and
+a final class takes every remaining file, so every file is restored exactly
+once. Without globs, files are classed by size instead: up to 1 MiB, up to
+100 MiB, then the rest.
+
+Each class is one filtered rclone run, so ``sync`` only deletes local files
+within that class. When a class completes it is reported and recorded in
+``./bin/restore/<remote>.json``, so jobs can start as soon as the classes
+they need are in place.
+"""
+
+import json
+import pathlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from .paths import safe_name
+from .progress import TransferResult, format_bytes
+
+RESTORE_DIR = "./bin/restore"
+# Inclusive upper bounds in bytes of the default size classes; a last class
+# takes larger files.
+DEFAULT_SIZE_TIERS = (1024**2, 100 * 1024**2)
+
+
+@dataclass
+class PriorityClass:
+    """One restore class: a filter scope and, for size classes, a size range."""
+
+    label: str
+    include_patterns: list[str] = field(default_factory=list)
+    exclude_patterns: list[str] = field(default_factory=list)
+    # Inclusive ``(min, max)`` bytes; None on either side is unbounded.
+    size_range: tuple[int | None, int | None] | None = None
+
+
+def parse_class(value: str) -> list[str]:
+    """
+    Parse one class of comma-separated globs.
+
+    Raises:
+        ValueError: If the class holds no glob.
+    """
+    globs = [part.strip() for part in str(value).split(",") if part.strip()]
+    if not globs:
+        raise ValueError("a priority class needs at least one glob, e.g. '*.py,*.toml'")
+    return globs
+
+
+def plan_classes(
+    globs: list[list[str]] | None, tiers: tuple[int, ...] = DEFAULT_SIZE_TIERS
+) -> list[PriorityClass]:
+    """Ordered restore classes for glob classes, or the default size classes."""
+    if not globs:
+        classes = []
+        lower = None
+        for upper in tiers:
+            label = (
+                f"files up to {format_bytes(upper)}"
+                if lower is None
+                else f"files of {format_bytes(lower)} to {format_bytes(upper)}"
+            )
+            classes.append(PriorityClass(label, size_range=(lower, upper)))
+            lower = upper + 1
+        classes.append(
+            PriorityClass(f"files over {format_bytes(tiers[-1])}", size_range=(lower, None))
+        )
+        return classes
+    classes = []
+    earlier: list[str] = []
+    for patterns in globs:
+        classes.append(PriorityClass(", ".join(patterns), list(patterns), list(earlier)))
+        earlier += patterns
+    classes.append(PriorityClass("remaining files", [], list(earlier)))
+    return classes
+
+
+def size_args(size_range: tuple[int | None, int | None] | None) -> list[str]:
+    """rclone ``--min-size``/``--max-size`` arguments for an inclusive byte range."""
+    if size_range is None:
+        return []
+    lower, upper = size_range
+    args = []
+    if lower is not None:
+        args += ["--min-size", f"{lower}B"]
+    if upper is not None:
+        args += ["--max-size", f"{upper}B"]
+    return args
+
+
+class RestoreProgress:
+    """Completed classes of a prioritized pull in ``./bin/restore/<remote>.json``."""
+
+    def __init__(
+        self, remote_name: str, classes: list[PriorityClass], directory: str = RESTORE_DIR
+    ):
+        self.path = pathlib.Path(directory) / f"{safe_name(remote_name)}.json"
+        self.data: dict[str, Any] = {
+            "remote": remote_name,
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "finished": None,
+            "classes": [
+                {"class": number, "label": restore_class.label, "completed": None, "ok": None}
+                for number, restore_class in enumerate(classes, start=1)
+            ],
+        }
+        self._write()
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def complete(self, number: int, result: TransferResult) -> None:
+        entry = self.data["classes"][number - 1]
+        entry["completed"] = datetime.now().isoformat(timespec="seconds")
+        entry["ok"] = bool(result.ok)
+        entry["bytes"] = result.bytes
+        entry["files"] = result.files
+        if number == len(self.data["classes"]):
+            self.data["finished"] = entry["completed"]
+        self._write()
@@ -0,0 +1,299 @@
+"""
+Transfer progress - Parse rclone JSON stats and summarize transfer results.
+
+rclone is run with ``--use-json-log --stats 1s --stats-log-level NOTICE`` so
+every log record on stderr is one JSON object and periodic records carry a
+``stats`` object. ``StatsTracker`` consumes that stream incrementally, renders
+a compact progress line, and produces a ``TransferResult``. ERROR records that
+name an object are collected as the transfer's failed files, so a retry pass
+can send exactly those.
+"""
+
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, TextIO
+
+JSON_STATS_ARGS = ["--use-json-log", "--stats", "1s", "--stats-log-level", "NOTICE"]
+_UNITS = ("B", "KiB", "MiB", "GiB", "TiB", "PiB")
+# rclone INFO messages that confirm a file reached the destination.
+DONE_PREFIXES = ("Copied", "Moved", "Multi-thread Copied", "Updated modification time")
+# Failed paths kept in a persisted result; the count is always kept.
+FAILED_LIST_LIMIT = 1000
+
+
+def format_bytes(value: float) -> str:
+    """Format a byte count with binary units, e.g. ``1.5 GiB``."""
+    amount = float(value or 0)
+    for unit in _UNITS:
+        if abs(amount) < 1024 or unit == _UNITS[-1]:
+            return f"{amount:.0f} {unit}" if unit == "B" else f"{amount:.1f} {unit}"
+        amount /= 1024
+    return f"{amount:.1f} {_UNITS[-1]}"
+
+
+def format_duration(seconds: float | None) -> str:
+    """Format seconds as ``1h2m3s``; unknown durations render as ``-``."""
+    if seconds is None:
+        return "-"
+    seconds = int(max(seconds, 0))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes}m{secs}s"
+    if minutes:
+        return f"{minutes}m{secs}s"
+    return f"{secs}s"
+
+
+@dataclass
+class TransferResult:
+    """Outcome of one rclone transfer; truthy when the transfer succeeded."""
+
+    ok: bool
+    bytes: int = 0
+    files: int = 0
+    checks: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    average_speed: float = 0.0
+    peak_speed: float = 0.0
+    failed: list[str] = field(default_factory=list)
+    stalled: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    @property
+    def status(self) -> str:
+        """``ok``, ``partial (n failed)`` when only some files failed, else ``failed``."""
+        if self.ok:
+            return "ok"
+        if self.failed:
+            return f"partial ({len(self.failed)} failed)"
+        return "failed"
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["elapsed"] = round(self.elapsed, 3)
+        data["average_speed"] = round(self.average_speed, 1)
+        data["peak_speed"] = round(self.peak_speed, 1)
+        data["failed"] = self.failed[:FAILED_LIST_LIMIT]
+        data["failed_count"] = len(self.failed)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TransferResult":
+        """Rebuild a result persisted with ``to_dict``, ignoring unknown keys."""
+        known = {key: data[key] for key in cls.__annotations__ if key in data}
+        known.setdefault("ok", False)
+        return cls(**known)
+
+    def summary(self) -> str:
+        failed = f", {len(self.failed)} failed" if self.failed else ""
+        failed += ", stalled" if self.stalled else ""
+        return (
+            f"{format_bytes(self.bytes)}, {self.files} files, {self.checks} checks, "
+            f"{self.errors} errors{failed}, {format_bytes(self.average_speed)}/s avg, "
+            f"{format_bytes(self.peak_speed)}/s peak, {format_duration(self.elapsed)}"
+        )
+
+    @classmethod
+    def of_job(cls, value: object) -> "TransferResult":
+        """The result a job returned, or a failed result if it raised or returned False."""
+        return value if isinstance(value, TransferResult) else cls(ok=False)
+
+    @classmethod
+    def combine(
+        cls, results: list["TransferResult"], elapsed: float | None = None
+    ) -> "TransferResult":
+        """
+        Aggregate several results. ``elapsed`` is the wall-clock span; by default
+        the longest individual transfer is used, which suits concurrent runs.
+
+        Raises:
+            TypeError: If an item is not a ``TransferResult``.
+        """
+        for result in results:
+            if not isinstance(result, TransferResult):
+                raise TypeError(f"Cannot combine {type(result).__name__} with transfer results.")
+        if elapsed is None:
+            elapsed = max((result.elapsed for result in results), default=0.0)
+        total_bytes = sum(result.bytes for result in results)
+        return cls(
+            ok=bool(results) and all(result.ok for result in results),
+            bytes=total_bytes,
+            files=sum(result.files for result in results),
+            checks=sum(result.checks for result in results),
+            errors=sum(result.errors for result in results),
+            elapsed=elapsed,
+            average_speed=total_bytes / elapsed if elapsed > 0 else 0.0,
+            peak_speed=max((result.peak_speed for result in results), default=0.0),
+            failed=sorted({path for result in results for path in result.failed}),
+            stalled=[item for result in results for item in result.stalled],
+        )
+
+
+class ProgressPrinter:
+    """
+    Render progress lines: rewritten in place on a terminal, or appended at a
+    low rate when output is redirected to a log file.
+    """
+
+    def __init__(
+        self,
+        label: str = "",
+        stream: TextIO | None = None,
+        interval: float | None = None,
+    ):
+        self.label = label
+        self.stream = stream or sys.stderr
+        self.interactive = bool(getattr(self.stream, "isatty", lambda: False)())
+        self.interval = interval if interval is not None else (1.0 if self.interactive else 30.0)
+        self._last = 0.0
+        self._dirty = False
+
+    def update(self, text: str) -> None:
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        line = f"[{self.label}] {text}" if self.label else text
+        if self.interactive:
+            self.stream.write(f"\r\033[K{line}")
+            self._dirty = True
+        else:
+            self.stream.write(f"{line}\n")
+        self.stream.flush()
+
+    def finish(self) -> None:
+        if self._dirty:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._dirty = False
+
+
+class StatsTracker:
+    """Incrementally consume rclone JSON log lines and track transfer stats."""
+
+    def __init__(
+        self,
+        printer: ProgressPrinter | None = None,
+        verbose: int = 0,
+        on_record: Callable[[dict], None] | None = None,
+        on_transferred: Callable[[list[dict]], None] | None = None,
+        watchdog=None,
+    ):
+        self.printer = printer
+        self.verbose = verbose
+        self.on_record = on_record
+        self.on_transferred = on_transferred
+        # A ``watchdog.StallWatchdog`` that sees every stats snapshot.
+        self.watchdog = watchdog
+        self.failed: set[str] = set()
+        self.stats: dict = {}
+        self.peak_speed = 0.0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def feed_stats(self, stats: dict) -> None:
+        """Record one rclone stats snapshot (from a log line or ``core/stats``)."""
+        if not isinstance(stats, dict):
+            return
+        with self._lock:
+            self.stats = stats
+            self.peak_speed = max(self.peak_speed, float(stats.get("speed") or 0.0))
+        if self.watchdog is not None:
+            self.watchdog.observe(stats)
+        if self.printer is not None:
+            self.printer.update(self.render())
+
+    def feed(self, line: str) -> dict | None:
+        """
+        Consume one stderr line. Stats are recorded; other records are passed
+        to ``on_record`` and echoed in plain text so warnings and errors stay
+        visible.
+        """
+        text = line.strip()
+        if not text:
+            return None
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError:
+            self._echo(text)
+            return None
+        if not isinstance(record, dict):
+            self._echo(text)
+            return None
+        if "stats" in record:
+            self.feed_stats(record["stats"])
+            return record
+        if self.on_record is not None:
+            self.on_record(record)
+        level = str(record.get("level", "")).lower()
+        self._track_failure(level, record.get("object"), str(record.get("msg", "")))
+        if level in {"error", "critical", "warning", "notice"} or self.verbose > 0:
+            obj = record.get("object")
+            message = str(record.get("msg", "")).strip()
+            self._echo(f"{obj}: {message}" if obj else message)
+        return record
+
+    def _track_failure(self, level: str, obj, message: str) -> None:
+        if not obj:
+            return
+        with self._lock:
+            if level in {"error", "critical"}:
+                self.failed.add(str(obj))
+            elif level == "info" and message.startswith(DONE_PREFIXES):
+                # A later low-level retry of the same file succeeded.
+                self.failed.discard(str(obj))
+
+    def feed_transferred(self, items: list[dict]) -> None:
+        """Consume ``core/transferred`` items from the rc API."""
+        for item in items or []:
+            if item.get("name") and not item.get("checked"):
+                level = "error" if item.get("error") else "info"
+                self._track_failure(level, item["name"], "" if item.get("error") else "Copied")
+        if self.on_transferred is not None:
+            self.on_transferred(items)
+
+    def _echo(self, text: str) -> None:
+        if self.printer is not None:
+            self.printer.finish()
+        print(text)
+
+    def render(self) -> str:
+        stats = self.stats
+        elapsed = float(stats.get("elapsedTime") or 0.0)
+        transfers = int(stats.get("transfers") or 0)
+        files_per_s = transfers / elapsed if elapsed > 0 else 0.0
+        total = stats.get("totalBytes") or 0
+        done = stats.get("bytes") or 0
+        size = f"{format_bytes(done)}/{format_bytes(total)}" if total else format_bytes(done)
+        return (
+            f"{size}, {format_bytes(stats.get('speed') or 0)}/s, "
+            f"{files_per_s:.1f} files/s, ETA {format_duration(stats.get('eta'))}"
+        )
+
+    def result(self, ok: bool) -> TransferResult:
+        if self.printer is not None:
+            self.printer.finish()
+        with self._lock:
+            stats = dict(self.stats)
+            peak = self.peak_speed
+            failed = sorted(self.failed)
+        elapsed = float(stats.get("elapsedTime") or 0.0) or (time.monotonic() - self.started)
+        transferred = int(stats.get("bytes") or 0)
+        return TransferResult(
+            ok=ok,
+            bytes=transferred,
+            files=int(stats.get("transfers") or 0),
+            checks=int(stats.get("checks") or 0),
+            errors=int(stats.get("errors") or 0),
+            elapsed=elapsed,
+            average_speed=transferred / elapsed if elapsed > 0 else 0.0,
+            peak_speed=peak,
+            failed=[] if ok else failed,
+        )
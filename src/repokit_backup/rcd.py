@@ -0,0 +1,414 @@
+"""
+Persistent rclone daemon - Drive rclone operations through one ``rclone rcd``.
+
+Every subprocess invocation of rclone re-reads its config and re-establishes
+SFTP/OAuth sessions. When the ``rcd`` executor is selected, one ``rclone rcd``
+per project is started in the background, bound to a socket under ``./bin``,
+and reused across calls and CLI invocations so its connection pools and
+filesystem cache survive. Callers fall back to the subprocess path whenever
+the daemon is unavailable.
+"""
+
+import base64
+import http.client
+import json
+import os
+import pathlib
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable
+
+EXECUTOR_ENV = "REPOKIT_BACKUP_EXECUTOR"
+EXECUTORS = ("subprocess", "rcd")
+STATE_FILE = "./bin/rclone-rcd.json"
+SOCKET_FILE = "./bin/rclone-rcd.sock"
+LOG_FILE = "./bin/rclone-rcd.log"
+STARTUP_TIMEOUT = 15.0  # seconds
+POLL_INTERVAL = 0.5  # seconds
+# AF_UNIX paths are limited to roughly 104-108 bytes depending on the platform.
+MAX_SOCKET_PATH = 100
+
+# Concurrent pushes share one daemon; only one thread may start it.
+_DAEMON_LOCK = threading.Lock()
+
+
+class RcdError(RuntimeError):
+    """Raised when the rclone daemon rejects or fails an rc call."""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float | None = None):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._socket_path)
+        self.sock = sock
+
+
+class RcdClient:
+    """Minimal JSON client for the rclone remote-control API."""
+
+    def __init__(
+        self,
+        socket_path: str | None = None,
+        port: int | None = None,
+        user: str | None = None,
+        password: str | None = None,
+    ):
+        self.socket_path = socket_path
+        self.port = port
+        self.user = user
+        self.password = password
+
+    def _connection(self, timeout: float | None) -> http.client.HTTPConnection:
+        if self.socket_path:
+            return _UnixHTTPConnection(self.socket_path, timeout=timeout)
+        return http.client.HTTPConnection("127.0.0.1", self.port, timeout=timeout)
+
+    def call(self, method: str, params: dict | None = None, timeout: float | None = 60.0) -> dict:
+        """POST one rc method and return its decoded JSON reply."""
+        body = json.dumps(params or {}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.user and self.password:
+            token = base64.b64encode(f"{self.user}:{self.password}".encode()).decode()
+            headers["Authorization"] = f"Basic {token}"
+        connection = self._connection(timeout)
+        try:
+            connection.request("POST", f"/{method}", body=body, headers=headers)
+            response = connection.getresponse()
+            raw = response.read()
+        except OSError as exc:
+            raise RcdError(f"rclone daemon is not reachable: {exc}") from exc
+        finally:
+            connection.close()
+        try:
+            reply = json.loads(raw.decode("utf-8") or "{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise RcdError(f"rclone daemon returned invalid JSON for '{method}'.") from exc
+        if response.status != 200:
+            message = reply.get("error") if isinstance(reply, dict) else None
+            raise RcdError(message or f"rc call '{method}' failed with HTTP {response.status}.")
+        return reply if isinstance(reply, dict) else {}
+
+    def ping(self) -> bool:
+        try:
+            self.call("rc/noop", timeout=5.0)
+        except RcdError:
+            return False
+        return True
+
+    def to_state(self) -> dict:
+        return {
+            "socket": self.socket_path,
+            "port": self.port,
+            "user": self.user,
+            "password": self.password,
+        }
+
+
+def executor_enabled() -> bool:
+    """Return True when the rcd executor was selected for this process."""
+    return os.environ.get(EXECUTOR_ENV, "subprocess").strip().lower() == "rcd"
+
+
+def _read_state(state_path: pathlib.Path) -> dict:
+    try:
+        data = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_state(state_path: pathlib.Path, data: dict) -> None:
+    tmp = state_path.with_suffix(state_path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    if os.name != "nt":
+        tmp.chmod(0o600)
+    tmp.replace(state_path)
+
+
+def _client_from_state(state: dict) -> RcdClient | None:
+    if not state.get("socket") and not state.get("port"):
+        return None
+    return RcdClient(
+        socket_path=state.get("socket"),
+        port=state.get("port"),
+        user=state.get("user"),
+        password=state.get("password"),
+    )
+
+
+def _free_local_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _listen_args(socket_path: pathlib.Path) -> tuple[list[str], RcdClient]:
+    """Prefer a private unix socket; use authenticated loopback TCP elsewhere."""
+    if hasattr(socket, "AF_UNIX") and len(str(socket_path)) <= MAX_SOCKET_PATH:
+        socket_path.unlink(missing_ok=True)
+        return (
+            ["--rc-addr", f"unix://{socket_path}", "--rc-no-auth"],
+            RcdClient(socket_path=str(socket_path)),
+        )
+    port = _free_local_port()
+    user = "repokit"
+    password = secrets.token_urlsafe(24)
+    return (
+        ["--rc-addr", f"127.0.0.1:{port}", "--rc-user", user, "--rc-pass", password],
+        RcdClient(port=port, user=user, password=password),
+    )
+
+
+def ensure_daemon() -> RcdClient | None:
+    """Return a client for the project daemon, starting one if needed."""
+    with _DAEMON_LOCK:
+        return _ensure_daemon_locked()
+
+
+def _ensure_daemon_locked() -> RcdClient | None:
+    state_path = pathlib.Path(STATE_FILE).resolve()
+    client = _client_from_state(_read_state(state_path))
+    if client is not None and client.ping():
+        return client
+
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    listen_args, client = _listen_args(pathlib.Path(SOCKET_FILE).resolve())
+    command = ["rclone", "rcd", *listen_args, "--fs-cache-expire-duration", "1h"]
+    popen_kwargs: dict = {}
+    if os.name == "nt":
+        popen_kwargs["creationflags"] = getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0) | (
+            getattr(subprocess, "DETACHED_PROCESS", 0)
+        )
+    else:
+        popen_kwargs["start_new_session"] = True
+    try:
+        with open(LOG_FILE, "ab") as log_handle:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=log_handle,
+                stderr=log_handle,
+                **popen_kwargs,
+            )
+    except OSError as exc:
+        print(f"[WARN] Could not start rclone daemon ({exc}); using subprocess execution.")
+        return None
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        if client.ping():
+            _write_state(state_path, {"pid": process.pid, **client.to_state()})
+            return client
+        time.sleep(0.2)
+
+    if process.poll() is None:
+        process.terminate()
+    print(f"[WARN] rclone daemon did not start (see {LOG_FILE}); using subprocess execution.")
+    return None
+
+
+def active_client(*remote_names: str, registry: dict | None = None) -> RcdClient | None:
+    """
+    Return a daemon client when the rcd executor applies to these remotes.
+
+    UCloud remotes use a separate rclone config file, so they always take the
+    subprocess path.
+    """
+    if not executor_enabled():
+        return None
+    registry = registry or {}
+    for name in remote_names:
+        key = (name or "").strip().lower()
+        meta = registry.get(key, {})
+        if key.startswith("ucloud") or (
+            isinstance(meta, dict) and meta.get("remote_type") == "ucloud"
+        ):
+            return None
+    return ensure_daemon()
+
+
+def stop_daemon() -> bool:
+    """Stop the project daemon if one is running."""
+    state_path = pathlib.Path(STATE_FILE).resolve()
+    client = _client_from_state(_read_state(state_path))
+    stopped = False
+    if client is not None and client.ping():
+        try:
+            client.call("core/quit", {"exitCode": 0}, timeout=5.0)
+        except RcdError:
+            # The daemon may close the connection before replying.
+            pass
+        stopped = True
+    state_path.unlink(missing_ok=True)
+    pathlib.Path(SOCKET_FILE).resolve().unlink(missing_ok=True)
+    print("rclone daemon stopped." if stopped else "No rclone daemon is running.")
+    return True
+
+
+def daemon_status() -> bool:
+    """Print whether the project daemon is running and return its state."""
+    state = _read_state(pathlib.Path(STATE_FILE).resolve())
+    client = _client_from_state(state)
+    if client is None or not client.ping():
+        print("rclone daemon: not running")
+        return False
+    try:
+        version = client.call("core/version", timeout=5.0).get("version", "unknown")
+    except RcdError:
+        version = "unknown"
+    address = client.socket_path or f"127.0.0.1:{client.port}"
+    print(f"rclone daemon: running (pid {state.get('pid')}, rclone {version}, {address})")
+    return True
+
+
+def _absolute_fs(path: str) -> str:
+    """Return an rc ``fs`` string; local paths become absolute."""
+    value = str(path)
+    is_drive_path = (
+        sys.platform == "win32" and len(value) > 2 and value[1] == ":" and (value[2] in "\\/")
+    )
+    if ":" in value and not is_drive_path:
+        return value
+    return str(pathlib.Path(value).resolve())
+
+
+def _wait_for_job(
+    client: RcdClient,
+    job_id: int,
+    timeout: float | None,
+    on_stats: Callable[[dict], None] | None = None,
+    on_transferred: Callable[[list[dict]], None] | None = None,
+    watchdog=None,
+) -> dict:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        status = client.call("job/status", {"jobid": job_id})
+        if on_stats is not None:
+            on_stats(client.call("core/stats", {"group": f"job/{job_id}"}))
+        if on_transferred is not None:
+            reply = client.call("core/transferred", {"group": f"job/{job_id}"})
+            on_transferred(reply.get("transferred") or [])
+        if status.get("finished"):
+            return status
+        if deadline is not None and time.monotonic() >= deadline:
+            try:
+                client.call("job/stop", {"jobid": job_id})
+            except RcdError:
+                pass
+            raise TimeoutError(f"rc job {job_id} exceeded {timeout:g} seconds")
+        if watchdog is not None and watchdog.stalled():
+            try:
+                client.call("job/stop", {"jobid": job_id})
+            except RcdError:
+                pass
+            raise watchdog.error()
+        time.sleep(POLL_INTERVAL)
+
+
+def run_transfer(
+    client: RcdClient,
+    operation: str,
+    src: str,
+    dst: str,
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+    dry_run: bool = False,
+    timeout: float | None = None,
+    on_stats: Callable[[dict], None] | None = None,
+    config: dict | None = None,
+    files_from: str | None = None,
+    on_transferred: Callable[[list[dict]], None] | None = None,
+    filter_rules: list[str] | None = None,
+    watchdog=None,
+) -> dict:
+    """
+    Run sync/copy/move as an async rc job and wait for it to finish.
+
+    ``on_stats`` receives the job's ``core/stats`` snapshot and
+    ``on_transferred`` its ``core/transferred`` list on every poll. ``config``
+    adds rc ``_config`` overrides such as ``Transfers``. ``files_from``
+    restricts the job to the listed files without traversing the destination.
+    ``filter_rules`` are ordered ``+ pattern``/``- pattern`` filter lines.
+    The job is stopped with ``watchdog.error()`` raised once ``watchdog``
+    reports a stall.
+    """
+    params: dict = {
+        "srcFs": _absolute_fs(src),
+        "dstFs": _absolute_fs(dst),
+        "_async": True,
+        "_config": {**(config or {}), "DryRun": bool(dry_run)},
+    }
+    rc_filter: dict = {}
+    if files_from:
+        rc_filter["FilesFrom"] = [files_from]
+        params["_config"]["NoTraverse"] = True
+    if include_patterns:
+        rc_filter["IncludeRule"] = list(include_patterns)
+    if exclude_patterns:
+        rc_filter["ExcludeRule"] = list(exclude_patterns)
+    if filter_rules:
+        rc_filter["FilterRule"] = list(filter_rules)
+    if rc_filter:
+        params["_filter"] = rc_filter
+    job_id = client.call(f"sync/{operation}", params)["jobid"]
+    status = _wait_for_job(
+        client,
+        job_id,
+        timeout,
+        on_stats=on_stats,
+        on_transferred=on_transferred,
+        watchdog=watchdog,
+    )
+    if not status.get("success"):
+        raise RcdError(status.get("error") or f"rc job {job_id} failed")
+    return status
+
+
+def list_entries(
+    client: RcdClient,
+    fs: str,
+    recursive: bool = False,
+    include_patterns: list[str] | None = None,
+) -> list[str]:
+    """List ``fs`` like ``rclone lsf``: relative paths with ``/`` on directories."""
+    params: dict = {"fs": _absolute_fs(fs), "remote": "", "opt": {"recurse": bool(recursive)}}
+    if include_patterns:
+        params["_filter"] = {"IncludeRule": list(include_patterns)}
+    items = client.call("operations/list", params, timeout=None).get("list") or []
+    return [f"{item['Path']}/" if item.get("IsDir") else item["Path"] for item in items]
+
+
+def mkdir(client: RcdClient, fs: str) -> None:
+    client.call("operations/mkdir", {"fs": _absolute_fs(fs), "remote": ""})
+
+
+def delete_files(client: RcdClient, fs: str, files_from: str) -> None:
+    """Delete the files of ``fs`` listed in ``files_from`` without listing ``fs``."""
+    client.call(
+        "operations/delete",
+        {
+            "fs": _absolute_fs(fs),
+            "_filter": {"FilesFrom": [files_from]},
+            "_config": {"NoTraverse": True},
+        },
+        timeout=None,
+    )
+
+
+def purge(client: RcdClient, fs: str) -> None:
+    client.call("operations/purge", {"fs": _absolute_fs(fs), "remote": ""}, timeout=None)
+
+
+def list_remotes(client: RcdClient) -> list[str]:
+    return list(client.call("config/listremotes").get("remotes") or [])
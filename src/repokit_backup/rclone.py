@@ -1,10 +1,14 @@
+import functools
 import hashlib
 import os
 import pathlib
 import platform
 import shutil
 import subprocess
+import threading
+import time
 import zipfile
+from typing import Any, Callable
 
 import requests
 
@@ -23,10 +27,45 @@ try:
 except Exception:
     rclone_commit = None
 
+from . import (
+    bundle,
+    filters,
+    journal,
+    manifest,
+    plans,
+    priority,
+    rcd,
+    sharding,
+    snapshots,
+    tuning,
+    versions,
+)
+from .paths import safe_name
+from .progress import (
+    JSON_STATS_ARGS,
+    ProgressPrinter,
+    StatsTracker,
+    TransferResult,
+    format_bytes,
+    format_duration,
+)
 from .registry import update_sync_status, load_registry, load_all_registry
+from .remote_types import normalize_backend, resolve_backend
+from .scheduler import Job, print_summary, resolve_backend_limits, run_jobs
+from .watchdog import DEFAULT_STALL_FLOOR, StallError, StallWatchdog
 
 DEFAULT_TIMEOUT = 600  # seconds
 RCLONE_VERSION = "1.73.2"
+# Failed files are retried in up to RETRY_PASSES passes over exactly those
+# files, waiting RETRY_BACKOFF * 2**n seconds before pass n. rclone itself
+# runs once (--retries 1) instead of repeating the whole transfer, unless the
+# remote's tuning sets ``retries``; dry runs keep rclone's default.
+RETRY_PASSES = 3
+RETRY_BACKOFF = 5.0
+FAILED_DIR = "./bin/failed"
+# A stalled transfer is restarted (resuming where possible) this many times
+# before it is aborted.
+STALL_RESTARTS = 2
 
 # Pin the archives used by automatic installation. This prevents an upstream
 # ``rclone-current`` change from silently changing the executable we run.
@@ -92,6 +131,22 @@ def _is_ucloud_remote(remote_name: str, registry: dict | None = None) -> bool:
     )
 
 
+def _ucloud_config_args(registry: dict, *endpoints: str) -> list[str] | None:
+    """
+    Return ``--config`` args when any endpoint (remote name or URI) is UCloud,
+    ``[]`` otherwise, or None when the UCloud config file is missing.
+    """
+    if not any(
+        _is_ucloud_remote(_remote_name_from_uri(endpoint), registry) for endpoint in endpoints
+    ):
+        return []
+    rclone_conf = pathlib.Path("./bin/rclone_ucloud.conf").resolve()
+    if not rclone_conf.exists():
+        print("[WARN] UCloud rclone config not found in ./bin. Please run set_host_port first.")
+        return None
+    return ["--config", str(rclone_conf)]
+
+
 def _rc_verbose_args(level: int) -> list[str]:
     """Convert verbosity level to rclone args."""
     return ["-" + "v" * min(max(level, 0), 3)] if level > 0 else []
@@ -210,6 +265,156 @@ def install_rclone(install_path: str = "./bin") -> bool:
     return True
 
 
+def _pump_stderr(stream, tracker: StatsTracker) -> None:
+    for line in stream:
+        tracker.feed(line)
+
+
+def _wait_watched(
+    process: subprocess.Popen,
+    command: list[str],
+    timeout: float | None,
+    watchdog: StallWatchdog | None,
+) -> int:
+    """``process.wait(timeout)`` that also raises ``watchdog.error()`` on a stall."""
+    if watchdog is None:
+        return process.wait(timeout=timeout)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        wait = watchdog.poll_interval
+        if deadline is not None:
+            wait = min(wait, max(deadline - time.monotonic(), 0.0))
+        try:
+            return process.wait(timeout=wait)
+        except subprocess.TimeoutExpired:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(command, timeout) from None
+            if watchdog.stalled():
+                raise watchdog.error() from None
+
+
+def _run_rclone_process(
+    command: list[str],
+    tracker: StatsTracker,
+    timeout: float | None = None,
+) -> None:
+    """
+    Run rclone with its JSON log on stderr parsed incrementally by ``tracker``.
+
+    Raises ``subprocess.TimeoutExpired`` after killing rclone when ``timeout``
+    elapses, ``StallError`` after killing it when ``tracker.watchdog`` reports
+    a stall, and ``subprocess.CalledProcessError`` on a nonzero exit status.
+    """
+    process = subprocess.Popen(
+        command,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    reader = threading.Thread(target=_pump_stderr, args=(process.stderr, tracker), daemon=True)
+    reader.start()
+    try:
+        returncode = _wait_watched(process, command, timeout, tracker.watchdog)
+    except (subprocess.TimeoutExpired, StallError):
+        process.kill()
+        process.wait()
+        reader.join()
+        raise
+    reader.join()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+
+
+def _resume_file_list(
+    push_journal: journal.TransferJournal, src: str, filter_args: list[str]
+) -> pathlib.Path | None:
+    """Write the still-pending files of an interrupted push, or None to run in full."""
+    try:
+        files = journal.list_files(src, filter_args)
+    except (subprocess.CalledProcessError, OSError) as exc:
+        print(f"[WARN] Could not list '{src}' to resume ({exc}); running a full transfer.")
+        return None
+    pending = push_journal.pending(files)
+    print(
+        f"Resuming interrupted push (generation {push_journal.generation}): "
+        f"{len(pending)} of {len(files)} files pending."
+    )
+    return push_journal.write_pending(pending)
+
+
+def _failed_list_path(state_name: str) -> pathlib.Path:
+    return pathlib.Path(FAILED_DIR) / f"{safe_name(state_name)}.txt"
+
+
+def _write_failed_list(state_name: str, failed: list[str]) -> pathlib.Path:
+    """Write the failed files of a transfer; also its ``--files-from`` for a retry."""
+    path = _failed_list_path(state_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"{relative}\n" for relative in failed), encoding="utf-8")
+    return path.resolve()
+
+
+def _retry_failed(
+    state_name: str,
+    failed: list[str],
+    run_pass: Callable[[pathlib.Path], tuple[StatsTracker, bool]],
+    passes: int = RETRY_PASSES,
+    backoff: float = RETRY_BACKOFF,
+) -> tuple[list[StatsTracker], list[str]]:
+    """
+    Retry only ``failed`` with exponential backoff. ``run_pass(files_from)``
+    runs one pass and returns ``(tracker, ok)``. Returns the trackers of the
+    passes and the files that still failed.
+    """
+    trackers: list[StatsTracker] = []
+    for attempt in range(passes):
+        delay = backoff * 2**attempt
+        print(f"Retrying {len(failed)} failed files in {delay:g}s (pass {attempt + 1}/{passes}).")
+        time.sleep(delay)
+        tracker, ok = run_pass(_write_failed_list(state_name, failed))
+        trackers.append(tracker)
+        if ok:
+            return trackers, []
+        if not tracker.failed:
+            # The pass failed as a whole; which files are left is unknown.
+            break
+        failed = sorted(tracker.failed)
+    return trackers, failed
+
+
+def _delete_listed(
+    client: rcd.RcdClient | None,
+    dst: str,
+    delete_from: pathlib.Path,
+    config_args: list[str],
+    registry: dict,
+    verbose: int = 0,
+    backup_dir: str | None = None,
+) -> None:
+    """
+    Delete the destination files listed in ``delete_from`` without listing
+    ``dst``; with ``backup_dir`` they are moved there instead.
+    """
+    if backup_dir is not None:
+        subprocess.run(
+            ["rclone", "move", dst, backup_dir, "--files-from", str(delete_from), "--no-traverse"]
+            + _rc_verbose_args(verbose)
+            + config_args,
+            check=True,
+        )
+        return
+    if client is not None:
+        rcd.delete_files(client, tuning.rc_fs(dst, registry), str(delete_from))
+        return
+    subprocess.run(
+        ["rclone", "delete", dst, "--files-from", str(delete_from), "--no-traverse"]
+        + _rc_verbose_args(verbose)
+        + config_args,
+        check=True,
+    )
+
+
 def _rclone_transfer(
     remote_name: str,
     src: str,
@@ -222,10 +427,54 @@ def _rclone_transfer(
     dry_run: bool = False,
     verbose: int = 0,
     transfer_timeout: float | None = None,
-) -> bool:
+    resume: bool = True,
+    incremental: bool = True,
+    bwlimit: str | None = None,
+    local_scan: manifest.Entries | None = None,
+    shard_label: str | None = None,
+    scoped: bool = False,
+    scope_remote: list[str] | None = None,
+    file_list: list[str] | None = None,
+    stall_timeout: float | None = None,
+    stall_floor: float | None = None,
+    plan_out: str | None = None,
+    plan: str | None = None,
+    detect_renames: bool = False,
+    backup_dir: str | None = None,
+    size_range: tuple[int | None, int | None] | None = None,
+) -> TransferResult:
     """
     Transfer files using rclone. Automatically uses ucloud config if remote is ucloud.
 
+    Pushes from a local source keep a journal of confirmed files under
+    ``./bin/journal``. If a previous identical push was interrupted, only the
+    files still pending are sent (``--files-from`` with ``--no-traverse``).
+    Otherwise the local tree is compared with the manifest of the last
+    successful push and only the change set is transferred; rclone is not
+    started when nothing changed.
+
+    The tuning profile of each registered endpoint (backend defaults merged
+    with the registry entry's ``tuning`` overrides) is applied automatically,
+    including a ``bwlimit`` rate or timetable; ``bwlimit`` overrides it.
+
+    rclone runs with JSON logging and periodic stats; a compact progress line
+    (bytes/s, files/s, ETA) is shown while it runs and the parsed totals are
+    returned as a ``TransferResult`` (truthy on success) and recorded in the
+    registry as ``last_result``.
+
+    Files named in rclone's ERROR records are retried on their own (see
+    ``RETRY_PASSES``); files that still fail are listed under ``./bin/failed``
+    and in the result, and the registry status becomes ``partial (n failed)``.
+
+    With ``stall_timeout``, rclone is stopped once it has made no progress for
+    that long (see ``watchdog``) and restarted up to ``STALL_RESTARTS`` times;
+    a push restart sends only the files its journal has not confirmed. The
+    files in flight at the last stall are kept in the result as ``stalled``.
+
+    A dry-run push with ``plan_out`` saves rclone's computed change set as a
+    plan (see ``plans``); a push with ``plan`` checks that plan against the
+    local files and then sends and deletes exactly the planned files.
+
     Args:
         remote_name: Name of the configured remote
         src: Source path (local FS path or rclone remote URI)
@@ -237,6 +486,37 @@ def _rclone_transfer(
         dry_run: If True, show what would be done
         verbose: Verbosity level (0-3)
         transfer_timeout: Optional total process limit in seconds; None is unlimited
+        resume: Resume an interrupted push from its journal; False starts a
+            new journal generation (pushes only)
+        incremental: Push only the changes since the last successful push;
+            False lets rclone compare the full trees (pushes only)
+        bwlimit: rclone bandwidth limit or timetable for this transfer
+        local_scan: ``manifest.scan`` of ``src`` shared with other pushes of
+            the same source; narrowed with this transfer's filters instead of
+            scanning again
+        shard_label: Marks one shard of a sharded transfer; its journal,
+            manifest and filter file are kept apart from the other shards and
+            no sync status is recorded (the caller records the combined one)
+        scoped: ``local_scan`` is the whole scope of this push (a ``--shard``
+            slice); without a usable manifest every file in it is sent with
+            ``--files-from`` rather than a filtered run over the full tree
+        scope_remote: With ``scoped``, the destination files of the scope; a
+            sync without a usable manifest deletes those missing locally
+        file_list: Transfer exactly these source-relative files with
+            ``--files-from``; a sync is run as copy
+        stall_timeout: Seconds without progress after which rclone is
+            stopped; None disables stall detection
+        stall_floor: Throughput in bytes/s below which rclone counts as not
+            progressing (default ``watchdog.DEFAULT_STALL_FLOOR``)
+        plan_out: Write the change set of this dry-run push to this JSON file
+        plan: Execute the change set saved in this JSON file instead of
+            comparing the trees (pushes from a local source only)
+        detect_renames: In an incremental sync, move renamed files on the
+            remote instead of uploading them again (see ``renames``)
+        backup_dir: Move destination files that are replaced or deleted into
+            this remote directory instead of losing them (see ``versions``)
+        size_range: Transfer only files whose size in bytes lies in this
+            inclusive ``(min, max)`` range; None on either side is unbounded
     """
     exclude_patterns = exclude_patterns or []
     include_patterns = include_patterns or []
@@ -244,71 +524,674 @@ def _rclone_transfer(
 
     if operation not in {"sync", "copy", "move"}:
         print("Error: 'operation' must be either 'sync', 'copy', or 'move'")
-        return False
-
-    # Build rclone command
-    include_args = []
-    for pattern in include_patterns:
-        include_args.extend(["--include", pattern])
-
-    exclude_args = []
-    for pattern in exclude_patterns:
-        exclude_args.extend(["--exclude", pattern])
+        return TransferResult(ok=False)
 
     if src_kind not in {"local", "remote"}:
         print(f"Error: Invalid src_kind '{src_kind}'. Must be 'local' or 'remote'.")
-        return False
+        return TransferResult(ok=False)
 
     if src_kind == "local" and not os.path.exists(src):
         print(f"Error: The folder '{src}' does not exist.")
-        return False
+        return TransferResult(ok=False)
+
+    if (plan or plan_out) and (action != "push" or src_kind != "local"):
+        print("Error: Transfer plans apply to pushes from a local source only.")
+        return TransferResult(ok=False)
+    if plan_out and not dry_run:
+        print("Error: A plan can only be written by a dry run.")
+        return TransferResult(ok=False)
+    plan_key = journal.transfer_key(src, dst, operation, include_patterns, exclude_patterns)
+    planned = None
+    if plan:
+        try:
+            planned = plans.load_plan(plan)
+        except (OSError, ValueError) as exc:
+            print(f"Error: Could not read plan '{plan}': {exc}")
+            return TransferResult(ok=False)
+        problems = plans.check_plan(planned, src, dst, operation, plan_key)
+        if problems:
+            print(f"Error: Plan '{plan}' is stale: {'; '.join(problems)}. Run the dry run again.")
+            return TransferResult(ok=False)
 
-    command = (
-        ["rclone", operation, src, dst] + _rc_verbose_args(verbose) + include_args + exclude_args
+    registry = load_all_registry()
+    endpoints = tuning.endpoint_profiles(
+        [_remote_name_from_uri(str(src)), _remote_name_from_uri(str(dst))], registry
     )
 
     # Use ucloud config if applicable
-    if (
-        _is_ucloud_remote(remote_name)
-        or _is_ucloud_remote(_remote_name_from_uri(str(src)))
-        or _is_ucloud_remote(_remote_name_from_uri(str(dst)))
-    ):
-        rclone_conf = pathlib.Path("./bin/rclone_ucloud.conf").resolve()
-        if rclone_conf.exists():
-            command += ["--config", str(rclone_conf)]
+    config_args = _ucloud_config_args(registry, remote_name, str(src), str(dst))
+    if config_args is None:
+        return TransferResult(ok=False)
+    overrides = {"bwlimit": bwlimit} if bwlimit else {}
+    limited = bool(bwlimit) or any("bwlimit" in profile for _backend, profile in endpoints)
+    # The bandwidth limiter of an rcd daemon is shared by all of its jobs, so
+    # bandwidth-limited transfers run as their own rclone process, as do
+    # versioned and size-limited ones (--backup-dir and --min-size/--max-size
+    # are global options as well).
+    client = (
+        None
+        if config_args or limited or plan_out or backup_dir or size_range
+        else rcd.active_client()
+    )
+
+    state_name = f"{remote_name}.{shard_label}" if shard_label else remote_name
+    # All patterns go to rclone as one minimized --filter-from file.
+    filter_rules = filters.compile_rules(include_patterns, exclude_patterns)
+    filter_file = filters.write_filter_file(filter_rules, state_name)
+    filter_args = ["--filter-from", str(filter_file)] if filter_file is not None else []
+
+    push_journal = None
+    push_manifest = None
+    local_state = None
+    changes = None
+    files_from = None
+    delete_from = None
+    resumed = False
+    rclone_operation = operation
+    if planned is not None:
+        files_from, delete_from = plans.write_lists(planned, state_name)
+        print(
+            f"Executing plan '{plan}': {len(planned['copy'])} files "
+            f"({format_bytes(planned.get('bytes', 0))}) to copy, "
+            f"{len(planned['delete'])} to delete."
+        )
+        if dry_run:
+            delete_from = None
+        if operation == "sync":
+            rclone_operation = "copy"
+    elif action == "push" and src_kind == "local" and not dry_run:
+        if not resume:
+            journal.discard(state_name)
+        push_journal = journal.TransferJournal.open(
+            state_name, src, dst, operation, include_patterns, exclude_patterns
+        )
+        if push_journal.resumable:
+            files_from = _resume_file_list(push_journal, src, filter_args)
+        resumed = files_from is not None
+        push_manifest = manifest.Manifest(state_name)
+        matcher = filters.FilterMatcher(filter_rules)
+        if local_scan is not None:
+            local_state = manifest.select(local_scan, matcher)
         else:
-            print("[WARN] UCloud rclone config not found in ./bin. Please run set_host_port first.")
-            return False
+            local_state = manifest.scan(src, matcher)
+        previous = push_manifest.load(push_journal.key) if incremental and not resumed else None
+        if previous is None and scoped and not resumed:
+            # Destination files count as changed, so every local file is sent
+            # and only those missing locally are deleted.
+            previous = dict.fromkeys(scope_remote or [], (-1, -1, -1))
+        if previous is not None:
+            changes = manifest.diff(previous, local_state)
+            if operation != "sync":
+                changes.deleted = []
+            print(f"Incremental push of '{remote_name}': {changes.summary()} since the last push.")
+            if detect_renames and changes.added and changes.deleted:
+                from . import renames
+
+                renames.detect_and_apply(
+                    state_name, changes, previous, local_state, src, dst, config_args
+                )
+            if changes:
+                files_from, delete_from = push_manifest.write_lists(changes)
+        if files_from is not None and operation == "sync":
+            # Send files with copy; deletions are explicit (incremental) or
+            # deferred to the next full sync (resumed).
+            rclone_operation = "copy"
+    if file_list is not None:
+        files_from = sharding.write_file_list(state_name, file_list)
+        if operation == "sync":
+            rclone_operation = "copy"
+
+    # The failed-file retry replaces rclone's whole-run retries where it runs.
+    retry_args = (
+        []
+        if dry_run or any("retries" in profile for _backend, profile in endpoints)
+        else ["--retries", "1"]
+    )
+    # The journal needs rclone's INFO records, which name every copied file.
+    log_level = verbose if push_journal is None else max(verbose, 1)
+
+    def command_for(rclone_op: str, listed: pathlib.Path | None) -> list[str]:
+        command = (
+            ["rclone", rclone_op, src, dst]
+            + _rc_verbose_args(log_level)
+            + JSON_STATS_ARGS
+            + tuning.transfer_args(endpoints, overrides)
+            + retry_args
+            + (
+                ["--files-from", str(listed), "--no-traverse"]
+                if listed is not None
+                else filter_args
+            )
+            + priority.size_args(size_range)
+            + config_args
+        )
+        if backup_dir is not None:
+            command += ["--backup-dir", backup_dir]
+        if dry_run:
+            command.append("--dry-run")
+        if plan_out:
+            command += ["--combined", str(plans.combined_report_path(state_name))]
+        return command
+
+    def new_tracker() -> StatsTracker:
+        return StatsTracker(
+            printer=ProgressPrinter(
+                label=f"{remote_name} {shard_label}" if shard_label else remote_name
+            ),
+            verbose=verbose,
+            on_record=push_journal.record if push_journal is not None else None,
+            on_transferred=(push_journal.record_transferred if push_journal is not None else None),
+            watchdog=(
+                StallWatchdog(stall_timeout, stall_floor or DEFAULT_STALL_FLOOR)
+                if stall_timeout
+                else None
+            ),
+        )
 
-    if dry_run:
-        command.append("--dry-run")
+    def execute(tracker: StatsTracker, rclone_op: str, listed: pathlib.Path | None) -> None:
+        if client is not None:
+            rcd.run_transfer(
+                client,
+                rclone_op,
+                tuning.rc_fs(src, registry),
+                tuning.rc_fs(dst, registry),
+                filter_rules=([rule.line for rule in filter_rules] if listed is None else None),
+                dry_run=dry_run,
+                timeout=transfer_timeout,
+                on_stats=tracker.feed_stats,
+                config=tuning.rc_config(endpoints, overrides),
+                files_from=str(listed) if listed is not None else None,
+                on_transferred=tracker.feed_transferred,
+                watchdog=tracker.watchdog,
+            )
+        else:
+            _run_rclone_process(command_for(rclone_op, listed), tracker, timeout=transfer_timeout)
+
+    def retry_pass(listed: pathlib.Path) -> tuple[StatsTracker, bool]:
+        tracker = new_tracker()
+        try:
+            # A sync must not delete based on a partial list, so retries copy.
+            execute(tracker, "copy" if rclone_operation == "sync" else rclone_operation, listed)
+            return tracker, True
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, TimeoutError) as exc:
+            print(f"Retry pass failed: {exc}")
+        except (rcd.RcdError, StallError) as exc:
+            print(f"Retry pass failed: {exc}")
+        return tracker, False
+
+    def restart_list(listed: pathlib.Path | None) -> pathlib.Path | None:
+        """Files a restart after a stall still has to send; None reruns the scope."""
+        nonlocal resumed
+        if push_journal is None:
+            return listed
+        if listed is None:
+            pending = _resume_file_list(push_journal, src, filter_args)
+            resumed = resumed or pending is not None
+            return pending
+        files = listed.read_text(encoding="utf-8").splitlines()
+        return push_journal.write_pending(push_journal.pending(files))
+
+    def execute_watched(rclone_op: str, listed: pathlib.Path | None) -> None:
+        restarts = 0
+        while True:
+            try:
+                execute(trackers[-1], rclone_op, listed)
+                return
+            except StallError as exc:
+                stalled[:] = exc.in_flight
+                print(f"Transfer '{src}' -> '{dst}' stalled: {exc}.")
+                if dry_run or restarts >= STALL_RESTARTS:
+                    raise
+            restarts += 1
+            listed = restart_list(listed)
+            if listed is not None and rclone_op == "sync":
+                rclone_op = "copy"
+            print(f"Restarting the transfer ({restarts}/{STALL_RESTARTS}).")
+            trackers.append(new_tracker())
+
+    trackers = [new_tracker()]
+    failed: list[str] = []
+    stalled: list[str] = []
+
+    def combined(ok: bool) -> TransferResult:
+        results = [tracker.result(ok=ok) for tracker in trackers]
+        if len(results) == 1:
+            result = results[0]
+        else:
+            result = TransferResult.combine(
+                results, elapsed=sum(result.elapsed for result in results)
+            )
+            result.ok = ok
+        result.failed = [] if ok else failed
+        result.stalled = [] if ok else list(stalled)
+        return result
 
     try:
-        if transfer_timeout is None:
-            subprocess.run(command, check=True)
+        if changes is not None and not changes:
+            print(f"No changes since the last push of '{remote_name}'; rclone not started.")
+        elif changes is not None and not changes.upload:
+            pass
+        elif file_list is not None and not file_list:
+            print(f"No files to transfer for '{state_name}'; rclone not started.")
+        elif planned is not None and files_from is None:
+            print(f"Plan '{plan}' copies no files; rclone not started.")
         else:
-            subprocess.run(command, check=True, timeout=transfer_timeout)
+            try:
+                execute_watched(rclone_operation, files_from)
+            except (subprocess.CalledProcessError, rcd.RcdError) as exc:
+                if dry_run or not trackers[-1].failed:
+                    raise
+                print(f"{len(trackers[-1].failed)} files failed in '{src}' -> '{dst}': {exc}")
+                retries, failed = _retry_failed(state_name, sorted(trackers[-1].failed), retry_pass)
+                trackers.extend(retries)
+                if failed:
+                    raise
+                if rclone_operation == "sync":
+                    # rclone skipped every deletion after the first error and
+                    # the retries only copied, so one more sync applies them.
+                    print(f"Running a final sync of '{src}' -> '{dst}' to apply deletions.")
+                    trackers.append(new_tracker())
+                    execute_watched("sync", files_from)
+        if delete_from is not None:
+            _delete_listed(client, dst, delete_from, config_args, registry, verbose, backup_dir)
+        result = combined(ok=True)
+        _failed_list_path(state_name).unlink(missing_ok=True)
         verb = {"sync": "synchronized", "copy": "copied", "move": "moved (deleted at origin)"}.get(
             operation, operation
         )
-        print(f"Transfer '{src}' -> '{dst}' successfully {verb}.")
-        update_sync_status(remote_name, action=action, operation=operation, success=True)
-        return True
-    except subprocess.TimeoutExpired:
+        print(f"Transfer '{src}' -> '{dst}' successfully {verb} ({result.summary()}).")
+        if resumed and operation == "sync":
+            print("Resumed sync: remote deletions are applied by the next full push.")
+        if planned is not None and not dry_run:
+            # Files outside the plan may have changed; the next push compares in full.
+            manifest.Manifest(state_name).discard()
+        if plan_out:
+            copy, delete = plans.read_combined(plans.combined_report_path(state_name))
+            saved_plan = plans.build_plan(remote_name, src, dst, operation, plan_key, copy, delete)
+            saved = plans.save_plan(plan_out, saved_plan)
+            print(
+                f"Plan saved to {saved}: {len(saved_plan['copy'])} files "
+                f"({format_bytes(saved_plan['bytes'])}) to copy, "
+                f"{len(saved_plan['delete'])} to delete. Execute it with --plan {saved}."
+            )
+    except (subprocess.TimeoutExpired, TimeoutError):
+        result = combined(ok=False)
         print(
             f"Transfer '{src}' -> '{dst}' exceeded the configured total transfer timeout "
             f"of {transfer_timeout:g} seconds. Rerun the transfer to continue."
         )
-        update_sync_status(remote_name, action=action, operation=operation, success=False)
-        return False
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to {operation} transfer '{src}' -> '{dst}': {e}")
-        update_sync_status(remote_name, action=action, operation=operation, success=False)
-        return False
+    except StallError:
+        result = combined(ok=False)
+        print(
+            f"Transfer '{src}' -> '{dst}' aborted after stalling {STALL_RESTARTS + 1} times. "
+            "Rerun the transfer to continue."
+        )
+    except (subprocess.CalledProcessError, rcd.RcdError) as e:
+        result = combined(ok=False)
+        if failed:
+            path = _write_failed_list(state_name, failed)
+            print(
+                f"Transfer '{src}' -> '{dst}' finished with {len(failed)} failed files "
+                f"after {RETRY_PASSES} retry passes; list saved to {path}."
+            )
+        else:
+            print(f"Failed to {operation} transfer '{src}' -> '{dst}': {e}")
     except Exception as e:
+        result = combined(ok=False)
         print(f"An unexpected error occurred: {e}")
-        update_sync_status(remote_name, action=action, operation=operation, success=False)
+    if push_manifest is not None and result.ok:
+        if resumed and operation == "sync":
+            # Force the next push to run in full so deferred deletions are applied.
+            push_manifest.discard()
+        else:
+            push_manifest.save(push_journal.key, local_state)
+    if push_journal is not None:
+        if result.ok:
+            push_journal.complete()
+        else:
+            push_journal.close()
+            print(
+                f"Journal kept with {len(push_journal.confirmed)} confirmed files; "
+                "rerun the push to resume with only the pending files."
+            )
+    if shard_label is None:
+        update_sync_status(
+            remote_name,
+            action=action,
+            operation=operation,
+            success=result.ok,
+            result=result.to_dict(),
+        )
+    return result
+
+
+def _sharded_transfer(shards: int = 1, **transfer_kwargs) -> TransferResult:
+    """
+    Run ``_rclone_transfer`` as ``shards`` concurrent rclone processes over
+    size-balanced parts of the source and record the combined result.
+    """
+    if shards <= 1:
+        return _rclone_transfer(**transfer_kwargs)
+    remote_name = transfer_kwargs["remote_name"]
+    src, dst = str(transfer_kwargs["src"]), str(transfer_kwargs["dst"])
+    include_patterns = transfer_kwargs.get("include_patterns") or []
+    exclude_patterns = transfer_kwargs.get("exclude_patterns") or []
+    rules = filters.compile_rules(include_patterns, exclude_patterns)
+    if transfer_kwargs.get("src_kind", "local") == "local":
+        matcher = filters.FilterMatcher(rules)
+        local_scan = transfer_kwargs.get("local_scan")
+        entries = (
+            manifest.select(local_scan, matcher)
+            if local_scan is not None
+            else manifest.scan(src, matcher)
+        )
+        index = sharding.local_size_index(entries)
+        # Every shard narrows this scan instead of scanning the source again.
+        transfer_kwargs["local_scan"] = entries
+    else:
+        config_args = _ucloud_config_args(load_all_registry(), remote_name, src, dst)
+        if config_args is None:
+            return TransferResult(ok=False)
+        filter_file = filters.write_filter_file(rules, f"{remote_name}.sizes")
+        index = sharding.remote_size_index(
+            remote_name,
+            src,
+            ["--filter-from", str(filter_file)] if filter_file is not None else [],
+            config_args,
+        )
+    if not index:
+        print(f"Sharding '{remote_name}' skipped: no size index; running one transfer.")
+        return _rclone_transfer(**transfer_kwargs)
+
+    units = sharding.plan_units(index, shards)
+    bins = sharding.pack(units, shards)
+    groups = [bins[0]] + [group for group in bins[1:] if group]
+    scopes = sharding.shard_filters(bins)
+    jobs: list[Job] = []
+    for number, (group, (shard_include, shard_exclude)) in enumerate(zip(groups, scopes), start=1):
+        label = f"shard-{number}-of-{len(scopes)}"
+        shard_bytes = sum(units[unit] for unit in group)
+        print(f"{remote_name} {label}: {len(group)} units, ~{format_bytes(shard_bytes)}")
+        run = functools.partial(
+            _rclone_transfer,
+            **{
+                **transfer_kwargs,
+                "include_patterns": include_patterns + shard_include,
+                "exclude_patterns": exclude_patterns + shard_exclude,
+                "incremental": False,
+                "shard_label": label,
+            },
+        )
+        jobs.append(Job(name=f"{remote_name} {label}", backend="shard", run=run))
+
+    started = time.monotonic()
+    outcomes = run_jobs(jobs, max_jobs=len(jobs), backend_limits={})
+    print_summary(outcomes, action=f"{remote_name} sharded {transfer_kwargs.get('action', 'push')}")
+    result = TransferResult.combine(
+        [TransferResult.of_job(outcome.result) for outcome in outcomes],
+        elapsed=time.monotonic() - started,
+    )
+    result.ok = all(outcome.ok for outcome in outcomes)
+    update_sync_status(
+        remote_name,
+        action=transfer_kwargs.get("action", "push"),
+        operation=transfer_kwargs.get("operation", "sync"),
+        success=result.ok,
+        result=result.to_dict(),
+    )
+    return result
+
+
+def _list_filtered(
+    path: str, rules: list[filters.Rule], name: str, config_args: list[str]
+) -> list[str]:
+    """Files below ``path`` that pass ``rules``; raises CalledProcessError or OSError."""
+    filter_file = filters.write_filter_file(rules, name)
+    filter_args = ["--filter-from", str(filter_file)] if filter_file is not None else []
+    return journal.list_files(path, filter_args + config_args)
+
+
+def _slice_needs_listing(label: str, transfer_kwargs: dict) -> bool:
+    """True for a sliced sync push that has no usable manifest to find deletions."""
+    if transfer_kwargs.get("operation", "sync") != "sync":
         return False
+    if transfer_kwargs.get("action", "push") != "push":
+        return False
+    if not transfer_kwargs.get("incremental", True):
+        return True
+    key = journal.transfer_key(
+        str(transfer_kwargs["src"]),
+        str(transfer_kwargs["dst"]),
+        "sync",
+        transfer_kwargs.get("include_patterns") or [],
+        transfer_kwargs.get("exclude_patterns") or [],
+    )
+    return manifest.Manifest(f"{transfer_kwargs['remote_name']}.{label}").load(key) is None
+
+
+def _remote_slice(
+    label: str, slice_spec: tuple[int, int], rules: list[filters.Rule], transfer_kwargs: dict
+) -> list[str]:
+    """
+    The destination files of a slice, listed once for its first sync; empty
+    (with a warning) when the destination cannot be listed.
+    """
+    index, count = slice_spec
+    remote_name, src, dst = (
+        transfer_kwargs["remote_name"],
+        str(transfer_kwargs["src"]),
+        str(transfer_kwargs["dst"]),
+    )
+    config_args = _ucloud_config_args(load_all_registry(), remote_name, src, dst) or []
+    try:
+        files = _list_filtered(dst, rules, f"{remote_name}.{label}.remote", config_args)
+    except subprocess.CalledProcessError as exc:
+        if exc.returncode == 3:
+            # The destination does not exist yet.
+            return []
+        files = None
+    except OSError:
+        files = None
+    if files is None:
+        print(
+            f"[WARN] Could not list '{dst}' for {label}; remote files deleted locally stay "
+            "until the next sync without --shard."
+        )
+        return []
+    own = [path for path in files if sharding.slice_of(path, count) == index]
+    print(f"{remote_name} {label}: no manifest yet; {len(own)} remote files in the slice.")
+    return own
+
+
+def _sliced_transfer(slice_spec: tuple[int, int], **transfer_kwargs) -> TransferResult:
+    """
+    Run slice ``i`` of ``N`` of a transfer: only the files whose stable path
+    hash falls into the slice, recorded for ``finalize`` instead of the registry.
+    """
+    index, count = slice_spec
+    remote_name = transfer_kwargs["remote_name"]
+    src, dst = str(transfer_kwargs["src"]), str(transfer_kwargs["dst"])
+    label = f"slice-{index}-of-{count}"
+    rules = filters.compile_rules(
+        transfer_kwargs.get("include_patterns"), transfer_kwargs.get("exclude_patterns")
+    )
+    if transfer_kwargs.get("src_kind", "local") == "local":
+        matcher = filters.FilterMatcher(rules)
+        local_scan = transfer_kwargs.get("local_scan")
+        entries = (
+            manifest.select(local_scan, matcher)
+            if local_scan is not None
+            else manifest.scan(src, matcher)
+        )
+        own = {
+            path: state
+            for path, state in entries.items()
+            if sharding.slice_of(path, count) == index
+        }
+        print(f"{remote_name} {label}: {len(own)} of {len(entries)} files")
+        scope: dict[str, Any]
+        if transfer_kwargs.get("dry_run"):
+            scope = {"file_list": sorted(own)}
+        else:
+            scope = {"local_scan": own, "scoped": True}
+            if _slice_needs_listing(label, transfer_kwargs):
+                scope["scope_remote"] = _remote_slice(label, slice_spec, rules, transfer_kwargs)
+        result = _rclone_transfer(**{**transfer_kwargs, **scope, "shard_label": label})
+    else:
+        config_args = _ucloud_config_args(load_all_registry(), remote_name, src, dst)
+        if config_args is None:
+            result = TransferResult(ok=False)
+        else:
+            try:
+                files = _list_filtered(src, rules, f"{remote_name}.{label}.list", config_args)
+            except (subprocess.CalledProcessError, OSError) as exc:
+                print(f"Could not list '{src}' for {label}: {exc}")
+                files = None
+            if files is None:
+                result = TransferResult(ok=False)
+            else:
+                listed = [path for path in files if sharding.slice_of(path, count) == index]
+                print(f"{remote_name} {label}: {len(listed)} of {len(files)} files")
+                result = _rclone_transfer(
+                    **{**transfer_kwargs, "file_list": listed, "shard_label": label}
+                )
+    sharding.record_slice(
+        remote_name,
+        transfer_kwargs.get("action", "push"),
+        transfer_kwargs.get("operation", "sync"),
+        slice_spec,
+        result,
+    )
+    return result
+
+
+def _prioritized_transfer(
+    classes: list[priority.PriorityClass], **transfer_kwargs
+) -> TransferResult:
+    """
+    Run ``_rclone_transfer`` once per priority class, in order, reporting each
+    class as it completes, and record the combined result.
+    """
+    remote_name = transfer_kwargs["remote_name"]
+    include_patterns = transfer_kwargs.get("include_patterns") or []
+    exclude_patterns = transfer_kwargs.get("exclude_patterns") or []
+    dry_run = transfer_kwargs.get("dry_run", False)
+    progress = None if dry_run else priority.RestoreProgress(remote_name, classes)
+    started = time.monotonic()
+    results: list[TransferResult] = []
+    for number, restore_class in enumerate(classes, start=1):
+        label = f"class-{number}-of-{len(classes)}"
+        print(f"{remote_name} {label}: {restore_class.label}")
+        result = _rclone_transfer(
+            **{
+                **transfer_kwargs,
+                "include_patterns": include_patterns + restore_class.include_patterns,
+                "exclude_patterns": exclude_patterns + restore_class.exclude_patterns,
+                "size_range": restore_class.size_range,
+                "shard_label": label,
+            }
+        )
+        results.append(result)
+        # Later classes still run after a failed one; the failure is reported
+        # and recorded in the combined status.
+        if progress is not None:
+            progress.complete(number, result)
+        print(
+            f"{remote_name} {label} ({restore_class.label}) {result.status} after "
+            f"{format_duration(time.monotonic() - started)}: {format_bytes(result.bytes)} in "
+            f"{result.files} files."
+        )
+    result = TransferResult.combine(results, elapsed=time.monotonic() - started)
+    if progress is not None:
+        print(f"Restore progress of '{remote_name}' recorded in {progress.path}.")
+    update_sync_status(
+        remote_name,
+        action=transfer_kwargs.get("action", "pull"),
+        operation=transfer_kwargs.get("operation", "sync"),
+        success=result.ok,
+        result=result.to_dict(),
+    )
+    return result
+
+
+def _scoped_transfer(
+    shards: int = 1,
+    slice_spec: tuple[int, int] | None = None,
+    priority_classes: list[priority.PriorityClass] | None = None,
+    **transfer_kwargs,
+) -> TransferResult:
+    """
+    Run one mapping as a ``--shard i/N`` slice, ``--shards N`` shards, in
+    priority classes or whole.
+    """
+    if slice_spec is not None:
+        return _sliced_transfer(slice_spec, **transfer_kwargs)
+    if priority_classes:
+        return _prioritized_transfer(priority_classes, **transfer_kwargs)
+    return _sharded_transfer(shards=shards, **transfer_kwargs)
+
+
+def _bundled_transfer(settings: tuple[list[str], int] | None, **transfer_kwargs) -> TransferResult:
+    """
+    Run ``_rclone_transfer`` after packing (push) or unpacking (pull) the
+    remote's small-file bundles; bundled directories are excluded from the
+    main transfer. ``settings`` is ``bundle.bundle_settings`` of the remote.
+    A push that executes a saved plan only applies the plan; the bundles are
+    left as they are, but their excludes still apply so the plan matches.
+    """
+    remote_name = transfer_kwargs["remote_name"]
+    src, dst = transfer_kwargs["src"], transfer_kwargs["dst"]
+    config_args = _ucloud_config_args(load_all_registry(), remote_name, str(src), str(dst))
+    if config_args is None:
+        return TransferResult(ok=False)
+    slice_spec = transfer_kwargs.get("slice_spec")
+    # Of N independent slices, only the first packs or unpacks the bundles.
+    transfer = (slice_spec is None or slice_spec[0] == 1) and not transfer_kwargs.get("plan")
+    if transfer_kwargs["action"] == "push":
+        patterns, shard_size = settings
+        bundles_ok, excludes = bundle.push_bundles(
+            remote_name,
+            src,
+            dst,
+            patterns,
+            shard_size=shard_size,
+            config_args=config_args,
+            dry_run=transfer_kwargs.get("dry_run", False),
+            transfer=transfer,
+            exclude_patterns=transfer_kwargs.get("exclude_patterns"),
+        )
+    else:
+        bundles_ok, excludes = bundle.pull_bundles(
+            remote_name,
+            src,
+            dst,
+            config_args=config_args,
+            dry_run=transfer_kwargs.get("dry_run", False),
+            transfer=transfer,
+        )
+    transfer_kwargs["exclude_patterns"] = sorted(
+        set(transfer_kwargs.get("exclude_patterns") or []) | set(excludes)
+    )
+    result = _scoped_transfer(**transfer_kwargs)
+    if not bundles_ok and result.ok:
+        result.ok = False
+        if slice_spec is not None:
+            sharding.record_slice(
+                remote_name,
+                transfer_kwargs["action"],
+                transfer_kwargs.get("operation", "sync"),
+                slice_spec,
+                result,
+            )
+        else:
+            update_sync_status(
+                remote_name,
+                action=transfer_kwargs["action"],
+                operation=transfer_kwargs.get("operation", "sync"),
+                success=False,
+                result=result.to_dict(),
+            )
+    return result
 
 
 def _normalize_select_subpath(select_path: str | None) -> str:
@@ -522,20 +1405,26 @@ def _list_top_level_entries(src: str, src_kind: str, remote_name: str) -> list[s
         return entries
 
     cmd = ["rclone", "lsf", src, "--max-depth", "1"]
+    client = None
     if _is_ucloud_remote(remote_name) or _is_ucloud_remote(_remote_name_from_uri(str(src))):
         rclone_conf = pathlib.Path("./bin/rclone_ucloud.conf").resolve()
         if rclone_conf.exists():
             cmd += ["--config", str(rclone_conf)]
+    else:
+        client = rcd.active_client()
     try:
-        result = subprocess.run(
-            cmd,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=DEFAULT_TIMEOUT,
-        )
-        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        if client is not None:
+            lines = rcd.list_entries(client, src)
+        else:
+            result = subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=DEFAULT_TIMEOUT,
+            )
+            lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
         return sorted(lines, key=lambda s: (not s.endswith("/"), s.lower()))
     except Exception as e:
         print(f"Failed to list source entries for interactive selection: {e}")
@@ -650,11 +1539,14 @@ def _exclude_patterns(local_path: str) -> list[str]:
     return []
 
 
-def _nested_remote_excludes(remote_name: str, local_path: str, registry: dict) -> list[str]:
+def _nested_remote_excludes(
+    remote_name: str, local_path: str, registry: dict, root: pathlib.Path | None = None
+) -> list[str]:
     """
     Build exclude patterns for nested child remotes.
     If current remote maps to /project and another remote maps to /project/data,
     then current remote excludes data/** so ownership is delegated to the child.
+    Relative local paths are resolved against ``root`` (default: the cwd).
     """
     current_root = pathlib.Path(local_path).resolve()
     excludes: list[str] = []
@@ -667,7 +1559,7 @@ def _nested_remote_excludes(remote_name: str, local_path: str, registry: dict) -
         other_local = meta.get("local_path")
         if not other_local:
             continue
-        other_root = pathlib.Path(str(other_local)).resolve()
+        other_root = (pathlib.Path(root or ".") / str(other_local)).resolve()
         if other_root == current_root:
             continue
 
@@ -686,6 +1578,127 @@ def _nested_remote_excludes(remote_name: str, local_path: str, registry: dict) -
     return sorted(set(excludes))
 
 
+def _remote_backend(remote_key: str, registry: dict) -> str:
+    """Return the canonical backend recorded for a remote, inferring it for legacy entries."""
+    meta = registry.get(remote_key, {}) if isinstance(registry, dict) else {}
+    backend = normalize_backend(meta.get("remote_type")) if isinstance(meta, dict) else None
+    return backend or resolve_backend(None, remote_key)
+
+
+def _planned_job(
+    name: str, backend: str, run: Callable[..., TransferResult], transfer_kwargs: dict
+) -> Job:
+    """
+    A job calling ``run`` with ``transfer_kwargs`` as they are when it starts,
+    so ``_fan_out`` can still add a shared ``local_scan`` after planning.
+    """
+    return Job(name=name, backend=backend, run=lambda: run(**transfer_kwargs))
+
+
+def _source_groups(planned: list[tuple[Job, dict]]) -> dict[str, list[tuple[Job, dict]]]:
+    """Group planned pushes by their resolved local source."""
+    groups: dict[str, list[tuple[Job, dict]]] = {}
+    for job, kwargs in planned:
+        key = str(pathlib.Path(kwargs["src"]).resolve())
+        groups.setdefault(key, []).append((job, kwargs))
+    return groups
+
+
+def _fan_out(planned: list[tuple[Job, dict]], dry_run: bool) -> list[tuple[Job, dict]]:
+    """
+    Scan each local source shared by several pushes once and hand the scan
+    to every push of that source; pushes are reordered so a group runs together.
+    """
+    ordered: list[tuple[Job, dict]] = []
+    for src, group in _source_groups(planned).items():
+        if len(group) > 1 and not dry_run:
+            matcher = filters.CombinedMatcher(
+                [
+                    filters.FilterMatcher(
+                        filters.compile_rules(
+                            kwargs.get("include_patterns"), kwargs.get("exclude_patterns")
+                        )
+                    )
+                    for _job, kwargs in group
+                ]
+            )
+            local_scan = manifest.scan(src, matcher)
+            print(
+                f"Fan-out: scanned '{src}' once ({len(local_scan)} files) for "
+                f"{', '.join(job.name for job, _kwargs in group)}."
+            )
+            for _job, kwargs in group:
+                kwargs["local_scan"] = local_scan
+        ordered.extend(group)
+    return ordered
+
+
+def _snapshot_transfer(
+    remote_name: str,
+    src: str,
+    dst: str,
+    action: str = "push",
+    operation: str = "sync",
+    exclude_patterns: list[str] | None = None,
+    dry_run: bool = False,
+    snapshot_id: str | None = None,
+    local_scan: manifest.Entries | None = None,
+    **_options,
+) -> TransferResult:
+    """
+    Push a snapshot to, or restore one from, a remote with the ``snapshots``
+    storage layout (see ``snapshots``); rclone transfer options do not apply.
+    """
+    config_args = _ucloud_config_args(load_all_registry(), remote_name, str(src), str(dst))
+    if config_args is None:
+        return TransferResult(ok=False)
+    if action == "push":
+        result = snapshots.push_snapshot(
+            remote_name,
+            src,
+            dst,
+            exclude_patterns=exclude_patterns,
+            config_args=config_args,
+            dry_run=dry_run,
+            local_scan=local_scan,
+        )
+    else:
+        result = snapshots.pull_snapshot(
+            remote_name, src, dst, snapshot_id, config_args=config_args, dry_run=dry_run
+        )
+    update_sync_status(
+        remote_name,
+        action=action,
+        operation=operation,
+        success=result.ok,
+        result=result.to_dict(),
+    )
+    return result
+
+
+def _snapshot_conflicts(
+    operation: str,
+    search_pattern: str | None = None,
+    select_path: str | None = None,
+    slice_spec: tuple[int, int] | None = None,
+    plan: str | None = None,
+    plan_out: str | None = None,
+) -> list[str]:
+    """Options that cannot be used with the ``snapshots`` storage layout."""
+    return [
+        name
+        for name, used in (
+            ("--mode move", operation == "move"),
+            ("--search", bool(search_pattern)),
+            ("--select", select_path is not None),
+            ("--shard", slice_spec is not None),
+            ("--plan", bool(plan)),
+            ("--plan-out", bool(plan_out)),
+        )
+        if used
+    ]
+
+
 def push_rclone(
     remote_name: str,
     new_path: str = None,
@@ -696,8 +1709,57 @@ def push_rclone(
     select_path: str | None = None,
     search_pattern: str | None = None,
     transfer_timeout: float | None = None,
-) -> bool:
-    """Push local files to remote."""
+    jobs: int = 1,
+    backend_limits: dict[str, int] | None = None,
+    resume: bool = True,
+    incremental: bool = True,
+    bwlimit: str | None = None,
+    fan_out: bool = False,
+    shards: int = 1,
+    slice_spec: tuple[int, int] | None = None,
+    stall_timeout: float | None = None,
+    stall_floor: float | None = None,
+    plan_out: str | None = None,
+    plan: str | None = None,
+    detect_renames: bool | None = None,
+) -> TransferResult | bool:
+    """
+    Push local files to remote.
+
+    An interrupted push is resumed from its journal unless ``resume`` is False.
+    Otherwise only the changes since the last successful push are sent unless
+    ``incremental`` is False.
+
+    Returns the combined ``TransferResult`` of every transfer that ran, or
+    False when nothing could be attempted.
+
+    With ``remote_name='all'`` every registered remote is planned first (policy
+    checks, commits and interactive selection run sequentially), then the
+    transfers run on a pool of at most ``jobs`` workers, honoring per-backend
+    caps from ``backend_limits`` on top of ``scheduler.DEFAULT_BACKEND_LIMITS``.
+
+    With ``fan_out``, remotes that share a local source are pushed together:
+    the source is scanned once, each remote narrows that scan with its own
+    excludes to compute its change set, and all of them upload concurrently.
+
+    ``shards`` > 1 splits each remote's transfer into that many concurrent,
+    size-balanced rclone processes (not with ``search_pattern``/``select_path``).
+
+    ``slice_spec=(i, N)`` pushes only slice ``i`` of ``N`` (files partitioned
+    by a stable path hash) for uncoordinated array jobs; the result is kept
+    for ``sharding.finalize`` instead of being recorded in the registry.
+
+    ``plan_out`` (with ``dry_run``) saves the computed change set of a single
+    remote; ``plan`` executes such a saved set (see ``plans``).
+
+    ``detect_renames`` turns local renames into server-side moves during an
+    incremental sync; None uses the remote's ``detect_renames`` registry setting.
+
+    Remotes with ``"storage_layout": "snapshots"`` receive a deduplicated
+    snapshot instead of a mirror (see ``snapshots``). Remotes with
+    ``"versioning": true`` keep the files a push replaces or deletes in one
+    dated bucket per run (see ``versions``).
+    """
     os.chdir(_project_root())
 
     if not install_rclone("./bin"):
@@ -712,9 +1774,11 @@ def push_rclone(
         all_remotes = [remote_name]
 
     flag = False
-    attempted = False
-    all_succeeded = True
+    skipped: dict[str, str] = {}
+    planned: list[tuple[Job, dict]] = []
     registry = load_all_registry()
+    # Every remote and shard of this push shares one version bucket name.
+    version_stamp = versions.new_stamp()
     for remote_name in all_remotes:
         remote_key = remote_name.lower()
         remote_meta = registry.get(remote_key, {})
@@ -725,15 +1789,27 @@ def push_rclone(
 
         if push_policy == "pull-only":
             print(f"Skipping '{remote_name}': push policy is pull-only.")
-            all_succeeded = False
+            skipped[remote_key] = "pull-only policy"
             continue
         if push_policy == "append-only" and operation in {"sync", "move"}:
             print(
                 f"Skipping '{remote_name}': push policy is append-only; "
                 f"operation '{operation}' is not allowed (use copy)."
             )
-            all_succeeded = False
+            skipped[remote_key] = f"append-only policy forbids {operation}"
             continue
+        snapshot_store = snapshots.snapshot_layout(remote_meta)
+        if snapshot_store:
+            conflicts = _snapshot_conflicts(
+                operation, search_pattern, select_path, slice_spec, plan, plan_out
+            )
+            if conflicts:
+                print(
+                    f"Skipping '{remote_name}': {', '.join(conflicts)} cannot be used with "
+                    "the snapshot storage layout."
+                )
+                skipped[remote_key] = "not supported by the snapshot layout"
+                continue
 
         _remote_path, _local_path = load_registry(remote_key)
         effective_local_path = _resolve_local_source_path(local_path) or _local_path
@@ -747,14 +1823,14 @@ def push_rclone(
                 f"Remote '{remote_name}' has no saved remote path. "
                 "Provide --remote-path or pin a remote base first."
             )
-            all_succeeded = False
+            skipped[remote_key] = "no remote path"
             continue
         if not effective_local_path:
             print(
                 f"Remote '{remote_name}' has no saved local source. "
                 "Provide --path or create a full mapping."
             )
-            all_succeeded = False
+            skipped[remote_key] = "no local source"
             continue
         if rclone_commit:
             flag = rclone_commit(
@@ -764,6 +1840,8 @@ def push_rclone(
             )
         exclude_patterns = _exclude_patterns(effective_local_path)
         exclude_patterns += _nested_remote_excludes(remote_key, effective_local_path, registry)
+        # A mirror transfer must never touch a snapshot store left on the remote.
+        exclude_patterns.append(f"/{snapshots.STORE_ROOT}/**")
         exclude_patterns = sorted(set(exclude_patterns))
         transfer_src = effective_local_path
         transfer_dst = target_path
@@ -784,12 +1862,21 @@ def push_rclone(
                 select_path,
             )
             if selected is None:
-                all_succeeded = False
+                skipped[remote_key] = "selection cancelled"
                 continue
             include_patterns = selected
+        backup_dir = None
+        if versions.versioning_enabled(remote_meta) and not snapshot_store:
+            backup_dir = versions.backup_dir(target_path, transfer_dst, version_stamp)
+            if backup_dir is None:
+                print(
+                    f"Skipping '{remote_name}': versioning needs a remote path below the "
+                    f"root of '{remote_key}:' to keep versions next to."
+                )
+                skipped[remote_key] = "versioning without a remote subpath"
+                continue
 
-        attempted = True
-        succeeded = _rclone_transfer(
+        transfer_kwargs = dict(
             remote_name=remote_key,
             src=transfer_src,
             dst=transfer_dst,
@@ -801,9 +1888,51 @@ def push_rclone(
             dry_run=dry_run,
             verbose=verbose,
             transfer_timeout=transfer_timeout,
+            resume=resume,
+            incremental=incremental,
+            bwlimit=bwlimit,
+            stall_timeout=stall_timeout,
+            stall_floor=stall_floor,
+            plan_out=plan_out,
+            plan=plan,
+            detect_renames=(
+                bool(remote_meta.get("detect_renames"))
+                if detect_renames is None and isinstance(remote_meta, dict)
+                else bool(detect_renames)
+            ),
+            backup_dir=backup_dir,
         )
-        all_succeeded = all_succeeded and succeeded
-    return attempted and all_succeeded
+        bundle_config = bundle.bundle_settings(remote_meta)
+        run: Callable[..., TransferResult]
+        if snapshot_store:
+            run = _snapshot_transfer
+        elif bundle_config is not None and not search_pattern and select_path is None:
+            run = functools.partial(
+                _bundled_transfer, bundle_config, shards=shards, slice_spec=slice_spec
+            )
+        else:
+            run = functools.partial(_scoped_transfer, shards=shards, slice_spec=slice_spec)
+        job = _planned_job(remote_key, _remote_backend(remote_key, registry), run, transfer_kwargs)
+        planned.append((job, transfer_kwargs))
+
+    if fan_out:
+        planned = _fan_out(planned, dry_run)
+        jobs = max([jobs] + [len(group) for group in _source_groups(planned).values()])
+
+    started = time.monotonic()
+    outcomes = run_jobs(
+        [job for job, _kwargs in planned],
+        max_jobs=jobs,
+        backend_limits=resolve_backend_limits(backend_limits),
+    )
+    if len(all_remotes) > 1:
+        print_summary(outcomes, action="push", skipped=skipped)
+    combined = TransferResult.combine(
+        [TransferResult.of_job(outcome.result) for outcome in outcomes],
+        elapsed=time.monotonic() - started,
+    )
+    combined.ok = bool(outcomes) and not skipped and all(outcome.ok for outcome in outcomes)
+    return combined
 
 
 def pull_rclone(
@@ -816,8 +1945,28 @@ def pull_rclone(
     select_path: str | None = None,
     search_pattern: str | None = None,
     transfer_timeout: float | None = None,
-) -> bool:
-    """Pull files from remote to local."""
+    bwlimit: str | None = None,
+    shards: int = 1,
+    slice_spec: tuple[int, int] | None = None,
+    stall_timeout: float | None = None,
+    stall_floor: float | None = None,
+    snapshot: str | None = None,
+    priority_globs: list[list[str]] | None = None,
+) -> TransferResult | bool:
+    """
+    Pull files from remote to local and return the ``TransferResult``.
+
+    ``shards`` > 1 runs that many concurrent, size-balanced rclone processes.
+    ``slice_spec=(i, N)`` pulls only slice ``i`` of ``N`` of the remote files
+    (copy semantics; see ``push_rclone``).
+
+    ``priority_globs`` restores the files class by class: each list of globs
+    in turn, then the remaining files; an empty list uses the default size
+    classes, small files first (see ``priority``).
+
+    From a remote with the ``snapshots`` storage layout, snapshot ``snapshot``
+    (default: the latest) is restored.
+    """
     if remote_name is None:
         print("Error: No remote specified for pulling backup.")
         return False
@@ -845,6 +1994,31 @@ def pull_rclone(
         )
         operation = "copy"
 
+    snapshot_store = snapshots.snapshot_layout(remote_meta)
+    if snapshot is not None and not snapshot_store:
+        print(f"Error: '{remote_name}' does not use the snapshot storage layout.")
+        return False
+    if snapshot_store:
+        conflicts = _snapshot_conflicts(operation, search_pattern, select_path, slice_spec)
+        if conflicts:
+            print(f"Error: {', '.join(conflicts)} cannot be used with the snapshot storage layout.")
+            return False
+    if priority_globs is not None:
+        conflicts = [
+            name
+            for name, used in (
+                ("--search", bool(search_pattern)),
+                ("--select", select_path is not None),
+                ("--shards", shards > 1),
+                ("--shard", slice_spec is not None),
+                ("the snapshot storage layout", snapshot_store),
+            )
+            if used
+        ]
+        if conflicts:
+            print(f"Error: --priority cannot be used with {', '.join(conflicts)}.")
+            return False
+
     explicit_remote_path = _normalize_explicit_remote_path(remote_name.lower(), remote_path)
     has_full_mapping = bool(_remote_path and _local_path)
     effective_remote_path = explicit_remote_path or _remote_path
@@ -888,6 +2062,8 @@ def pull_rclone(
         exclude_patterns += _nested_remote_excludes(
             remote_name.lower(), effective_local_path, registry
         )
+    # A mirror transfer must never touch a snapshot store left on the remote.
+    exclude_patterns.append(f"/{snapshots.STORE_ROOT}/**")
     exclude_patterns = sorted(set(exclude_patterns))
     transfer_remote_path = effective_remote_path
     transfer_local_path = effective_local_path
@@ -922,7 +2098,7 @@ def pull_rclone(
         print(f"Error: Could not create pull destination '{transfer_local_path}': {exc}")
         return False
 
-    return _rclone_transfer(
+    transfer_kwargs: dict[str, Any] = dict(
         remote_name=remote_name.lower(),
         src=transfer_remote_path,
         dst=transfer_local_path,
@@ -934,7 +2110,21 @@ def pull_rclone(
         dry_run=dry_run,
         verbose=verbose,
         transfer_timeout=transfer_timeout,
+        bwlimit=bwlimit,
+        stall_timeout=stall_timeout,
+        stall_floor=stall_floor,
     )
+    if snapshot_store:
+        return _snapshot_transfer(snapshot_id=snapshot, **transfer_kwargs)
+    if priority_globs is not None:
+        transfer_kwargs["priority_classes"] = priority.plan_classes(priority_globs)
+    bundle_config = bundle.bundle_settings(remote_meta)
+    if bundle_config is not None and not search_pattern and select_path is None:
+        # Bundles are unpacked before the first class is pulled.
+        return _bundled_transfer(
+            bundle_config, shards=shards, slice_spec=slice_spec, **transfer_kwargs
+        )
+    return _scoped_transfer(shards=shards, slice_spec=slice_spec, **transfer_kwargs)
 
 
 def rclone_diff_report(local_path: str, remote_path: str) -> bool:
@@ -1012,6 +2202,7 @@ def list_remote_entries(
     else:
         command = ["rclone", "lsf", target, "--max-depth", "1"]
 
+    client = None
     if _is_ucloud_remote(remote_name) or _is_ucloud_remote(_remote_name_from_uri(str(target))):
         rclone_conf = pathlib.Path("./bin/rclone_ucloud.conf").resolve()
         if rclone_conf.exists():
@@ -1019,21 +2210,31 @@ def list_remote_entries(
         else:
             print("[WARN] UCloud rclone config not found in ./bin. Please run set_host_port first.")
             return False
+    else:
+        client = rcd.active_client()
 
     try:
-        result = subprocess.run(
-            command,
-            check=True,
-            capture_output=True,
-            text=True,
-            timeout=DEFAULT_TIMEOUT,
-        )
-    except (OSError, subprocess.CalledProcessError) as exc:
+        if client is not None:
+            entries = rcd.list_entries(
+                client,
+                target,
+                recursive=bool(normalized_search),
+                include_patterns=[normalized_search] if normalized_search else None,
+            )
+        else:
+            result = subprocess.run(
+                command,
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=DEFAULT_TIMEOUT,
+            )
+            entries = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    except (OSError, subprocess.CalledProcessError, rcd.RcdError) as exc:
         action = "search" if normalized_search else "list"
         print(f"Failed to {action} remote entries at '{target}': {exc}")
         return False
 
-    entries = [line.strip() for line in result.stdout.splitlines() if line.strip()]
     if normalized_search:
         print(f"\nRemote search for '{remote_name}': {target} | pattern={normalized_search}")
     else:
@@ -1053,8 +2254,11 @@ def transfer_between_remotes(
     dry_run: bool = True,
     verbose: int = 0,
     transfer_timeout: float | None = None,
-) -> bool:
-    """Transfer between compatible mapped remotes and return the rclone result."""
+    bwlimit: str | None = None,
+    stall_timeout: float | None = None,
+    stall_floor: float | None = None,
+) -> TransferResult | bool:
+    """Transfer between compatible mapped remotes and return the ``TransferResult``."""
     all_remotes = load_all_registry()
     src_meta = all_remotes.get(source_remote)
     dst_meta = all_remotes.get(dest_remote)
@@ -1084,6 +2288,19 @@ def transfer_between_remotes(
     if operation not in {"copy", "sync"}:
         print("Error: Only 'copy' or 'sync' operations are allowed for remote-to-remote transfers.")
         return False
+    for name, meta in ((source_remote, src_meta), (dest_remote, dst_meta)):
+        if snapshots.snapshot_layout(meta):
+            print(
+                f"Error: '{name}' uses the snapshot storage layout; restore it with 'pull' "
+                "and push the files instead."
+            )
+            return False
+    backup_dir = None
+    if versions.versioning_enabled(dst_meta):
+        backup_dir = versions.backup_dir(dst_path, dst_path, versions.new_stamp())
+        if backup_dir is None:
+            print(f"Error: Versioned '{dest_remote}' needs a remote path below its root.")
+            return False
 
     print(f"\nTransfer from '{source_remote}' to '{dest_remote}'")
     print(f"Local path (shared): {src_local}")
@@ -1096,8 +2313,12 @@ def transfer_between_remotes(
         src_kind="remote",
         action="transfer",
         operation=operation,
-        exclude_patterns=_exclude_patterns(src_local),
+        exclude_patterns=[f"/{snapshots.STORE_ROOT}/**"] + _exclude_patterns(src_local),
         dry_run=dry_run,
         verbose=verbose,
         transfer_timeout=transfer_timeout,
+        bwlimit=bwlimit,
+        stall_timeout=stall_timeout,
+        stall_floor=stall_floor,
+        backup_dir=backup_dir,
     )
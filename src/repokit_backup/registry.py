@@ -5,12 +5,17 @@ Registry management - JSON persistence for remote configurations.
 import json
 import os
 import pathlib
+import threading
 from datetime import datetime
 
 
 MAPPING_MODES = {"full", "remote-only", "none"}
 PATH_OWNERSHIPS = {"managed", "external", "none"}
 
+# Concurrent transfers report their status from worker threads; serialize the
+# read-modify-write cycle so one remote's update cannot drop another's.
+_REGISTRY_LOCK = threading.Lock()
+
 
 def _atomic_write_json(path: str | os.PathLike[str], data: dict) -> None:
     """Atomically write JSON to avoid corruption."""
@@ -142,6 +147,12 @@ def save_registry(
         "last_action": previous.get("last_action"),
         "last_operation": previous.get("last_operation"),
         "timestamp": previous.get("timestamp"),
+        "last_result": previous.get("last_result"),
+        "tuning": previous.get("tuning"),
+        "bundle": previous.get("bundle"),
+        "storage_layout": previous.get("storage_layout"),
+        "detect_renames": previous.get("detect_renames"),
+        "versioning": previous.get("versioning"),
         "status": "initialized"
         if resolved_mode == "full"
         else "pinned"
@@ -209,19 +220,37 @@ def update_sync_status(
     operation: str,
     success: bool = True,
     json_path: str = "./bin/rclone_remote.json",
+    result: dict | None = None,
 ):
-    """Update last sync status for a remote."""
+    """
+    Update last sync status for a remote.
+
+    ``result`` is an optional transfer summary (bytes, files, checks, errors,
+    elapsed, average and peak throughput) stored as ``last_result``. The
+    status is ``ok``, ``partial (n failed)`` when only some files failed (the
+    failed paths are in ``last_result``), or ``failed``.
+    """
     if not os.path.exists(json_path):
         return
     try:
-        with open(json_path, "r") as f:
-            data = json.load(f)
-        if remote_name in data and isinstance(data[remote_name], dict):
-            data[remote_name]["last_action"] = action
-            data[remote_name]["last_operation"] = operation
-            data[remote_name]["timestamp"] = datetime.now().isoformat()
-            data[remote_name]["status"] = "ok" if success else "potentially corrupt"
-        _atomic_write_json(json_path, data)
+        with _REGISTRY_LOCK:
+            with open(json_path, "r") as f:
+                data = json.load(f)
+            if remote_name in data and isinstance(data[remote_name], dict):
+                data[remote_name]["last_action"] = action
+                data[remote_name]["last_operation"] = operation
+                data[remote_name]["timestamp"] = datetime.now().isoformat()
+                failed_count = (result or {}).get("failed_count") or 0
+                if success:
+                    status = "ok"
+                elif failed_count:
+                    status = f"partial ({failed_count} failed)"
+                else:
+                    status = "failed"
+                data[remote_name]["status"] = status
+                if result is not None:
+                    data[remote_name]["last_result"] = result
+            _atomic_write_json(json_path, data)
     except Exception as e:
         print(f"Failed to update sync status: {e}")
 
@@ -280,3 +309,79 @@ def set_push_policy(
     _atomic_write_json(json_path, data)
     print(f"Updated policy for '{key}' to '{policy}'.")
     return True
+
+
+def _set_entry_field(remote_name: str, field: str, value: object, json_path: str) -> bool:
+    """Store ``value`` as ``field`` of a registered remote; False if it is not registered."""
+    key = (remote_name or "").strip().lower()
+    with _REGISTRY_LOCK:
+        data = _read_registry_data(json_path)
+        if key not in data or not isinstance(data[key], dict):
+            print(f"Remote '{remote_name}' not found in registry.")
+            return False
+        data[key][field] = value
+        _atomic_write_json(json_path, data)
+    return True
+
+
+def set_tuning(
+    remote_name: str,
+    tuning: dict | None,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """
+    Replace the tuning overrides stored for a registered remote.
+
+    ``tuning`` holds only the keys that differ from the backend defaults;
+    ``None`` or an empty mapping clears the overrides.
+    """
+    return _set_entry_field(remote_name, "tuning", dict(tuning) if tuning else None, json_path)
+
+
+def set_bundle(
+    remote_name: str,
+    bundle: dict | None,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """Replace the small-file bundling settings (``patterns``, ``shard_size``) of a remote."""
+    return _set_entry_field(remote_name, "bundle", dict(bundle) if bundle else None, json_path)
+
+
+def set_storage_layout(
+    remote_name: str,
+    layout: str,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """Set how a remote stores pushed files: ``mirror`` (plain tree) or ``snapshots``."""
+    valid = {"mirror", "snapshots"}
+    value = (layout or "").strip().lower()
+    if value not in valid:
+        print(f"Invalid storage layout '{layout}'. Valid values: {', '.join(sorted(valid))}")
+        return False
+    return _set_entry_field(remote_name, "storage_layout", value, json_path)
+
+
+def set_detect_renames(
+    remote_name: str,
+    enabled: bool,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """Enable or disable rename detection for incremental syncs of a remote."""
+    if not _set_entry_field(remote_name, "detect_renames", bool(enabled), json_path):
+        return False
+    key = (remote_name or "").strip().lower()
+    print(f"Rename detection for '{key}' is {'on' if enabled else 'off'}.")
+    return True
+
+
+def set_versioning(
+    remote_name: str,
+    enabled: bool,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """Enable or disable keeping replaced and deleted files of a remote's pushes."""
+    if not _set_entry_field(remote_name, "versioning", bool(enabled), json_path):
+        return False
+    key = (remote_name or "").strip().lower()
+    print(f"Versioning for '{key}' is {'on' if enabled else 'off'}.")
+    return True
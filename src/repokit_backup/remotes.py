@@ -10,6 +10,7 @@ import time
 
 import repokit_common
 from repokit_common import load_from_env, save_to_env
+from . import rcd
 from .auth import detect_existing_ssh_key, set_host_port as _set_host_port
 from .remote_types import get_base_remote_type
 from .remote_info import (
@@ -17,6 +18,8 @@ from .remote_info import (
     non_interactive_remote_info as _non_interactive_remote_info,
     remote_user_info as _remote_user_info,
 )
+from .progress import TransferResult
+from .tuning import describe as describe_tuning
 from .registry import save_registry, load_all_registry, delete_from_registry, load_registry
 from .rclone import (
     _rc_verbose_args,
@@ -48,6 +51,9 @@ def _project_root() -> pathlib.Path:
 def check_rclone_remote(remote_name: str) -> bool:
     """Check if rclone remote is configured."""
     try:
+        client = rcd.active_client(remote_name)
+        if client is not None:
+            return remote_name in rcd.list_remotes(client)
         result = subprocess.run(
             _rclone_cmd("listremotes"),
             check=True,
@@ -57,7 +63,7 @@ def check_rclone_remote(remote_name: str) -> bool:
         )
         remotes = result.stdout.decode("utf-8").splitlines()
         return f"{remote_name}:" in remotes
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, rcd.RcdError) as e:
         print(f"Failed to check rclone remotes: {e}")
         return False
     except Exception as e:
@@ -593,14 +599,24 @@ def _add_folder(
     if built is None:
         return False
     base_folder, list_cmd, mkdir_cmd = built
+    client = rcd.active_client(remote_name) if rclone_conf is None else None
+    folder_fs = f"{remote_name}:{base_folder}"
 
     # Check if remote folder exists
-    result = subprocess.run(list_cmd, capture_output=True, text=True, timeout=DEFAULT_TIMEOUT)
+    if client is not None:
+        try:
+            rcd.list_entries(client, folder_fs)
+            folder_exists = True
+        except rcd.RcdError:
+            folder_exists = False
+    else:
+        result = subprocess.run(list_cmd, capture_output=True, text=True, timeout=DEFAULT_TIMEOUT)
+        folder_exists = result.returncode == 0
     merge_only = False
     path_ownership = "external" if mapping_mode == "remote-only" else "managed"
     # rclone may return success with empty stdout for existing-but-empty folders.
     # Treat any successful listing as "folder exists" and ask conflict resolution.
-    if result.returncode == 0:
+    if folder_exists:
         if on_existing is not None:
             if on_existing not in {"error", "use", "merge", "overwrite"}:
                 print(f"Unknown --on-existing action '{on_existing}'.")
@@ -642,7 +658,10 @@ def _add_folder(
             if rclone_conf is not None:
                 purge_cmd += ["--config", str(rclone_conf)]
             try:
-                subprocess.run(purge_cmd, check=True, timeout=DEFAULT_TIMEOUT)
+                if client is not None:
+                    rcd.purge(client, folder_fs)
+                else:
+                    subprocess.run(purge_cmd, check=True, timeout=DEFAULT_TIMEOUT)
             except Exception as exc:
                 print(f"Error overwriting remote folder: {exc}")
                 return False
@@ -678,7 +697,10 @@ def _add_folder(
 
     # Ensure remote folder exists
     try:
-        subprocess.run(mkdir_cmd, check=True, timeout=DEFAULT_TIMEOUT)
+        if client is not None:
+            rcd.mkdir(client, folder_fs)
+        else:
+            subprocess.run(mkdir_cmd, check=True, timeout=DEFAULT_TIMEOUT)
     except Exception as e:
         print(f"Error creating folder: {e}")
         return False
@@ -771,6 +793,12 @@ def list_remotes():
             print(
                 f"      Action: {action} | Operation: {operation} | Timestamp: {timestamp} | Status: {status} {status_note}"
             )
+            overrides = meta.get("tuning") if isinstance(meta, dict) else None
+            if isinstance(overrides, dict) and overrides:
+                print(f"      Tuning overrides: {describe_tuning(overrides)}")
+            last_result = meta.get("last_result") if isinstance(meta, dict) else None
+            if isinstance(last_result, dict):
+                print(f"      Last transfer: {TransferResult.from_dict(last_result).summary()}")
 
 
 def setup_rclone(
@@ -0,0 +1,205 @@
+"""
+Rename detection - Turn local renames into server-side moves.
+
+An incremental ``sync`` sees a renamed file as one deleted and one added path,
+which would re-upload the file and then delete the old copy. With rename
+detection, ``match_renames`` pairs deleted and added paths first by inode,
+size and mtime (a rename within one filesystem keeps all three), then by size
+and hash: the remote's stored hash of the deleted path against the local
+digest of the added one, taken from the hash cache (``hashcache``). Each pair
+is then moved on the remote (``rclone moveto``); backends without server-side
+move get a server-side copy and delete instead. Pairs that cannot be moved
+stay in the change set and are uploaded as usual.
+"""
+
+import json
+import pathlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from . import manifest
+from .hashcache import open_cache
+from .paths import join_remote, safe_name
+from .progress import format_bytes
+from .verify import HASH_PREFERENCE, hash_file, remote_hashes
+
+# Server-side moves run concurrently on this many rclone processes.
+RENAME_WORKERS = 8
+
+Runner = Callable[[list[str]], str]
+
+
+def _run_rclone(command: list[str]) -> str:
+    return subprocess.run(
+        command, check=True, capture_output=True, text=True, encoding="utf-8"
+    ).stdout
+
+
+def server_side_support(
+    remote_path: str, config_args: list[str] | None = None, runner: Runner | None = None
+) -> tuple[bool, bool, str | None]:
+    """
+    ``(move, copy, hash_type)`` for the backend of ``remote_path``: whether it
+    moves and copies server-side, and the preferred hash it stores (or None).
+    """
+    runner = runner or _run_rclone
+    remote_root = remote_path.split(":", 1)[0] + ":"
+    try:
+        data = json.loads(
+            runner(["rclone", "backend", "features", remote_root] + (config_args or []))
+        )
+    except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+        print(f"[WARN] Could not read the features of '{remote_root}': {exc}")
+        return False, False, None
+    features = data.get("Features") or {}
+    supported = {str(name).lower() for name in data.get("Hashes") or []}
+    hash_type = next((name for name in HASH_PREFERENCE if name in supported), None)
+    return bool(features.get("Move")), bool(features.get("Copy")), hash_type
+
+
+def match_renames(
+    state_name: str,
+    changes: manifest.ChangeSet,
+    previous: manifest.Entries,
+    current: manifest.Entries,
+    src: str,
+    dst: str,
+    hash_type: str | None,
+    config_args: list[str] | None = None,
+    runner: Runner | None = None,
+) -> list[tuple[str, str]]:
+    """
+    ``(old, new)`` pairs among the deleted and added paths of ``changes``;
+    every path is used at most once and empty files are never paired.
+    """
+    deleted = [path for path in changes.deleted if previous[path][0] > 0]
+    by_state: dict[tuple, list[str]] = {}
+    for old in deleted:
+        by_state.setdefault(tuple(previous[old]), []).append(old)
+    pairs: list[tuple[str, str]] = []
+    unmatched: list[str] = []
+    for new in changes.added:
+        olds = by_state.get(tuple(current[new]))
+        if olds:
+            pairs.append((olds.pop(0), new))
+        elif current[new][0] > 0:
+            unmatched.append(new)
+
+    paired = {old for old, _new in pairs}
+    sizes = {previous[old][0] for old in deleted if old not in paired}
+    candidates = [new for new in unmatched if current[new][0] in sizes]
+    if not candidates or hash_type is None:
+        return pairs
+
+    remaining = sorted(old for old in deleted if old not in paired)
+    listing = pathlib.Path(manifest.MANIFEST_DIR) / f"{safe_name(state_name)}.renames"
+    listing.parent.mkdir(parents=True, exist_ok=True)
+    listing.write_text("".join(f"{old}\n" for old in remaining), encoding="utf-8")
+    try:
+        stored = remote_hashes(
+            dst, hash_type, ["--files-from", str(listing.resolve())], config_args, runner
+        )
+    except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+        print(f"[WARN] Could not list hashes for rename detection: {exc}")
+        return pairs
+    finally:
+        listing.unlink(missing_ok=True)
+    by_hash: dict[tuple[int, str], list[str]] = {}
+    for old in remaining:
+        size, digest = stored.get(old, (None, ""))
+        if digest and size == previous[old][0]:
+            by_hash.setdefault((size, digest), []).append(old)
+    if not by_hash:
+        return pairs
+
+    cache = open_cache()
+    try:
+        for new in candidates:
+            try:
+                if cache is None:
+                    digest = hash_file(pathlib.Path(src) / new, hash_type)
+                else:
+                    digest = cache.digest(pathlib.Path(src) / new, hash_type, hash_file)
+            except OSError:
+                continue
+            olds = by_hash.get((current[new][0], digest))
+            if olds:
+                pairs.append((olds.pop(0), new))
+    finally:
+        if cache is not None:
+            cache.close()
+    return pairs
+
+
+def apply_renames(
+    pairs: list[tuple[str, str]],
+    dst: str,
+    move: bool,
+    config_args: list[str] | None = None,
+    runner: Runner | None = None,
+    workers: int = RENAME_WORKERS,
+) -> list[tuple[str, str]]:
+    """
+    Rename ``pairs`` below ``dst`` with server-side moves, or server-side
+    copy and delete when ``move`` is False; returns the pairs that succeeded.
+    """
+    runner = runner or _run_rclone
+    config_args = config_args or []
+
+    def rename(pair: tuple[str, str]) -> bool:
+        old, new = join_remote(dst, pair[0]), join_remote(dst, pair[1])
+        try:
+            if move:
+                runner(["rclone", "moveto", old, new] + config_args)
+            else:
+                runner(["rclone", "copyto", old, new] + config_args)
+                runner(["rclone", "deletefile", old] + config_args)
+        except (subprocess.CalledProcessError, OSError) as exc:
+            print(f"[WARN] Could not move '{pair[0]}' to '{pair[1]}' on the remote: {exc}")
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        done = list(pool.map(rename, pairs))
+    return [pair for pair, ok in zip(pairs, done) if ok]
+
+
+def detect_and_apply(
+    state_name: str,
+    changes: manifest.ChangeSet,
+    previous: manifest.Entries,
+    current: manifest.Entries,
+    src: str,
+    dst: str,
+    config_args: list[str] | None = None,
+    runner: Runner | None = None,
+) -> int:
+    """
+    Move renamed files on the remote and drop them from ``changes``; returns
+    the number of files moved. Nothing happens on backends that can neither
+    move nor copy server-side.
+    """
+    if not changes.added or not changes.deleted:
+        return 0
+    move, copy, hash_type = server_side_support(dst, config_args, runner)
+    if not move and not copy:
+        print(f"Rename detection skipped for '{state_name}': no server-side move or copy.")
+        return 0
+    pairs = match_renames(
+        state_name, changes, previous, current, src, dst, hash_type, config_args, runner
+    )
+    if not pairs:
+        return 0
+    moved = apply_renames(pairs, dst, move, config_args, runner)
+    moved_old = {old for old, _new in moved}
+    moved_new = {new for _old, new in moved}
+    changes.added = [path for path in changes.added if path not in moved_new]
+    changes.deleted = [path for path in changes.deleted if path not in moved_old]
+    moved_bytes = sum(current[new][0] for new in moved_new)
+    how = "server-side moves" if move else "server-side copies"
+    print(
+        f"Detected {len(pairs)} renames for '{state_name}'; {len(moved)} applied as {how} "
+        f"instead of re-uploading {format_bytes(moved_bytes)}."
+    )
+    return len(moved)
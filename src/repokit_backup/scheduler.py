@@ -0,0 +1,144 @@
+"""
+Job scheduling - Bounded concurrent execution with per-backend limits.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+
+from .remote_types import normalize_backend
+
+# OAuth providers throttle concurrent API sessions per account, so fan-out to
+# these backends is capped even when a larger --jobs budget is available.
+DEFAULT_BACKEND_LIMITS = {
+    "dropbox": 2,
+    "onedrive": 2,
+    "drive": 2,
+}
+
+
+@dataclass
+class Job:
+    """One unit of work, e.g. the transfer for a single remote."""
+
+    name: str
+    backend: str
+    run: Callable[[], object]
+
+
+@dataclass
+class JobOutcome:
+    """Result of running one job."""
+
+    name: str
+    backend: str
+    ok: bool
+    result: object = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+
+def parse_backend_limit(value: str) -> tuple[str, int]:
+    """Parse one ``BACKEND=N`` limit, raising ValueError on invalid input."""
+    backend_raw, sep, limit_raw = (value or "").partition("=")
+    backend = normalize_backend(backend_raw)
+    if not sep or not backend:
+        raise ValueError(f"Invalid backend limit '{value}'. Use BACKEND=N, e.g. dropbox=2.")
+    try:
+        limit = int(limit_raw)
+    except ValueError as exc:
+        raise ValueError(f"Backend limit for '{backend}' must be an integer.") from exc
+    if limit < 1:
+        raise ValueError(f"Backend limit for '{backend}' must be at least 1.")
+    return backend, limit
+
+
+def resolve_backend_limits(overrides: dict[str, int] | None = None) -> dict[str, int]:
+    """Merge explicit per-backend limits over the built-in defaults."""
+    limits = dict(DEFAULT_BACKEND_LIMITS)
+    limits.update(overrides or {})
+    return limits
+
+
+def _run_job(job: Job) -> JobOutcome:
+    started = time.monotonic()
+    try:
+        result = job.run()
+    except Exception as exc:
+        return JobOutcome(
+            name=job.name,
+            backend=job.backend,
+            ok=False,
+            error=str(exc),
+            elapsed=time.monotonic() - started,
+        )
+    return JobOutcome(
+        name=job.name,
+        backend=job.backend,
+        ok=bool(result),
+        result=result,
+        elapsed=time.monotonic() - started,
+    )
+
+
+def run_jobs(
+    jobs: list[Job],
+    max_jobs: int = 1,
+    backend_limits: dict[str, int] | None = None,
+) -> list[JobOutcome]:
+    """
+    Run jobs with at most ``max_jobs`` in flight and per-backend caps.
+
+    Jobs are started in list order whenever both the global and the backend
+    budget allow it, so a saturated backend never blocks a worker slot that
+    another backend could use. Outcomes are returned in the original order.
+    """
+    max_jobs = max(1, int(max_jobs or 1))
+    limits = backend_limits if backend_limits is not None else resolve_backend_limits()
+    outcomes: dict[int, JobOutcome] = {}
+    pending = list(enumerate(jobs))
+    running: dict[Future, tuple[int, Job]] = {}
+    active: dict[str, int] = {}
+
+    with ThreadPoolExecutor(max_workers=max_jobs) as pool:
+        while pending or running:
+            for item in list(pending):
+                if len(running) >= max_jobs:
+                    break
+                index, job = item
+                if active.get(job.backend, 0) >= limits.get(job.backend, max_jobs):
+                    continue
+                pending.remove(item)
+                active[job.backend] = active.get(job.backend, 0) + 1
+                running[pool.submit(_run_job, job)] = (index, job)
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, job = running.pop(future)
+                active[job.backend] -= 1
+                outcomes[index] = future.result()
+
+    return [outcomes[index] for index in range(len(jobs))]
+
+
+def print_summary(
+    outcomes: list[JobOutcome],
+    action: str = "push",
+    skipped: dict[str, str] | None = None,
+) -> None:
+    """Print one line per job plus an overall count."""
+    skipped = skipped or {}
+    print(f"\n[SUMMARY] {action} results:")
+    for outcome in outcomes:
+        state = "ok" if outcome.ok else "FAILED"
+        detail = f" - {outcome.error}" if outcome.error else ""
+        describe = getattr(outcome.result, "summary", None)
+        if callable(describe):
+            detail += f" - {describe()}"
+        print(f"  - {outcome.name} ({outcome.backend}): {state} ({outcome.elapsed:.1f}s){detail}")
+    for name, reason in skipped.items():
+        print(f"  - {name}: skipped ({reason})")
+    succeeded = sum(1 for outcome in outcomes if outcome.ok)
+    total = len(outcomes) + len(skipped)
+    print(f"{succeeded}/{total} remotes succeeded.")
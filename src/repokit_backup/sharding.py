@@ -0,0 +1,261 @@
+"""
+Sharded transfers - Split one mapping into size-balanced rclone scopes.
+
+A single rclone process on a huge tree is bound by its listing and checker
+pipeline. ``--shards N`` splits the source into units (top-level entries,
+subdivided while one unit is larger than an even share), packs the units into
+N groups of similar byte size (longest-processing-time first) and runs one
+rclone process per group, each scoped by filter rules.
+
+Sizes come from a local scan, or for remote sources from an ``rclone lsjson``
+listing cached under ``./bin/shards`` for a day: stale sizes only affect the
+balance, never which files are covered. Shard 1 is a catch-all that excludes
+the other shards' units instead of including its own, so paths that exist
+only on the destination are still handled by ``sync``.
+
+``--shard i/N`` is the uncoordinated variant for HPC array jobs: every file
+belongs to the slice given by a stable hash of its path, so N processes on
+different nodes cover the mapping exactly once. Each slice records its result
+under ``./bin/shards/<remote>/`` and ``finalize`` combines them into one sync
+status in the registry.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import re
+import subprocess
+import time
+from datetime import datetime
+
+from .manifest import Entries
+from .paths import safe_name
+from .progress import TransferResult
+
+SHARD_DIR = "./bin/shards"
+# Directories deeper than this are never split further.
+MAX_DEPTH = 4
+SIZE_INDEX_TTL = 24 * 3600
+_GLOB_SPECIAL = re.compile(r"([*?\[\]{}\\])")
+
+# unit path -> bytes; directories end in "/"
+SizeIndex = dict[str, int]
+
+
+def build_size_index(files: dict[str, int], max_depth: int = MAX_DEPTH) -> SizeIndex:
+    """Aggregate per-file sizes into directory totals down to ``max_depth``."""
+    index: SizeIndex = {}
+    for relative, size in files.items():
+        parts = relative.strip("/").split("/")
+        for depth in range(1, min(len(parts) - 1, max_depth) + 1):
+            directory = "/".join(parts[:depth]) + "/"
+            index[directory] = index.get(directory, 0) + size
+        if len(parts) <= max_depth:
+            index["/".join(parts)] = size
+    return index
+
+
+def local_size_index(entries: Entries) -> SizeIndex:
+    """Size index of a ``manifest.scan`` result."""
+    return build_size_index({path: state[0] for path, state in entries.items()})
+
+
+def remote_size_index(
+    remote_name: str,
+    src: str,
+    filter_args: list[str],
+    config_args: list[str] | None = None,
+    directory: str = SHARD_DIR,
+    max_age: float = SIZE_INDEX_TTL,
+) -> SizeIndex | None:
+    """Size index of a remote source, listed with ``rclone lsjson`` and cached."""
+    cache = pathlib.Path(directory) / f"{safe_name(remote_name)}.sizes.json"
+    try:
+        cached = json.loads(cache.read_text(encoding="utf-8"))
+        if cached.get("src") == src and time.time() - cached.get("created", 0) < max_age:
+            return {path: int(size) for path, size in cached["units"].items()}
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    command = (
+        ["rclone", "lsjson", "-R", "--files-only", "--no-modtime", "--no-mimetype", src]
+        + filter_args
+        + (config_args or [])
+    )
+    try:
+        completed = subprocess.run(command, check=True, capture_output=True, text=True)
+        listing = json.loads(completed.stdout or "[]")
+    except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+        print(f"[WARN] Could not list '{src}' for sharding: {exc}")
+        return None
+    index = build_size_index({item["Path"]: int(item.get("Size") or 0) for item in listing})
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    cache.write_text(json.dumps({"src": src, "created": time.time(), "units": index}), "utf-8")
+    return index
+
+
+def _children(index: SizeIndex, directory: str) -> list[str]:
+    depth = directory.count("/")
+    return [
+        unit
+        for unit in index
+        if unit != directory and unit.startswith(directory) and unit.rstrip("/").count("/") == depth
+    ]
+
+
+def plan_units(index: SizeIndex, shards: int) -> SizeIndex:
+    """
+    Choose transfer units: top-level entries, with any directory larger than
+    an even share replaced by its children while it has some.
+    """
+    units = {unit: size for unit, size in index.items() if "/" not in unit.rstrip("/")}
+    target = sum(units.values()) / max(shards, 1)
+    while True:
+        splittable = [
+            unit
+            for unit, size in units.items()
+            if unit.endswith("/") and size > target and _children(index, unit)
+        ]
+        if not splittable:
+            return units
+        largest = max(splittable, key=lambda unit: (units[unit], unit))
+        del units[largest]
+        units.update({child: index[child] for child in _children(index, largest)})
+
+
+def pack(units: SizeIndex, shards: int) -> list[list[str]]:
+    """Longest-processing-time bin packing of units into ``shards`` groups."""
+    bins: list[list[str]] = [[] for _ in range(max(shards, 1))]
+    loads = [0] * len(bins)
+    for unit, size in sorted(units.items(), key=lambda item: (-item[1], item[0])):
+        target = loads.index(min(loads))
+        bins[target].append(unit)
+        loads[target] += size
+    return bins
+
+
+def unit_pattern(unit: str) -> str:
+    """Anchored rclone filter pattern matching exactly one unit."""
+    escaped = _GLOB_SPECIAL.sub(r"\\\1", unit)
+    return f"/{escaped}**" if unit.endswith("/") else f"/{escaped}"
+
+
+def shard_filters(bins: list[list[str]]) -> list[tuple[list[str], list[str]]]:
+    """
+    ``(include, exclude)`` patterns per shard. The first shard excludes every
+    other shard's units and so also covers paths not in the size index.
+    """
+    filters: list[tuple[list[str], list[str]]] = [
+        ([], [unit_pattern(unit) for group in bins[1:] for unit in group])
+    ]
+    for group in bins[1:]:
+        if group:
+            filters.append(([unit_pattern(unit) for unit in group], []))
+    return filters
+
+
+def parse_slice(value: str) -> tuple[int, int]:
+    """
+    Parse an ``i/N`` slice (1-based).
+
+    Raises:
+        ValueError: If the value is not ``i/N`` with ``1 <= i <= N``.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", str(value))
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid shard '{value}'; use i/N with 1 <= i <= N, e.g. 3/16.")
+    return int(match.group(1)), int(match.group(2))
+
+
+def slice_of(relative: str, count: int) -> int:
+    """Stable 1-based slice of a path; identical on every node and Python run."""
+    digest = hashlib.sha1(relative.strip("/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def write_file_list(name: str, files: list[str], directory: str = SHARD_DIR) -> pathlib.Path:
+    """Write a ``--files-from`` list for one slice."""
+    path = pathlib.Path(directory) / f"{safe_name(name)}.files"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"{relative}\n" for relative in files), encoding="utf-8")
+    return path.resolve()
+
+
+def _slice_dir(remote_name: str, directory: str) -> pathlib.Path:
+    return pathlib.Path(directory) / safe_name(remote_name)
+
+
+def record_slice(
+    remote_name: str,
+    action: str,
+    operation: str,
+    slice_spec: tuple[int, int],
+    result: TransferResult,
+    directory: str = SHARD_DIR,
+) -> None:
+    """Store one slice's outcome for ``finalize``."""
+    index, count = slice_spec
+    path = _slice_dir(remote_name, directory) / f"{action}-slice-{index}-of-{count}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "index": index,
+        "count": count,
+        "operation": operation,
+        "finished": datetime.now().isoformat(),
+        "result": result.to_dict(),
+    }
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def finalize(remote_name: str, action: str = "push", directory: str = SHARD_DIR) -> bool:
+    """
+    Combine the slice records of a ``--shard i/N`` run into one sync status.
+
+    The newest record decides ``N``. Missing or failed slices make the
+    combined status a failure; records are removed only once all ``N`` are
+    present, so a rerun of the missing slices can be finalized again.
+    """
+    from .registry import update_sync_status
+
+    key = (remote_name or "").strip().lower()
+    records = []
+    for path in sorted(_slice_dir(key, directory).glob(f"{action}-slice-*-of-*.json")):
+        try:
+            records.append((path, json.loads(path.read_text(encoding="utf-8"))))
+        except (OSError, ValueError):
+            print(f"[WARN] Ignoring unreadable slice record {path}")
+    if not records:
+        print(f"No {action} slice records found for '{key}'.")
+        return False
+
+    count = max(records, key=lambda item: item[1].get("finished", ""))[1].get("count")
+    current = {
+        data.get("index"): (path, data) for path, data in records if data.get("count") == count
+    }
+    missing = [index for index in range(1, count + 1) if index not in current]
+    results = [
+        TransferResult.from_dict(data.get("result") or {}) for _path, data in current.values()
+    ]
+    combined = TransferResult.combine(results)
+    failed = sorted(
+        index
+        for index, (_path, data) in current.items()
+        if not (data.get("result") or {}).get("ok")
+    )
+    combined.ok = not missing and not failed
+    operation = next(iter(current.values()))[1].get("operation", "sync")
+
+    update_sync_status(
+        key, action=action, operation=operation, success=combined.ok, result=combined.to_dict()
+    )
+    print(f"Finalized {len(current)}/{count} {action} slices of '{key}': {combined.summary()}.")
+    if missing:
+        print(f"Missing slices: {', '.join(f'{index}/{count}' for index in missing)}")
+    if failed:
+        print(f"Failed slices: {', '.join(f'{index}/{count}' for index in failed)}")
+    if not missing:
+        for path, _data in records:
+            path.unlink(missing_ok=True)
+    return combined.ok
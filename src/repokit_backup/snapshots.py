@@ -0,0 +1,515 @@
+"""
+Snapshot store - Deduplicated, content-addressed backups on any remote.
+
+A remote whose registry entry has ``"storage_layout": "snapshots"`` is not a
+mirror of the local tree. Every push splits the local files into
+content-defined chunks (FastCDC-style gear hashing, 1 MiB on average) and
+uploads each chunk not yet stored as ``<remote_path>/.repokit-store/chunks/
+<ab>/<sha256>``, followed by a gzipped snapshot manifest mapping every path to
+its chunks under ``.repokit-store/snapshots/<id>.json.gz``. Chunk boundaries
+follow the content, so renamed or duplicated files and large files modified in
+place upload only the chunks that are actually new.
+
+Files whose inode, size and mtime are unchanged since the last push reuse their
+chunk list from ``./bin/snapshots/<remote>.json`` without being read. ``pull``
+restores the latest snapshot or any earlier one by id; chunks are verified
+against their hash before a file is written.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+from datetime import datetime, timezone
+from typing import Callable
+
+from . import filters, manifest
+from .paths import join_remote, safe_name, safe_target
+from .progress import ProgressPrinter, TransferResult, format_bytes
+
+STORE_ROOT = ".repokit-store"
+STATE_DIR = "./bin/snapshots"
+STATE_VERSION = 1
+SNAPSHOT_VERSION = 1
+MIN_CHUNK = 256 * 1024
+AVG_CHUNK = 1024 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+# New chunks are staged locally and uploaded in batches of about this size.
+STAGING_LIMIT = 512 * 1024 * 1024
+READ_SIZE = 4 * MAX_CHUNK
+_SNAPSHOT_NAME = re.compile(r"^(\d{8}T\d{6}\.\d{6}Z)\.json\.gz$")
+_MASK64 = (1 << 64) - 1
+# One pseudo-random 64-bit value per byte value, fixed so every run cuts alike.
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([value])).digest()[:8], "big") for value in range(256)]
+
+# Executes one rclone command and returns its stdout; raises CalledProcessError.
+Runner = Callable[[list[str]], bytes]
+
+
+def _run_rclone(command: list[str]) -> bytes:
+    return subprocess.run(command, check=True, capture_output=True).stdout
+
+
+def _top_bits(count: int) -> int:
+    # The high bits of the gear hash depend on the last 64 bytes.
+    return ((1 << count) - 1) << (64 - count)
+
+
+def cut_point(
+    data: bytes | bytearray,
+    min_size: int = MIN_CHUNK,
+    avg_size: int = AVG_CHUNK,
+    max_size: int = MAX_CHUNK,
+) -> int:
+    """
+    Length of the first chunk of ``data``. Below ``avg_size`` a stricter mask
+    is used and above it a looser one (normalized chunking), which keeps chunk
+    sizes close to the average.
+    """
+    length = len(data)
+    if length <= min_size:
+        return length
+    length = min(length, max_size)
+    bits = max(avg_size.bit_length() - 1, 1)
+    strict, loose = _top_bits(bits + 2), _top_bits(max(bits - 2, 1))
+    gear = _GEAR
+    digest = 0
+    middle = min(avg_size, length)
+    for index in range(min_size, middle):
+        digest = ((digest << 1) + gear[data[index]]) & _MASK64
+        if not digest & strict:
+            return index + 1
+    for index in range(middle, length):
+        digest = ((digest << 1) + gear[data[index]]) & _MASK64
+        if not digest & loose:
+            return index + 1
+    return length
+
+
+def iter_chunks(path: str | os.PathLike[str]):
+    """Yield the content-defined chunks of a file, reading it once."""
+    pending = bytearray()
+    with open(path, "rb") as handle:
+        while True:
+            data = handle.read(READ_SIZE)
+            pending += data
+            while len(pending) >= MAX_CHUNK or (not data and pending):
+                cut = cut_point(pending)
+                yield bytes(pending[:cut])
+                del pending[:cut]
+            if not data:
+                return
+
+
+def _chunk_object(chunk_id: str) -> str:
+    return f"{chunk_id[:2]}/{chunk_id}"
+
+
+def store_path(dst: str) -> str:
+    """The snapshot store below a remote path."""
+    return join_remote(dst, STORE_ROOT)
+
+
+def _state_path(remote_key: str) -> pathlib.Path:
+    return pathlib.Path(STATE_DIR) / f"{safe_name(remote_key)}.json"
+
+
+def _load_state(remote_key: str, store: str) -> dict | None:
+    try:
+        data = json.loads(_state_path(remote_key).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != STATE_VERSION
+        or data.get("store") != store
+    ):
+        return None
+    return data
+
+
+def _save_state(remote_key: str, store: str, chunks: set[str], files: dict) -> None:
+    path = _state_path(remote_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": STATE_VERSION, "store": store, "chunks": sorted(chunks), "files": files}
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def stored_chunks(store: str, config_args: list[str], runner: Runner) -> set[str]:
+    """Ids of the chunks already in ``store`` (empty when it does not exist yet)."""
+    try:
+        listing = runner(
+            ["rclone", "lsf", "-R", "--files-only", join_remote(store, "chunks")] + config_args
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return set()
+    return {line.rsplit("/", 1)[-1] for line in listing.decode("utf-8").split() if line}
+
+
+def list_snapshots(
+    store: str, config_args: list[str] | None = None, runner: Runner | None = None
+) -> list[str]:
+    """Snapshot ids in ``store``, oldest first."""
+    runner = runner or _run_rclone
+    try:
+        listing = runner(
+            ["rclone", "lsf", "--files-only", join_remote(store, "snapshots")] + (config_args or [])
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return []
+    names = (_SNAPSHOT_NAME.match(line.strip()) for line in listing.decode("utf-8").splitlines())
+    return sorted(match.group(1) for match in names if match)
+
+
+def load_snapshot(
+    store: str, snapshot_id: str, config_args: list[str] | None = None, runner: Runner | None = None
+) -> dict:
+    """
+    Download and parse one snapshot manifest.
+
+    Raises:
+        subprocess.CalledProcessError: If the snapshot cannot be read.
+        ValueError: If it is not a snapshot manifest.
+    """
+    runner = runner or _run_rclone
+    raw = runner(
+        ["rclone", "cat", join_remote(store, "snapshots", f"{snapshot_id}.json.gz")]
+        + (config_args or [])
+    )
+    data = json.loads(gzip.decompress(raw))
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot '{snapshot_id}' is not a supported snapshot manifest.")
+    return data
+
+
+def _upload_staged(
+    staging: pathlib.Path, store: str, config_args: list[str], runner: Runner
+) -> None:
+    runner(
+        ["rclone", "copy", "--no-traverse", str(staging), join_remote(store, "chunks")]
+        + config_args
+    )
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def push_snapshot(
+    remote_key: str,
+    src: str,
+    dst: str,
+    exclude_patterns: list[str] | None = None,
+    config_args: list[str] | None = None,
+    dry_run: bool = False,
+    runner: Runner | None = None,
+    local_scan: manifest.Entries | None = None,
+) -> TransferResult:
+    """
+    Store a snapshot of ``src`` in the chunk store below ``dst``.
+
+    Only chunks missing from the store are uploaded, in batches of about
+    ``STAGING_LIMIT`` bytes; the snapshot manifest is written last, so a
+    failed push never leaves a snapshot that refers to missing chunks.
+    ``local_scan`` is a shared scan of ``src`` (see ``push --fan-out``).
+    """
+    runner = runner or _run_rclone
+    config_args = config_args or []
+    store = store_path(dst)
+    matcher = filters.FilterMatcher(filters.compile_rules(None, exclude_patterns))
+    entries = (
+        manifest.select(local_scan, matcher)
+        if local_scan is not None
+        else manifest.scan(src, matcher)
+    )
+    state = _load_state(remote_key, store)
+    known = set(state["chunks"]) if state else stored_chunks(store, config_args, runner)
+    previous_files = state["files"] if state else {}
+
+    staging = pathlib.Path(STATE_DIR) / safe_name(remote_key) / "staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    printer = ProgressPrinter(label=f"{remote_key} snapshot")
+    files: dict[str, dict] = {}
+    file_chunks: dict[str, list] = {}
+    total = sum(entry[0] for entry in entries.values())
+    done = staged = uploaded = new_chunks = reused = 0
+    started = datetime.now(timezone.utc)
+    try:
+        for relative in sorted(entries):
+            size, mtime_ns, inode = entries[relative]
+            key = f"{inode}:{size}:{mtime_ns}"
+            chunks = previous_files.get(key)
+            if chunks is not None and all(chunk_id in known for chunk_id, _length in chunks):
+                reused += 1
+            else:
+                chunks = []
+                for data in iter_chunks(pathlib.Path(src) / relative):
+                    chunk_id = hashlib.sha256(data).hexdigest()
+                    chunks.append([chunk_id, len(data)])
+                    if chunk_id in known:
+                        continue
+                    known.add(chunk_id)
+                    new_chunks += 1
+                    uploaded += len(data)
+                    if dry_run:
+                        continue
+                    target = staging / _chunk_object(chunk_id)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(data)
+                    staged += len(data)
+                    if staged >= STAGING_LIMIT:
+                        _upload_staged(staging, store, config_args, runner)
+                        staged = 0
+            files[relative] = {"size": size, "mtime_ns": mtime_ns, "chunks": chunks}
+            file_chunks[key] = chunks
+            done += size
+            printer.update(
+                f"chunked {format_bytes(done)}/{format_bytes(total)}, {format_bytes(uploaded)} new"
+            )
+        printer.finish()
+        snapshot_id = started.strftime("%Y%m%dT%H%M%S.%fZ")
+        if not dry_run:
+            if staged:
+                _upload_staged(staging, store, config_args, runner)
+            snapshot = {
+                "version": SNAPSHOT_VERSION,
+                "id": snapshot_id,
+                "created": started.isoformat(),
+                "source": str(pathlib.Path(src).resolve()),
+                "files": files,
+            }
+            staging.mkdir(parents=True, exist_ok=True)
+            staged_snapshot = staging / f"{snapshot_id}.json.gz"
+            staged_snapshot.write_bytes(
+                gzip.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"))
+            )
+            runner(
+                [
+                    "rclone",
+                    "copyto",
+                    str(staged_snapshot),
+                    join_remote(store, "snapshots", staged_snapshot.name),
+                ]
+                + config_args
+            )
+            _save_state(remote_key, store, known, file_chunks)
+    except (subprocess.CalledProcessError, OSError) as exc:
+        printer.finish()
+        print(f"Failed to store snapshot of '{src}': {exc}")
+        return TransferResult(ok=False, bytes=uploaded, files=new_chunks)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    verb = "Would store" if dry_run else "Stored"
+    print(
+        f"{verb} snapshot '{snapshot_id}' of '{remote_key}': {len(files)} files "
+        f"({format_bytes(total)}), {reused} unchanged, {new_chunks} new chunks "
+        f"({format_bytes(uploaded)} to upload)."
+    )
+    return TransferResult(
+        ok=True,
+        bytes=uploaded,
+        files=new_chunks,
+        checks=len(files),
+        elapsed=elapsed,
+        average_speed=uploaded / elapsed if elapsed > 0 else 0.0,
+    )
+
+
+def _needs_restore(root: pathlib.Path, relative: str, item: dict) -> bool:
+    try:
+        stat = safe_target(root, relative).stat()
+    except OSError:
+        return True
+    return (stat.st_size, stat.st_mtime_ns) != (item["size"], item["mtime_ns"])
+
+
+def _restore_batch(
+    batch: list[tuple[str, dict]],
+    chunk_ids: set[str],
+    root: pathlib.Path,
+    store: str,
+    staging: pathlib.Path,
+    config_args: list[str],
+    runner: Runner,
+) -> None:
+    staging.mkdir(parents=True, exist_ok=True)
+    listing = staging.with_name(f"{staging.name}.files")
+    listing.write_text(
+        "".join(f"{_chunk_object(chunk_id)}\n" for chunk_id in sorted(chunk_ids)),
+        encoding="utf-8",
+    )
+    try:
+        if chunk_ids:
+            runner(
+                [
+                    "rclone",
+                    "copy",
+                    "--files-from",
+                    str(listing.resolve()),
+                    "--no-traverse",
+                    join_remote(store, "chunks"),
+                    str(staging),
+                ]
+                + config_args
+            )
+        for relative, item in batch:
+            target = safe_target(root, relative)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            partial = target.with_name(f"{target.name}.repokit-partial")
+            try:
+                with open(partial, "wb") as handle:
+                    for chunk_id, _length in item["chunks"]:
+                        data = (staging / _chunk_object(chunk_id)).read_bytes()
+                        if hashlib.sha256(data).hexdigest() != chunk_id:
+                            raise ValueError(f"Chunk {chunk_id} of '{relative}' is corrupt.")
+                        handle.write(data)
+            except (OSError, ValueError):
+                partial.unlink(missing_ok=True)
+                raise
+            os.utime(partial, ns=(item["mtime_ns"], item["mtime_ns"]))
+            os.replace(partial, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        listing.unlink(missing_ok=True)
+
+
+def _batches(needed: list[tuple[str, dict]]):
+    """Group files so the distinct chunks of a group stay near ``STAGING_LIMIT``."""
+    batch: list[tuple[str, dict]] = []
+    chunks: dict[str, int] = {}
+    for relative, item in needed:
+        new = {chunk_id: length for chunk_id, length in item["chunks"] if chunk_id not in chunks}
+        if batch and sum(chunks.values()) + sum(new.values()) > STAGING_LIMIT:
+            yield batch, chunks
+            batch, chunks = [], {}
+            new = dict(item["chunks"])
+        batch.append((relative, item))
+        chunks.update(new)
+    if batch:
+        yield batch, chunks
+
+
+def pull_snapshot(
+    remote_key: str,
+    src: str,
+    dst: str,
+    snapshot_id: str | None = None,
+    config_args: list[str] | None = None,
+    dry_run: bool = False,
+    runner: Runner | None = None,
+) -> TransferResult:
+    """
+    Restore snapshot ``snapshot_id`` (default: the latest) of the store below
+    ``src`` into ``dst``.
+
+    Only files whose size or mtime differ are restored, and local files absent
+    from the snapshot are kept. Chunks are downloaded in batches of about
+    ``STAGING_LIMIT`` bytes.
+    """
+    runner = runner or _run_rclone
+    config_args = config_args or []
+    store = store_path(src)
+    if not snapshot_id or snapshot_id == "latest":
+        available = list_snapshots(store, config_args, runner)
+        if not available:
+            print(f"No snapshots found in '{store}'.")
+            return TransferResult(ok=False)
+        snapshot_id = available[-1]
+    try:
+        snapshot = load_snapshot(store, snapshot_id, config_args, runner)
+    except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+        print(f"Error: Could not read snapshot '{snapshot_id}' from '{store}': {exc}")
+        return TransferResult(ok=False)
+
+    root = pathlib.Path(dst)
+    try:
+        needed = [
+            (relative, item)
+            for relative, item in sorted(snapshot["files"].items())
+            if _needs_restore(root, relative, item)
+        ]
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        return TransferResult(ok=False)
+    total = sum(item["size"] for _relative, item in needed)
+    if dry_run:
+        print(
+            f"Snapshot '{snapshot_id}': would restore {len(needed)} of "
+            f"{len(snapshot['files'])} files ({format_bytes(total)})."
+        )
+        return TransferResult(ok=True, checks=len(snapshot["files"]))
+
+    staging = pathlib.Path(STATE_DIR) / safe_name(remote_key) / "restore"
+    started = datetime.now(timezone.utc)
+    downloaded = restored = 0
+    try:
+        for batch, chunks in _batches(needed):
+            _restore_batch(batch, set(chunks), root, store, staging, config_args, runner)
+            downloaded += sum(chunks.values())
+            restored += len(batch)
+    except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+        print(f"Failed to restore snapshot '{snapshot_id}': {exc}")
+        return TransferResult(ok=False, bytes=downloaded, files=restored)
+
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    print(
+        f"Restored {restored} of {len(snapshot['files'])} files from snapshot "
+        f"'{snapshot_id}' ({format_bytes(downloaded)} of chunks downloaded)."
+    )
+    return TransferResult(
+        ok=True,
+        bytes=downloaded,
+        files=restored,
+        checks=len(snapshot["files"]),
+        elapsed=elapsed,
+        average_speed=downloaded / elapsed if elapsed > 0 else 0.0,
+    )
+
+
+def snapshot_layout(meta: dict | None) -> bool:
+    """True when a registry entry stores its pushes as snapshots."""
+    layout = meta.get("storage_layout") if isinstance(meta, dict) else None
+    return str(layout or "mirror").strip().lower() == "snapshots"
+
+
+def configure_snapshots(
+    remote_name: str,
+    layout: str | None = None,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """Set the storage layout of a remote and list its snapshots."""
+    from .rclone import _ucloud_config_args
+    from .registry import load_all_registry, set_storage_layout
+
+    registry = load_all_registry(json_path)
+    key = (remote_name or "").strip().lower()
+    meta = registry.get(key)
+    if not isinstance(meta, dict):
+        print(f"Remote '{remote_name}' not found in registry.")
+        return False
+    if layout is not None:
+        if not set_storage_layout(key, layout, json_path=json_path):
+            return False
+        meta["storage_layout"] = layout.strip().lower()
+
+    if not snapshot_layout(meta):
+        print(f"'{key}' stores a mirror of the local tree (storage layout 'mirror').")
+        return True
+    remote_path = meta.get("remote_path")
+    if not remote_path:
+        print(f"'{key}' stores snapshots but has no remote path yet.")
+        return True
+    config_args = _ucloud_config_args(registry, key, str(remote_path))
+    if config_args is None:
+        return False
+    store = store_path(str(remote_path))
+    available = list_snapshots(store, config_args)
+    print(f"'{key}' stores deduplicated snapshots in '{store}': {len(available)} snapshots.")
+    for snapshot_id in available:
+        print(f"  {snapshot_id}")
+    return True
@@ -0,0 +1,320 @@
+"""
+Transfer tuning - Per-remote rclone performance profiles.
+
+rclone's defaults (4 transfers, 8 checkers) suit nobody in particular: S3
+endpoints such as LUMI-O want many parallel multipart streams, SFTP hosts
+such as ERDA want larger SFTP chunks, and Dropbox/Drive/OneDrive need a
+transactions-per-second cap to avoid throttling. Each canonical backend gets a
+built-in profile; a registry entry may override individual keys under
+``tuning``.
+
+``bwlimit`` takes a plain rate or an rclone bandwidth timetable such as
+``"Mon-08:00,10M 18:00,off"``; rclone switches rates at the listed times,
+so a long push speeds up after hours without being split into jobs.
+"""
+
+import re
+
+from .remote_types import get_base_remote_type, normalize_backend, resolve_backend
+
+TUNING_KEYS = (
+    "transfers",
+    "checkers",
+    "buffer_size",
+    "multi_thread_streams",
+    "chunk_size",
+    "tpslimit",
+    "bwlimit",
+    "retries",
+)
+INT_KEYS = {"transfers", "checkers", "multi_thread_streams", "retries"}
+SIZE_KEYS = {"buffer_size", "chunk_size"}
+
+_SFTP_PROFILE = {
+    "transfers": 8,
+    "checkers": 16,
+    "buffer_size": "32M",
+    "multi_thread_streams": 4,
+    # OpenSSH accepts up to 256k packets; rclone recommends staying just below.
+    "chunk_size": "255k",
+}
+_S3_PROFILE = {
+    "transfers": 16,
+    "checkers": 32,
+    "buffer_size": "64M",
+    "multi_thread_streams": 8,
+    "chunk_size": "64M",
+}
+
+DEFAULT_PROFILES: dict[str, dict] = {
+    "dropbox": {"transfers": 4, "checkers": 8, "chunk_size": "64M", "tpslimit": 12},
+    # OneDrive upload fragments must be a multiple of 320 KiB.
+    "onedrive": {"transfers": 4, "checkers": 8, "chunk_size": "10M", "tpslimit": 10},
+    "drive": {"transfers": 4, "checkers": 8, "chunk_size": "64M", "tpslimit": 10},
+    "erda": dict(_SFTP_PROFILE),
+    "ucloud": dict(_SFTP_PROFILE),
+    "lumip": dict(_SFTP_PROFILE),
+    "sftp": dict(_SFTP_PROFILE),
+    "lumio": dict(_S3_PROFILE),
+    "s3": dict(_S3_PROFILE),
+    "local": {"transfers": 8, "checkers": 16, "multi_thread_streams": 4},
+}
+
+_GLOBAL_FLAGS = {
+    "transfers": "--transfers",
+    "checkers": "--checkers",
+    "buffer_size": "--buffer-size",
+    "multi_thread_streams": "--multi-thread-streams",
+    "tpslimit": "--tpslimit",
+    "bwlimit": "--bwlimit",
+    "retries": "--retries",
+}
+# rc ``_config`` keys for the same options (fs.ConfigInfo field names). rc jobs
+# have no whole-run retry loop, so ``retries`` has no equivalent.
+_RC_CONFIG_KEYS = {
+    "transfers": "Transfers",
+    "checkers": "Checkers",
+    "buffer_size": "BufferSize",
+    "multi_thread_streams": "MultiThreadStreams",
+    "tpslimit": "TPSLimit",
+    "bwlimit": "BwLimit",
+}
+# rclone backend types that expose a ``chunk_size`` option (``--<type>-chunk-size``).
+CHUNK_SIZE_TYPES = {"s3", "sftp", "dropbox", "onedrive", "drive"}
+_SIZE_PATTERN = re.compile(r"^\d+(\.\d+)?[bBkKMGTP]?$")
+_RATE = r"(?:off|\d+(?:\.\d+)?[bBkKMGTP]?)"
+_BW_RATE = re.compile(rf"^{_RATE}(?::{_RATE})?$")
+_BW_SLOT = re.compile(
+    rf"^(?:(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)-)?(?:[01]?\d|2[0-3]):[0-5]\d,{_RATE}(?::{_RATE})?$"
+)
+
+
+def validate_bwlimit(value: str) -> str:
+    """
+    Validate an rclone ``--bwlimit`` value: a rate (``10M``, ``off``, an
+    ``upload:download`` pair) or a space-separated timetable of
+    ``[Day-]HH:MM,rate`` slots.
+
+    Raises:
+        ValueError: If the value is not valid rclone syntax.
+    """
+    text = " ".join(str(value).split())
+    slots = text.split(" ")
+    if text and (_BW_RATE.match(text) or all(_BW_SLOT.match(slot) for slot in slots)):
+        return text
+    raise ValueError(
+        f"Invalid bandwidth limit '{value}'; use a rate such as 10M or a timetable "
+        "such as '08:00,10M 18:00,off'."
+    )
+
+
+def validate_tuning(values: dict) -> dict:
+    """
+    Validate and normalize tuning overrides.
+
+    Raises:
+        ValueError: On unknown keys or out-of-range values.
+    """
+    normalized: dict = {}
+    for key, value in (values or {}).items():
+        if key not in TUNING_KEYS:
+            raise ValueError(f"Unknown tuning key '{key}'. Valid keys: {', '.join(TUNING_KEYS)}")
+        if value is None:
+            continue
+        if key in INT_KEYS:
+            try:
+                number = int(value)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"'{key}' must be a positive integer.") from exc
+            if number < 1:
+                raise ValueError(f"'{key}' must be a positive integer.")
+            normalized[key] = number
+        elif key == "bwlimit":
+            normalized[key] = validate_bwlimit(value)
+        elif key in SIZE_KEYS:
+            text = str(value).strip()
+            if not _SIZE_PATTERN.match(text):
+                raise ValueError(f"'{key}' must be an rclone size such as 255k, 32M or 1G.")
+            normalized[key] = text
+        else:
+            try:
+                rate = float(value)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"'{key}' must be a number (0 disables the limit).") from exc
+            if rate < 0:
+                raise ValueError(f"'{key}' must be a number (0 disables the limit).")
+            normalized[key] = rate
+    return normalized
+
+
+def default_profile(backend: str | None) -> dict:
+    """Return the built-in profile for a canonical backend (empty when unknown)."""
+    return dict(DEFAULT_PROFILES.get(normalize_backend(backend) or "", {}))
+
+
+def effective_profile(backend: str | None, overrides: dict | None = None) -> dict:
+    """Merge a registry entry's ``tuning`` overrides over the backend defaults."""
+    profile = default_profile(backend)
+    try:
+        profile.update(validate_tuning(overrides or {}))
+    except ValueError as exc:
+        print(f"[WARN] Ignoring invalid tuning overrides: {exc}")
+    return profile
+
+
+def remote_profile(remote_key: str, registry: dict) -> tuple[str, dict]:
+    """Return ``(backend, profile)`` for a registered remote."""
+    meta = registry.get(remote_key, {}) if isinstance(registry, dict) else {}
+    meta = meta if isinstance(meta, dict) else {}
+    backend = normalize_backend(meta.get("remote_type")) or resolve_backend(None, remote_key)
+    overrides = meta.get("tuning") if isinstance(meta.get("tuning"), dict) else None
+    return backend, effective_profile(backend, overrides)
+
+
+def endpoint_profiles(remote_names: list[str], registry: dict) -> list[tuple[str, dict]]:
+    """Profiles for the registered remotes among a transfer's endpoints."""
+    seen: list[str] = []
+    for name in remote_names:
+        key = (name or "").strip().lower()
+        if key and key in registry and key not in seen:
+            seen.append(key)
+    return [remote_profile(key, registry) for key in seen]
+
+
+def _merged_global(profiles: list[tuple[str, dict]]) -> dict:
+    """
+    Combine global options for a transfer touching several remotes.
+
+    Concurrency and rate limits take the most conservative value so the
+    stricter endpoint is respected; buffer size takes the largest. Bandwidth
+    timetables cannot be compared, so the first endpoint that sets one wins.
+    """
+    merged: dict = {}
+    for _backend, profile in profiles:
+        for key in _GLOBAL_FLAGS:
+            if key not in profile:
+                continue
+            value = profile[key]
+            if key not in merged:
+                merged[key] = value
+            elif key == "bwlimit":
+                continue
+            elif key == "buffer_size":
+                merged[key] = (
+                    value if _size_bytes(value) > _size_bytes(merged[key]) else merged[key]
+                )
+            elif key == "tpslimit" and (merged[key] == 0 or value == 0):
+                merged[key] = max(merged[key], value)
+            else:
+                merged[key] = min(merged[key], value)
+    return merged
+
+
+def _size_bytes(value: str) -> float:
+    text = str(value).strip()
+    multipliers = {"b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4, "p": 1024**5}
+    suffix = text[-1:].lower()
+    if suffix in multipliers:
+        return float(text[:-1]) * multipliers[suffix]
+    # rclone treats a bare number as KiB.
+    return float(text) * 1024
+
+
+def _format_number(value) -> str:
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def transfer_args(profiles: list[tuple[str, dict]], overrides: dict | None = None) -> list[str]:
+    """
+    Build rclone CLI flags for a transfer between the given endpoints;
+    ``overrides`` (validated global keys such as ``bwlimit``) win over profiles.
+    """
+    args: list[str] = []
+    for key, value in {**_merged_global(profiles), **(overrides or {})}.items():
+        args.extend([_GLOBAL_FLAGS[key], _format_number(value)])
+    chunk_flags: dict[str, str] = {}
+    for backend, profile in profiles:
+        rclone_type = get_base_remote_type(backend)
+        if "chunk_size" in profile and rclone_type in CHUNK_SIZE_TYPES:
+            chunk_flags.setdefault(f"--{rclone_type}-chunk-size", str(profile["chunk_size"]))
+    for flag, value in chunk_flags.items():
+        args.extend([flag, value])
+    return args
+
+
+def rc_config(profiles: list[tuple[str, dict]], overrides: dict | None = None) -> dict:
+    """Build the rc ``_config`` overrides equivalent to ``transfer_args``."""
+    merged = {**_merged_global(profiles), **(overrides or {})}
+    return {_RC_CONFIG_KEYS[key]: value for key, value in merged.items() if key in _RC_CONFIG_KEYS}
+
+
+def rc_fs(fs: str, registry: dict) -> str:
+    """
+    Attach backend options to an rc ``fs`` string as an rclone connection
+    string (``remote,chunk_size=64M:path``); rc jobs cannot take backend flags.
+    """
+    remote, sep, path = str(fs).partition(":")
+    key = remote.strip().lower()
+    if not sep or key not in registry:
+        return fs
+    backend, profile = remote_profile(key, registry)
+    if "chunk_size" not in profile:
+        return fs
+    if get_base_remote_type(backend) not in CHUNK_SIZE_TYPES:
+        return fs
+    return f"{remote},chunk_size={profile['chunk_size']}:{path}"
+
+
+def describe(profile: dict) -> str:
+    """One-line ``key=value`` rendering of a profile."""
+    return (
+        ", ".join(f"{key}={_format_number(profile[key])}" for key in TUNING_KEYS if key in profile)
+        or "rclone defaults"
+    )
+
+
+def configure_tuning(
+    remote_name: str,
+    updates: dict | None = None,
+    reset: bool = False,
+    json_path: str = "./bin/rclone_remote.json",
+) -> bool:
+    """
+    Update and print the tuning profile of a registered remote.
+
+    ``updates`` are merged into the stored overrides (``reset`` clears them
+    first); values equal to the backend default are not stored.
+    """
+    from .registry import load_all_registry, set_tuning
+
+    registry = load_all_registry(json_path)
+    key = (remote_name or "").strip().lower()
+    meta = registry.get(key)
+    if not isinstance(meta, dict):
+        print(f"Remote '{remote_name}' not found in registry.")
+        return False
+
+    try:
+        changes = validate_tuning(updates or {})
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        return False
+
+    backend, _profile = remote_profile(key, registry)
+    if changes or reset:
+        stored = {} if reset else dict(meta.get("tuning") or {})
+        stored.update(changes)
+        defaults = default_profile(backend)
+        stored = {name: value for name, value in stored.items() if defaults.get(name) != value}
+        if not set_tuning(key, stored, json_path=json_path):
+            return False
+        meta["tuning"] = stored or None
+
+    _backend, profile = remote_profile(key, registry)
+    overrides = meta.get("tuning") or {}
+    print(f"Tuning for '{key}' ({backend}): {describe(profile)}")
+    if overrides:
+        print(f"  Overrides: {describe(overrides)}")
+    else:
+        print("  Using built-in defaults.")
+    return True
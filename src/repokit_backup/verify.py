@@ -0,0 +1,401 @@
+"""
+Checksum verification - Compare local file hashes with the remote's.
+
+``verify --remote NAME`` hashes every local file of the mapping on a thread
+pool (hashlib releases the GIL; files above ``MMAP_THRESHOLD`` are hashed from
+a memory map) while a single ``rclone lsjson -R --hash`` lists the remote's
+stored hashes. Both sides are then compared in memory, so no file is
+downloaded. The hash type is the first one in ``HASH_PREFERENCE`` that the
+backend supports (``rclone backend features``): MD5 on S3, the Dropbox content
+hash on Dropbox, SHA-1 on SFTP servers that offer it.
+
+Local digests are kept in the hash cache (``hashcache``), so a repeated
+verification only reads the files that changed since; ``rehash`` reads every
+file again, e.g. to catch silent corruption of the local copy.
+
+Objects the remote stores without a hash of that type (e.g. S3 multipart
+uploads made by other tools) are reported as unverifiable rather than as
+mismatches. A JSON report is written to ``./bin/verify/<remote>.json``.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pathlib
+import subprocess
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from . import bundle, filters, manifest, snapshots
+from .hashcache import HashCache, open_cache
+from .paths import safe_name
+from .progress import ProgressPrinter, format_bytes, format_duration
+from .rclone import _exclude_patterns, _nested_remote_excludes, _ucloud_config_args
+from .registry import load_all_registry
+
+REPORT_DIR = "./bin/verify"
+# Hash types that can be computed locally, cheapest first.
+HASH_PREFERENCE = ("md5", "sha1", "dropbox", "sha256", "crc32")
+MMAP_THRESHOLD = 8 * 1024 * 1024
+CHUNK_SIZE = 4 * 1024 * 1024
+DROPBOX_BLOCK = 4 * 1024 * 1024
+# Paths per category printed to the console; the report keeps all of them.
+SHOWN_PATHS = 20
+
+Runner = Callable[[list[str]], str]
+
+
+def _run_rclone(command: list[str]) -> str:
+    return subprocess.run(
+        command, check=True, capture_output=True, text=True, encoding="utf-8"
+    ).stdout
+
+
+class DropboxContentHasher:
+    """Dropbox content hash: SHA-256 over the SHA-256 of every 4 MiB block."""
+
+    def __init__(self):
+        self._overall = hashlib.sha256()
+        self._block = hashlib.sha256()
+        self._filled = 0
+
+    def update(self, data) -> None:
+        view = memoryview(data)
+        while view:
+            take = min(DROPBOX_BLOCK - self._filled, len(view))
+            self._block.update(view[:take])
+            self._filled += take
+            view = view[take:]
+            if self._filled == DROPBOX_BLOCK:
+                self._overall.update(self._block.digest())
+                self._block = hashlib.sha256()
+                self._filled = 0
+
+    def hexdigest(self) -> str:
+        overall = self._overall.copy()
+        if self._filled:
+            overall.update(self._block.digest())
+        return overall.hexdigest()
+
+
+class _Crc32:
+    def __init__(self):
+        self._value = 0
+
+    def update(self, data) -> None:
+        self._value = zlib.crc32(data, self._value)
+
+    def hexdigest(self) -> str:
+        return f"{self._value:08x}"
+
+
+def new_hasher(hash_type: str):
+    """A hasher with ``update``/``hexdigest`` producing rclone's hash format."""
+    if hash_type == "dropbox":
+        return DropboxContentHasher()
+    if hash_type == "crc32":
+        return _Crc32()
+    if hash_type in {"md5", "sha1", "sha256"}:
+        return hashlib.new(hash_type)
+    raise ValueError(f"Hash type '{hash_type}' cannot be computed locally.")
+
+
+def hash_file(path: str | os.PathLike[str], hash_type: str) -> str:
+    """Hash one file; large files are read through a memory map."""
+    hasher = new_hasher(hash_type)
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    for offset in range(0, size, CHUNK_SIZE):
+                        hasher.update(view[offset : offset + CHUNK_SIZE])
+        else:
+            for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def choose_hash(
+    remote_path: str, config_args: list[str] | None = None, runner: Runner | None = None
+) -> str | None:
+    """The preferred hash type the backend of ``remote_path`` supports, or None."""
+    runner = runner or _run_rclone
+    remote_root = remote_path.split(":", 1)[0] + ":"
+    try:
+        features = json.loads(
+            runner(["rclone", "backend", "features", remote_root] + (config_args or []))
+        )
+    except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+        print(f"[WARN] Could not read the hash types of '{remote_root}': {exc}")
+        return None
+    supported = {str(name).lower() for name in features.get("Hashes") or []}
+    return next((name for name in HASH_PREFERENCE if name in supported), None)
+
+
+def remote_hashes(
+    remote_path: str,
+    hash_type: str,
+    filter_args: list[str],
+    config_args: list[str] | None = None,
+    runner: Runner | None = None,
+) -> dict[str, tuple[int, str]]:
+    """``path -> (size, hash)`` from one recursive listing; hash is "" when not stored."""
+    runner = runner or _run_rclone
+    command = (
+        [
+            "rclone",
+            "lsjson",
+            "-R",
+            "--files-only",
+            "--no-mimetype",
+            "--hash",
+            "--hash-type",
+            hash_type,
+            remote_path,
+        ]
+        + filter_args
+        + (config_args or [])
+    )
+    listing = json.loads(runner(command) or "[]")
+    return {
+        item["Path"]: (
+            int(item.get("Size") or 0),
+            str((item.get("Hashes") or {}).get(hash_type) or "").lower(),
+        )
+        for item in listing
+    }
+
+
+@dataclass
+class VerifyReport:
+    """Outcome of comparing local hashes with the remote's."""
+
+    remote: str
+    hash_type: str
+    matched: int = 0
+    bytes: int = 0
+    cached: int = 0
+    elapsed: float = 0.0
+    mismatched: list[str] = field(default_factory=list)
+    missing: list[str] = field(default_factory=list)
+    extra: list[str] = field(default_factory=list)
+    unverifiable: list[str] = field(default_factory=list)
+    unreadable: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.mismatched or self.missing or self.unreadable)
+
+    def summary(self) -> str:
+        return (
+            f"{self.matched} matched, {len(self.mismatched)} mismatched, "
+            f"{len(self.missing)} missing on remote, {len(self.extra)} only on remote, "
+            f"{len(self.unverifiable)} without remote {self.hash_type}, "
+            f"{len(self.unreadable)} unreadable ({format_bytes(self.bytes)} checked, "
+            f"{self.cached} digests from cache, {format_duration(self.elapsed)})"
+        )
+
+
+def compare(
+    local: dict[str, str],
+    sizes: dict[str, int],
+    remote: dict[str, tuple[int, str]],
+    report: VerifyReport,
+) -> VerifyReport:
+    """Fill ``report`` from local hashes and sizes and the remote listing."""
+    for relative in sorted(sizes):
+        if relative not in remote:
+            report.missing.append(relative)
+            continue
+        remote_size, remote_hash = remote[relative]
+        if relative not in local:
+            report.unreadable.append(relative)
+        elif remote_size != sizes[relative]:
+            report.mismatched.append(relative)
+        elif not remote_hash:
+            report.unverifiable.append(relative)
+        elif remote_hash != local[relative]:
+            report.mismatched.append(relative)
+        else:
+            report.matched += 1
+    report.extra = sorted(set(remote) - set(sizes))
+    return report
+
+
+def hash_local(
+    src: str,
+    entries: manifest.Entries,
+    hash_type: str,
+    jobs: int,
+    label: str = "",
+    cache: HashCache | None = None,
+    refresh: bool = False,
+) -> dict[str, str]:
+    """
+    Hash ``entries`` below ``src`` on ``jobs`` threads, reusing unchanged
+    digests from ``cache``; unreadable files are left out.
+    """
+
+    def digest(path: pathlib.Path) -> str:
+        if cache is None:
+            return hash_file(path, hash_type)
+        return cache.digest(path, hash_type, hash_file, refresh=refresh)
+
+    printer = ProgressPrinter(label=label)
+    total = sum(state[0] for state in entries.values())
+    hashes: dict[str, str] = {}
+    done = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(digest, pathlib.Path(src) / relative): relative for relative in entries
+        }
+        for future in as_completed(futures):
+            relative = futures[future]
+            try:
+                hashes[relative] = future.result()
+            except OSError as exc:
+                print(f"[WARN] Could not hash '{relative}': {exc}")
+            done += entries[relative][0]
+            printer.update(f"hashed {format_bytes(done)}/{format_bytes(total)}")
+    printer.finish()
+    return hashes
+
+
+def _print_paths(title: str, paths: list[str]) -> None:
+    if not paths:
+        return
+    print(f"{title} ({len(paths)}):")
+    for relative in paths[:SHOWN_PATHS]:
+        print(f"  {relative}")
+    if len(paths) > SHOWN_PATHS:
+        print(f"  ... and {len(paths) - SHOWN_PATHS} more (see the report)")
+
+
+def save_report(report: VerifyReport, directory: str = REPORT_DIR) -> pathlib.Path:
+    path = pathlib.Path(directory) / f"{safe_name(report.remote)}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"finished": datetime.now().isoformat(), "ok": report.ok, **asdict(report)}
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+def verify_remote(
+    remote_name: str,
+    jobs: int | None = None,
+    runner: Runner | None = None,
+    json_path: str = "./bin/rclone_remote.json",
+    rehash: bool = False,
+) -> bool:
+    """
+    Verify a mapped remote (or ``all`` of them) against the local files by hash.
+
+    Returns True when every local file exists on the remote with a matching
+    size and hash (files without a remote hash only produce a warning).
+    ``rehash`` ignores cached local digests and refreshes them.
+    """
+    registry = load_all_registry(json_path)
+    key = (remote_name or "").strip().lower()
+    if key == "all":
+        remotes = [
+            name
+            for name, meta in registry.items()
+            if isinstance(meta, dict) and not snapshots.snapshot_layout(meta)
+        ]
+        if not remotes:
+            print("No remotes found.")
+            return False
+        results = [verify_remote(name, jobs, runner, json_path, rehash) for name in remotes]
+        return all(results)
+
+    meta = registry.get(key)
+    if not isinstance(meta, dict):
+        print(f"Remote '{remote_name}' not found in registry.")
+        return False
+    if snapshots.snapshot_layout(meta):
+        print(
+            f"Error: '{key}' stores deduplicated snapshots, which cannot be verified file "
+            "by file; chunks are checked against their hash by 'pull'."
+        )
+        return False
+    remote_path, local_path = meta.get("remote_path"), meta.get("local_path")
+    if not remote_path or not local_path:
+        print(f"Remote '{key}' has no full local/remote mapping to verify.")
+        return False
+    if not os.path.isdir(local_path):
+        print(f"Error: The folder '{local_path}' does not exist.")
+        return False
+    config_args = _ucloud_config_args(registry, key, str(remote_path))
+    if config_args is None:
+        return False
+
+    hash_type = choose_hash(remote_path, config_args, runner)
+    if hash_type is None:
+        print(
+            f"Remote '{key}' offers no hash type that can be computed locally "
+            f"({', '.join(HASH_PREFERENCE)}); use 'diff' to compare sizes and times."
+        )
+        return False
+
+    excludes = _exclude_patterns(local_path) + _nested_remote_excludes(key, local_path, registry)
+    settings = bundle.bundle_settings(meta)
+    if settings is not None:
+        excludes += bundle.push_bundles(key, local_path, remote_path, settings[0], transfer=False)[
+            1
+        ]
+    rules = filters.compile_rules(None, excludes)
+    filter_file = filters.write_filter_file(rules, f"{key}.verify")
+    filter_args = ["--filter-from", str(filter_file)] if filter_file is not None else []
+    entries = manifest.scan(local_path, filters.FilterMatcher(rules))
+    jobs = jobs or min(32, os.cpu_count() or 4)
+    print(
+        f"Verifying '{key}' with {hash_type}: {len(entries)} local files "
+        f"({format_bytes(sum(state[0] for state in entries.values()))}), {jobs} hash workers."
+    )
+
+    started = time.monotonic()
+    # The remote listing runs while the local files are hashed.
+    with ThreadPoolExecutor(max_workers=1) as lister:
+        listing = lister.submit(
+            remote_hashes, remote_path, hash_type, filter_args, config_args, runner
+        )
+        cache = open_cache()
+        try:
+            local = hash_local(
+                local_path,
+                entries,
+                hash_type,
+                jobs,
+                label=f"{key} verify",
+                cache=cache,
+                refresh=rehash,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+        try:
+            remote = listing.result()
+        except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+            print(f"Error: Could not list hashes of '{remote_path}': {exc}")
+            return False
+
+    report = VerifyReport(
+        remote=key,
+        hash_type=hash_type,
+        bytes=sum(entries[relative][0] for relative in local),
+        cached=cache.hits if cache is not None else 0,
+        elapsed=time.monotonic() - started,
+    )
+    compare(local, {path: state[0] for path, state in entries.items()}, remote, report)
+    _print_paths("Mismatched", report.mismatched)
+    _print_paths("Missing on remote", report.missing)
+    _print_paths("Unreadable locally", report.unreadable)
+    _print_paths(f"No remote {hash_type} hash (not verified)", report.unverifiable)
+    path = save_report(report)
+    print(f"Verify '{key}': {report.summary()}. Report: {path}")
+    return report.ok
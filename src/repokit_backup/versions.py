@@ -0,0 +1,212 @@
+"""
+Versioned sync - Keep replaced and deleted remote files in dated buckets.
+
+A remote whose registry entry has ``"versioning": true`` does not lose data
+when a push overwrites or deletes a file. Every push moves the remote files it
+replaces or deletes into one bucket per run, ``<remote_path>.versions/<stamp>``
+(the UTC start time of the push), next to the mapped remote path and with the
+same relative layout (rclone's ``--backup-dir``). Deletions of an incremental
+push are moved into the bucket with one ``rclone move --files-from``.
+
+``prune`` thins the buckets with time-based retention: the newest bucket of
+each of the last ``keep_daily`` days and of each of the last ``keep_weekly``
+ISO weeks is kept, every other bucket is deleted. The versions tree is listed
+once (``rclone lsjson -R``) and the files of all pruned buckets are removed by
+one ``rclone delete --files-from`` followed by one ``rclone rmdirs``.
+"""
+
+import json
+import pathlib
+import subprocess
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable
+
+from .paths import join_remote, safe_name
+from .progress import format_bytes
+
+VERSIONS_SUFFIX = ".versions"
+STAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+STATE_DIR = "./bin/versions"
+DEFAULT_KEEP_DAILY = 14
+DEFAULT_KEEP_WEEKLY = 8
+
+Runner = Callable[[list[str]], str]
+
+
+def _run_rclone(command: list[str]) -> str:
+    return subprocess.run(
+        command, check=True, capture_output=True, text=True, encoding="utf-8"
+    ).stdout
+
+
+def versioning_enabled(meta: dict | None) -> bool:
+    """True when a registry entry keeps replaced and deleted files."""
+    return bool(meta.get("versioning")) if isinstance(meta, dict) else False
+
+
+def new_stamp(now: datetime | None = None) -> str:
+    """Bucket name for a push starting at ``now`` (default: the current UTC time)."""
+    return (now or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime(STAMP_FORMAT)
+
+
+def parse_stamp(name: str) -> datetime | None:
+    """The UTC time of a bucket name, or None for anything else."""
+    try:
+        return datetime.strptime(name, STAMP_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def versions_root(remote_path: str) -> str | None:
+    """``<remote_path>.versions``, or None when ``remote_path`` is a remote root."""
+    alias, _, path = str(remote_path).partition(":")
+    path = path.rstrip("/")
+    if not path:
+        return None
+    return f"{alias}:{path}{VERSIONS_SUFFIX}"
+
+
+def backup_dir(remote_path: str, dst: str, stamp: str) -> str | None:
+    """
+    The ``--backup-dir`` for a push to ``dst`` below the mapped ``remote_path``:
+    the bucket ``stamp`` with ``dst``'s path relative to ``remote_path``.
+    """
+    root = versions_root(remote_path)
+    if root is None:
+        return None
+    base = str(remote_path).rstrip("/")
+    target = str(dst).rstrip("/")
+    relative = target[len(base) :].lstrip("/") if target.startswith(base) else ""
+    return join_remote(root, stamp, relative)
+
+
+def select_prunable(
+    stamps: list[str],
+    now: datetime | None = None,
+    keep_daily: int = DEFAULT_KEEP_DAILY,
+    keep_weekly: int = DEFAULT_KEEP_WEEKLY,
+) -> list[str]:
+    """
+    The bucket names in ``stamps`` that retention removes, oldest first.
+    Names that are not bucket stamps are never selected.
+    """
+    today = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+    daily_from = today - timedelta(days=keep_daily - 1) if keep_daily > 0 else None
+    this_week = today - timedelta(days=today.weekday())
+    weekly_from = this_week - timedelta(weeks=keep_weekly - 1) if keep_weekly > 0 else None
+
+    dated = sorted(
+        ((parsed, stamp) for stamp in stamps if (parsed := parse_stamp(stamp)) is not None),
+        reverse=True,
+    )
+    kept: set[str] = set()
+    days: set[date] = set()
+    weeks: set[date] = set()
+    for parsed, stamp in dated:
+        day = parsed.date()
+        week = day - timedelta(days=day.weekday())
+        if daily_from is not None and day >= daily_from and day not in days:
+            days.add(day)
+            kept.add(stamp)
+        if weekly_from is not None and week >= weekly_from and week not in weeks:
+            weeks.add(week)
+            kept.add(stamp)
+    return [stamp for _parsed, stamp in reversed(dated) if stamp not in kept]
+
+
+def list_versions(
+    root: str, config_args: list[str] | None = None, runner: Runner | None = None
+) -> dict[str, list[tuple[str, int]]]:
+    """``bucket -> [(root-relative path, size)]`` from one recursive listing of ``root``."""
+    runner = runner or _run_rclone
+    command = [
+        "rclone",
+        "lsjson",
+        "-R",
+        "--files-only",
+        "--no-mimetype",
+        "--no-modtime",
+        root,
+    ] + (config_args or [])
+    try:
+        listing = json.loads(runner(command) or "[]")
+    except subprocess.CalledProcessError as exc:
+        if exc.returncode == 3:
+            # Directory not found: nothing has been versioned yet.
+            return {}
+        raise
+    buckets: dict[str, list[tuple[str, int]]] = {}
+    for item in listing:
+        path = str(item["Path"])
+        buckets.setdefault(path.split("/", 1)[0], []).append((path, int(item.get("Size") or 0)))
+    return buckets
+
+
+def prune_versions(
+    remote_name: str,
+    keep_daily: int = DEFAULT_KEEP_DAILY,
+    keep_weekly: int = DEFAULT_KEEP_WEEKLY,
+    dry_run: bool = False,
+    runner: Runner | None = None,
+    json_path: str = "./bin/rclone_remote.json",
+    now: datetime | None = None,
+) -> bool:
+    """Delete the version buckets of a remote that fall outside the retention rules."""
+    from .rclone import _ucloud_config_args
+    from .registry import load_all_registry
+
+    runner = runner or _run_rclone
+    registry = load_all_registry(json_path)
+    key = (remote_name or "").strip().lower()
+    meta = registry.get(key)
+    if not isinstance(meta, dict):
+        print(f"Remote '{remote_name}' not found in registry.")
+        return False
+    remote_path = meta.get("remote_path")
+    root = versions_root(remote_path) if remote_path else None
+    if root is None:
+        print(f"Remote '{key}' has no mapped remote subpath to keep versions next to.")
+        return False
+    if not versioning_enabled(meta):
+        print(f"[WARN] Versioning is off for '{key}'; pruning existing versions only.")
+    config_args = _ucloud_config_args(registry, key, str(remote_path))
+    if config_args is None:
+        return False
+
+    try:
+        buckets = list_versions(root, config_args, runner)
+    except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+        print(f"Error: Could not list versions in '{root}': {exc}")
+        return False
+    prunable = select_prunable(list(buckets), now, keep_daily, keep_weekly)
+    files = [path for stamp in prunable for path, _size in buckets[stamp]]
+    freed = sum(size for stamp in prunable for _path, size in buckets[stamp])
+    print(
+        f"Versions of '{key}' in '{root}': {len(buckets)} buckets, {len(prunable)} outside "
+        f"retention (daily {keep_daily}, weekly {keep_weekly}); "
+        f"{len(files)} files, {format_bytes(freed)}."
+    )
+    if not prunable:
+        return True
+    for stamp in prunable:
+        print(f"  {stamp}")
+    if dry_run:
+        print("Dry run: no versions deleted.")
+        return True
+
+    listing = pathlib.Path(STATE_DIR) / f"{safe_name(key)}.prune"
+    listing.parent.mkdir(parents=True, exist_ok=True)
+    listing.write_text("".join(f"{path}\n" for path in files), encoding="utf-8")
+    try:
+        runner(
+            ["rclone", "delete", root, "--files-from", str(listing.resolve()), "--no-traverse"]
+            + config_args
+        )
+        runner(["rclone", "rmdirs", root, "--leave-root"] + config_args)
+    except (subprocess.CalledProcessError, OSError) as exc:
+        print(f"Error: Could not prune versions in '{root}': {exc}")
+        return False
+    finally:
+        listing.unlink(missing_ok=True)
+    print(f"Pruned {len(prunable)} version buckets of '{key}' ({format_bytes(freed)} freed).")
+    return True
@@ -0,0 +1,112 @@
+"""
+Stall watchdog - Abort transfers that stop making progress.
+
+``--transfer-timeout`` bounds the total run time, which suits neither a slow
+but steady multi-terabyte push nor one that hangs at 0 B/s after a minute.
+``StallWatchdog`` instead watches rclone's stats stream: a transfer is stalled
+when, over the last ``window`` seconds, throughput stayed below ``floor``
+bytes/s and no file was listed, checked, transferred or deleted. The files
+rclone reported in flight at that moment are kept for diagnosis.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+
+from .progress import format_bytes, format_duration
+
+# Throughput below this many bytes/s counts as no progress by default.
+DEFAULT_STALL_FLOOR = 1024
+# How often a running transfer is checked for a stall, in seconds.
+POLL_INTERVAL = 5.0
+_RATE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+# Counters that advance while rclone works without moving bytes.
+_ACTIVITY_KEYS = ("listed", "checks", "transfers", "deletes", "renames", "errors")
+
+
+def parse_rate(value: str | int | float) -> float:
+    """
+    Parse a throughput floor such as ``512``, ``10K`` or ``1.5M`` (bytes/s,
+    binary units as in rclone; a trailing ``/s`` is allowed).
+
+    Raises:
+        ValueError: If the rate is malformed or negative.
+    """
+    text = str(value).strip()
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([bBkKmMgGtT]?)(?:i?B)?(?:/s)?", text)
+    if not match:
+        raise ValueError(f"Invalid throughput '{value}'; use a rate such as 512, 10K or 1M.")
+    return float(match.group(1)) * _RATE_UNITS[match.group(2).lower()]
+
+
+class StallError(Exception):
+    """A transfer was aborted because it stalled; ``in_flight`` names its files."""
+
+    def __init__(self, message: str, in_flight: list[str] | None = None):
+        super().__init__(message)
+        self.in_flight = list(in_flight or [])
+
+
+class StallWatchdog:
+    """
+    Decide from rclone stats snapshots whether a transfer has stalled.
+
+    ``observe`` is fed every snapshot (``StatsTracker`` does this); ``stalled``
+    is polled by whatever waits for the transfer and may be called even when
+    rclone stops reporting altogether.
+    """
+
+    def __init__(self, window: float, floor: float = DEFAULT_STALL_FLOOR):
+        self.window = float(window)
+        self.floor = float(floor)
+        self.poll_interval = min(POLL_INTERVAL, max(self.window / 4, 0.05))
+        self.in_flight: list[str] = []
+        started = time.monotonic()
+        # (time, bytes, activity counters); the first sample is the start.
+        self._samples: deque[tuple[float, int, tuple]] = deque(
+            [(started, 0, (0,) * len(_ACTIVITY_KEYS))]
+        )
+        self._lock = threading.Lock()
+
+    def observe(self, stats: dict) -> None:
+        """Record one rclone stats snapshot."""
+        counters = tuple(int(stats.get(key) or 0) for key in _ACTIVITY_KEYS)
+        transferring = [item for item in stats.get("transferring") or [] if isinstance(item, dict)]
+        with self._lock:
+            self._samples.append((time.monotonic(), int(stats.get("bytes") or 0), counters))
+            self.in_flight = [_describe(item) for item in transferring]
+
+    def stalled(self, now: float | None = None) -> bool:
+        """True once throughput stayed below the floor for a whole window."""
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.window
+        with self._lock:
+            if self._samples[0][0] > cutoff:
+                return False
+            # The newest sample at or before the cutoff is the window's baseline.
+            while len(self._samples) > 1 and self._samples[1][0] <= cutoff:
+                self._samples.popleft()
+            started, baseline, counters = self._samples[0]
+            _latest, moved, latest_counters = self._samples[-1]
+        if latest_counters != counters:
+            return False
+        return (moved - baseline) / max(now - started, 1e-9) < self.floor
+
+    def error(self) -> StallError:
+        """The ``StallError`` describing the current stall."""
+        with self._lock:
+            in_flight = list(self.in_flight)
+        detail = f"; in flight: {', '.join(in_flight)}" if in_flight else ""
+        return StallError(
+            f"no progress above {format_bytes(self.floor)}/s for "
+            f"{format_duration(self.window)}{detail}",
+            in_flight,
+        )
+
+
+def _describe(item: dict) -> str:
+    name = str(item.get("name") or "?")
+    size = item.get("size")
+    done = format_bytes(item.get("bytes") or 0)
+    return f"{name} ({done} of {format_bytes(size)})" if size else f"{name} ({done})"
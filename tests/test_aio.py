@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import pathlib
+import sys
+
+from repokit_backup import aio
+
+FAKE_RCLONE = """#!{python}
+import json, os, pathlib, sys, time
+log = pathlib.Path({log!r})
+log.write_text(json.dumps({{"argv": sys.argv[1:], "cwd": os.getcwd(), "pid": os.getpid()}}))
+if os.environ.get("FAKE_RCLONE_SLEEP"):
+    time.sleep(60)
+sys.stderr.write(json.dumps({{"level": "notice", "stats": {{"bytes": 42, "transfers": 1}}}}) + "\\n")
+"""
+
+
+def _project(tmp_path: pathlib.Path) -> tuple[pathlib.Path, pathlib.Path]:
+    root = tmp_path / "project"
+    (root / "data").mkdir(parents=True)
+    (root / "data" / "a.csv").write_text("a")
+    executable = root / "bin" / "rclone-v1.73.2-linux-amd64" / "rclone"
+    executable.parent.mkdir(parents=True)
+    log = tmp_path / "rclone.json"
+    executable.write_text(FAKE_RCLONE.format(python=sys.executable, log=str(log)))
+    executable.chmod(0o755)
+    registry = {
+        "erda": {"remote_path": "erda:backup", "local_path": str(root), "push_policy": "full"},
+        "child": {"remote_path": "child:backup", "local_path": str(root / "data")},
+    }
+    (root / "bin" / "rclone_remote.json").write_text(json.dumps(registry))
+    return root, log
+
+
+def test_push_uses_explicit_root_without_changing_cwd(monkeypatch, tmp_path: pathlib.Path):
+    root, log = _project(tmp_path)
+    monkeypatch.setattr(aio, "_ignore_patterns", lambda *_args: [])
+    cwd = os.getcwd()
+
+    result = asyncio.run(aio.push(root, "erda", operation="copy"))
+
+    assert result and result.bytes == 42
+    assert os.getcwd() == cwd
+    call = json.loads(log.read_text())
+    assert call["cwd"] == str(root)
+    assert call["argv"][:3] == ["copy", str(root), "erda:backup"]
+    assert call["argv"][call["argv"].index("--config") + 1] == str(root / "bin" / "rclone.conf")
+    rules = pathlib.Path(call["argv"][call["argv"].index("--filter-from") + 1]).read_text()
+    assert "- data/**" in rules
+    saved = json.loads((root / "bin" / "rclone_remote.json").read_text())
+    assert saved["erda"]["status"] == "ok"
+
+
+def test_cancel_terminates_rclone_child(monkeypatch, tmp_path: pathlib.Path):
+    root, log = _project(tmp_path)
+    monkeypatch.setattr(aio, "_ignore_patterns", lambda *_args: [])
+    monkeypatch.setenv("FAKE_RCLONE_SLEEP", "1")
+
+    async def cancel_running_push() -> int:
+        task = asyncio.create_task(aio.push(root, "erda"))
+        while not log.exists():
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return json.loads(log.read_text())["pid"]
+        raise AssertionError("push was not cancelled")
+
+    pid = asyncio.run(cancel_running_push())
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        pass
+    else:
+        raise AssertionError("rclone child still running")
+    saved = json.loads((root / "bin" / "rclone_remote.json").read_text())
+    assert saved["erda"]["status"] == "failed"
+
+
+def test_push_refuses_bundled_remote_and_forgets_cli_state(monkeypatch, tmp_path: pathlib.Path):
+    root, log = _project(tmp_path)
+    monkeypatch.setattr(aio, "_ignore_patterns", lambda *_args: [])
+    registry_path = root / "bin" / "rclone_remote.json"
+    registry = json.loads(registry_path.read_text())
+    registry["child"]["bundle"] = {"patterns": ["*"]}
+    registry_path.write_text(json.dumps(registry))
+    state = [root / "bin" / "manifests" / "erda.json", root / "bin" / "journal" / "erda.s1.jsonl"]
+    for path in state:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{}")
+
+    assert not asyncio.run(aio.push(root, "child"))
+    assert not log.exists()
+
+    assert asyncio.run(aio.push(root, "erda"))
+    assert not any(path.exists() for path in state)
+
+
+def test_sync_never_touches_a_snapshot_store(monkeypatch, tmp_path: pathlib.Path):
+    root, log = _project(tmp_path)
+    monkeypatch.setattr(aio, "_ignore_patterns", lambda *_args: [])
+    registry_path = root / "bin" / "rclone_remote.json"
+    registry = json.loads(registry_path.read_text())
+    registry["vault"] = {
+        "remote_path": "vault:backup",
+        "local_path": str(root),
+        "storage_layout": "snapshots",
+    }
+    registry_path.write_text(json.dumps(registry))
+
+    assert not asyncio.run(aio.push(root, "vault"))
+    assert not asyncio.run(aio.pull(root, "vault"))
+    assert not asyncio.run(aio.transfer(root, "erda", "vault", operation="sync", dry_run=False))
+    assert not log.exists()
+
+    assert asyncio.run(aio.push(root, "erda"))
+    call = json.loads(log.read_text())
+    rules = pathlib.Path(call["argv"][call["argv"].index("--filter-from") + 1]).read_text()
+    assert "- /.repokit-store/**" in rules
+
+
+def test_relative_nested_remotes_resolve_against_the_project_root(
+    monkeypatch, tmp_path: pathlib.Path
+):
+    root, log = _project(tmp_path)
+    monkeypatch.setattr(aio, "_ignore_patterns", lambda *_args: [])
+    registry_path = root / "bin" / "rclone_remote.json"
+    registry = json.loads(registry_path.read_text())
+    registry["erda"]["local_path"] = "."
+    registry["child"]["local_path"] = "data"
+    registry_path.write_text(json.dumps(registry))
+    monkeypatch.chdir(tmp_path)
+
+    assert asyncio.run(aio.push(root, "erda", operation="copy"))
+    call = json.loads(log.read_text())
+    rules = pathlib.Path(call["argv"][call["argv"].index("--filter-from") + 1]).read_text()
+    assert "- data/**" in rules
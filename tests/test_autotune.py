@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import shutil
+import subprocess
+
+from repokit_backup import autotune, registry
+
+
+def _local_remote_runner(root: pathlib.Path, calls: list[list[str]]):
+    """Execute rclone copy/purge for a ``store:`` remote backed by a local directory."""
+
+    def resolve(path: str) -> pathlib.Path:
+        return (
+            root / path.partition(":")[2].lstrip("/")
+            if path.startswith("store:")
+            else pathlib.Path(path)
+        )
+
+    def run(command: list[str]) -> None:
+        calls.append(command)
+        if command[1] == "purge":
+            shutil.rmtree(resolve(command[2]))
+            return
+        if "--transfers" in command and command[command.index("--transfers") + 1] == "2":
+            raise subprocess.CalledProcessError(1, command)
+        shutil.copytree(resolve(command[2]), resolve(command[3]), dirs_exist_ok=True)
+
+    return run
+
+
+def test_autotune_sweeps_stores_best_and_cleans_up(tmp_path, monkeypatch, capsys):
+    store = tmp_path / "store"
+    (store / "backup").mkdir(parents=True)
+    probe = tmp_path / "probe"
+    probe.mkdir()
+    (probe / "a.bin").write_bytes(b"x" * 1024)
+    json_path = tmp_path / "rclone_remote.json"
+    json_path.write_text(
+        json.dumps({"store": {"remote_type": "s3", "remote_path": "store:backup", "status": "ok"}})
+    )
+    calls: list[list[str]] = []
+    clock = {"now": 0.0}
+    monkeypatch.setattr(autotune.time, "monotonic", lambda: clock["now"])
+
+    def timed_runner(command):
+        runner(command)
+        # 16 transfers and 128M chunks each shorten a copy.
+        elapsed = 3.0
+        if "--transfers" in command and command[command.index("--transfers") + 1] == "16":
+            elapsed -= 1.0
+        if "--s3-chunk-size" in command and command[command.index("--s3-chunk-size") + 1] == "128M":
+            elapsed -= 1.0
+        clock["now"] += elapsed
+
+    runner = _local_remote_runner(store, calls)
+    winner = autotune.autotune_remote(
+        "store",
+        transfers=(2, 4, 16),
+        probe_dir=probe,
+        runner=timed_runner,
+        json_path=str(json_path),
+    )
+
+    assert winner == {"transfers": 16, "checkers": 32, "chunk_size": "128M"}
+    assert registry.load_all_registry(str(json_path))["store"]["tuning"] == {"chunk_size": "128M"}
+    assert calls[-1][1] == "purge" and calls[-1][2].startswith("store:backup/.repokit-autotune-")
+    assert [entry.name for entry in (store / "backup").iterdir()] == []
+    out = capsys.readouterr().out
+    assert "transfers=2, checkers=8: failed" in out
+
+
+def test_autotune_requires_mapped_remote(tmp_path):
+    json_path = tmp_path / "rclone_remote.json"
+    json_path.write_text(json.dumps({"store": {"remote_type": "s3", "remote_path": None}}))
+
+    assert autotune.autotune_remote("store", json_path=str(json_path)) is None
+    assert autotune.autotune_remote("missing", json_path=str(json_path)) is None
+
+
+def test_write_probe_dataset_mixes_small_and_large_files(tmp_path):
+    total = autotune.write_probe_dataset(
+        tmp_path, small_files=3, small_size=10, large_files=1, large_size=5 * 1024 * 1024
+    )
+
+    assert total == 30 + 5 * 1024 * 1024
+    assert len(list((tmp_path / "small").iterdir())) == 3
+    assert (tmp_path / "large" / "probe-00.bin").stat().st_size == 5 * 1024 * 1024
+
+
+def test_autotune_trials_ignore_rate_limits(tmp_path):
+    store = tmp_path / "store"
+    (store / "backup").mkdir(parents=True)
+    probe = tmp_path / "probe"
+    probe.mkdir()
+    (probe / "a.bin").write_bytes(b"x")
+    json_path = tmp_path / "rclone_remote.json"
+    json_path.write_text(
+        json.dumps(
+            {
+                "store": {
+                    "remote_type": "dropbox",
+                    "remote_path": "store:backup",
+                    "tuning": {"bwlimit": "08:00,1M 18:00,off"},
+                }
+            }
+        )
+    )
+    calls: list[list[str]] = []
+
+    assert autotune.autotune_remote(
+        "store",
+        transfers=(4,),
+        probe_dir=probe,
+        apply=False,
+        runner=_local_remote_runner(tmp_path / "store", calls),
+        json_path=str(json_path),
+    )
+    copies = [command for command in calls if command[1] == "copy"]
+    assert copies and not any("--bwlimit" in c or "--tpslimit" in c for c in copies)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import pathlib
+import threading
+
+from repokit_backup import batch
+from repokit_backup.progress import TransferResult
+
+
+def _root(base: pathlib.Path, name: str, registry: dict) -> pathlib.Path:
+    root = base / name
+    (root / "bin").mkdir(parents=True)
+    (root / "bin" / "rclone_remote.json").write_text(json.dumps(registry))
+    return root
+
+
+def test_batch_schedules_pushes_across_roots_and_writes_report(monkeypatch, tmp_path: pathlib.Path):
+    for name in ("alpha", "beta", "gamma"):
+        _root(
+            tmp_path,
+            name,
+            {
+                "box": {"remote_type": "dropbox", "remote_path": "box:b", "local_path": "/p"},
+                "erda": {"remote_type": "erda", "remote_path": "erda:b", "local_path": "/p"},
+                "pin": {"remote_type": "erda", "remote_path": "pin:b"},
+            },
+        )
+    (tmp_path / "roots.txt").write_text("alpha\n# retired\nbeta  # lab b\n\ngamma\nmissing\n")
+    lock = threading.Lock()
+    active: dict[str, int] = {"dropbox": 0, "total": 0}
+    peaks: dict[str, int] = {"dropbox": 0, "total": 0}
+    pushed: list[tuple[str, str]] = []
+
+    async def fake_push(root, remote, operation="sync", **_kwargs):
+        keys = ["total"] + (["dropbox"] if remote == "box" else [])
+        with lock:
+            for key in keys:
+                active[key] += 1
+                peaks[key] = max(peaks[key], active[key])
+        await asyncio.sleep(0.05)
+        with lock:
+            for key in keys:
+                active[key] -= 1
+            pushed.append((root.name, remote))
+        return TransferResult(ok=remote != "erda" or root.name != "beta", bytes=10)
+
+    monkeypatch.setattr(batch.aio, "push", fake_push)
+    report = tmp_path / "report.json"
+
+    ok = batch.run_batch(
+        tmp_path / "roots.txt", jobs=4, backend_limits={"dropbox": 1}, report_path=report
+    )
+
+    assert not ok
+    assert len(pushed) == 6
+    assert peaks["dropbox"] == 1 and 1 < peaks["total"] <= 4
+    data = json.loads(report.read_text())
+    assert (data["succeeded"], data["failed"]) == (5, 1)
+    failed = [item for item in data["results"] if item["status"] != "ok"]
+    assert [(pathlib.Path(f["root"]).name, f["remote"]) for f in failed] == [("beta", "erda")]
+    reasons = {(pathlib.Path(s["root"]).name, s["remote"]): s["reason"] for s in data["skipped"]}
+    assert reasons[("alpha", "pin")] == "no full mapping"
+    assert reasons[("missing", None)] == "no registry"
+
+
+def test_batch_skips_bundled_and_snapshot_remotes(tmp_path: pathlib.Path):
+    root = _root(
+        tmp_path,
+        "alpha",
+        {
+            "erda": {"remote_path": "erda:b", "local_path": "/p"},
+            "box": {"remote_path": "box:b", "local_path": "/p", "bundle": {"patterns": ["*"]}},
+            "vault": {"remote_path": "v:b", "local_path": "/p", "storage_layout": "snapshots"},
+        },
+    )
+
+    planned, skipped = batch.plan_batch([root])
+
+    assert [remote for _root, remote, _job in planned] == ["erda"]
+    assert [(item["remote"], item["reason"]) for item in skipped] == [
+        ("box", "bundled remote"),
+        ("vault", "snapshot storage layout"),
+    ]
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+from repokit_backup import bundle
+
+
+class _LocalRemote:
+    """rclone stand-in serving ``store:`` paths from a local directory."""
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self.calls: list[list[str]] = []
+
+    def resolve(self, path: str) -> pathlib.Path:
+        if path.startswith("store:"):
+            return self.root / path.partition(":")[2].lstrip("/")
+        return pathlib.Path(path)
+
+    def __call__(self, command: list[str]) -> bytes:
+        self.calls.append(command)
+        verb, args = command[1], command[2:]
+        if verb == "copy":
+            shutil.copytree(self.resolve(args[0]), self.resolve(args[1]), dirs_exist_ok=True)
+        elif verb == "copyto":
+            shutil.copyfile(self.resolve(args[0]), self.resolve(args[1]))
+        elif verb == "deletefile":
+            self.resolve(args[0]).unlink()
+        elif verb == "cat":
+            offset = int(args[args.index("--offset") + 1]) if "--offset" in args else 0
+            count = int(args[args.index("--count") + 1]) if "--count" in args else -1
+            path = self.resolve(args[-1])
+            if not path.exists():
+                raise subprocess.CalledProcessError(3, command)
+            with open(path, "rb") as handle:
+                handle.seek(offset)
+                return handle.read(count)
+        elif verb == "lsf":
+            root = self.resolve(args[-1])
+            if not root.exists():
+                raise subprocess.CalledProcessError(3, command)
+            names = sorted(
+                path.relative_to(root).as_posix()
+                for path in root.rglob(args[args.index("--include") + 1])
+            )
+            return "".join(f"{name}\n" for name in names).encode()
+        return b""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "project"
+    for index in range(6):
+        target = source / "data" / "raw" / "run1" / f"f{index}.txt"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"file {index}\n" * 50)
+    (source / "data" / "notes.md").write_text("keep per-file")
+    return source, _LocalRemote(tmp_path / "store")
+
+
+def test_push_bundles_packs_shards_and_skips_unchanged(project):
+    source, remote = project
+
+    ok, excludes = bundle.push_bundles(
+        "store", str(source), "store:backup", ["data/raw/*"], shard_size=1024, runner=remote
+    )
+
+    assert ok
+    assert excludes == ["/.repokit-bundles/**", "/data/raw/run1/**"]
+    remote_dir = remote.root / "backup" / ".repokit-bundles" / "data" / "raw" / "run1"
+    index = json.loads((remote_dir / "index.json").read_text())
+    assert len(index["shards"]) == 3
+    member = index["shards"]["shard-00000.tar"]["members"][0]
+    with open(remote_dir / "shard-00000.tar", "rb") as handle:
+        handle.seek(member["offset"])
+        assert handle.read(member["length"]) == (source / "data/raw/run1/f0.txt").read_bytes()
+
+    remote.calls.clear()
+    assert bundle.push_bundles(
+        "store", str(source), "store:backup", ["data/raw/*"], shard_size=1024, runner=remote
+    )[0]
+    assert remote.calls == []
+
+    (source / "data/raw/run1/f5.txt").write_text("changed")
+    bundle.push_bundles(
+        "store", str(source), "store:backup", ["data/raw/*"], shard_size=1024, runner=remote
+    )
+    uploaded = [call for call in remote.calls if call[1] == "copy"]
+    assert len(uploaded) == 1
+    staged = json.loads((remote_dir / "index.json").read_text())
+    assert staged["shards"]["shard-00000.tar"] == index["shards"]["shard-00000.tar"]
+    assert staged["shards"]["shard-00002.tar"] != index["shards"]["shard-00002.tar"]
+
+
+def test_push_bundles_skip_excluded_files_and_directories(project):
+    source, remote = project
+    (source / "data" / "raw" / "run2").mkdir()
+    (source / "data" / "raw" / "run2" / "owned.txt").write_text("nested remote")
+    (source / "data" / "raw" / "run1" / "scratch.tmp").write_text("ignored")
+
+    ok, excludes = bundle.push_bundles(
+        "store",
+        str(source),
+        "store:backup",
+        ["data/raw/*"],
+        runner=remote,
+        exclude_patterns=["/data/raw/run2/**", "*.tmp"],
+    )
+
+    assert ok
+    assert excludes == ["/.repokit-bundles/**", "/data/raw/run1/**"]
+    remote_dir = remote.root / "backup" / ".repokit-bundles" / "data" / "raw"
+    assert not (remote_dir / "run2").exists()
+    index = json.loads((remote_dir / "run1" / "index.json").read_text())
+    packed = [m["path"] for shard in index["shards"].values() for m in shard["members"]]
+    assert sorted(packed) == [f"f{index}.txt" for index in range(6)]
+
+
+def test_state_paths_do_not_collide():
+    assert bundle._state_path("store", "data/raw") != bundle._state_path("store", "data_raw")
+
+
+def test_pull_bundles_restores_missing_files_with_ranged_reads(project, tmp_path):
+    source, remote = project
+    bundle.push_bundles(
+        "store", str(source), "store:backup", ["data/raw/*"], shard_size=1 << 20, runner=remote
+    )
+    restore = tmp_path / "restore"
+    shutil.copytree(source, restore)
+    os.remove(restore / "data/raw/run1/f3.txt")
+
+    remote.calls.clear()
+    ok, excludes = bundle.pull_bundles("store", "store:backup", str(restore), runner=remote)
+
+    assert ok
+    assert "/data/raw/run1/**" in excludes
+    assert (restore / "data/raw/run1/f3.txt").read_bytes() == (
+        source / "data/raw/run1/f3.txt"
+    ).read_bytes()
+    assert (restore / "data/raw/run1/f3.txt").stat().st_mtime_ns == (
+        source / "data/raw/run1/f3.txt"
+    ).stat().st_mtime_ns
+    assert [call[1] for call in remote.calls if call[1] in {"cat", "copyto"}][-1] == "cat"
+    assert not any(call[1] == "copyto" for call in remote.calls)
+
+
+def test_pull_bundles_downloads_whole_shard_when_most_files_are_needed(project, tmp_path):
+    source, remote = project
+    bundle.push_bundles("store", str(source), "store:backup", ["data/raw/*"], runner=remote)
+    restore = tmp_path / "empty"
+    restore.mkdir()
+
+    assert bundle.pull_bundles("store", "store:backup", str(restore), runner=remote)[0]
+
+    assert sorted(p.name for p in (restore / "data/raw/run1").iterdir()) == [
+        f"f{index}.txt" for index in range(6)
+    ]
+    assert any(call[1] == "copyto" for call in remote.calls)
+
+
+def test_pull_without_bundles_is_a_no_op(tmp_path):
+    remote = _LocalRemote(tmp_path / "store")
+    assert bundle.pull_bundles("store", "store:backup", str(tmp_path), runner=remote) == (True, [])
+
+
+def test_plan_keeps_files_in_their_shards():
+    previous = {
+        "shards": {
+            "shard-00000.tar": {"members": [{"path": "a"}, {"path": "b"}]},
+            "shard-00001.tar": {"members": [{"path": "c"}]},
+        }
+    }
+    files = {"a": (10, 1), "c": (10, 1), "d": (10, 1), "e": (10, 1)}
+
+    assert bundle.plan_shards(files, previous, shard_size=20) == {
+        "shard-00000.tar": ["a"],
+        "shard-00001.tar": ["c", "d"],
+        "shard-00002.tar": ["e"],
+    }
+
+
+def test_shard_size_parsing():
+    assert bundle.parse_shard_size("256M") == 256 * 1024**2
+    assert bundle.parse_shard_size("1g") == 1024**3
+    with pytest.raises(ValueError, match="shard size"):
+        bundle.parse_shard_size("0")
+
+
+def test_configure_bundle_stores_patterns(tmp_path, capsys):
+    json_path = tmp_path / "rclone_remote.json"
+    json_path.write_text(json.dumps({"erda": {"remote_type": "erda"}}))
+
+    assert bundle.configure_bundle(
+        "erda", patterns=["/data/raw/*", "data/raw/*"], shard_size="64M", json_path=str(json_path)
+    )
+    stored = json.loads(json_path.read_text())["erda"]["bundle"]
+    assert stored == {"patterns": ["data/raw/*"], "shard_size": "64M"}
+    assert bundle.bundle_settings({"bundle": stored}) == (["data/raw/*"], 64 * 1024**2)
+
+    assert bundle.configure_bundle("erda", clear=True, json_path=str(json_path))
+    assert json.loads(json_path.read_text())["erda"]["bundle"] is None
+    assert "Bundling is disabled" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pathlib
+
+from repokit_backup import filters, rclone
+
+
+def _lines(rules: list[filters.Rule]) -> list[str]:
+    return [rule.line for rule in rules]
+
+
+def test_compile_rules_merges_pairs_and_drops_shadowed_rules():
+    rules = filters.compile_rules(
+        include_patterns=["data/**", "data/raw/**", "docs/readme.md", "data/**"],
+        exclude_patterns=["data/child/", "data/child/**", ".venv/", "data/child/tmp/**"],
+    )
+
+    assert _lines(rules) == [
+        "- data/child/**",
+        "- .venv/",
+        "+ data/**",
+        "+ docs/readme.md",
+        "- **",
+    ]
+
+
+def test_excludes_take_precedence_over_includes():
+    # rclone parses --include flags before --exclude flags; the compiled file
+    # puts excludes first instead, so an ignored or nested-remote path stays
+    # out of a --search or --select that covers it.
+    rules = filters.compile_rules(
+        include_patterns=["data/**", "bin/config.toml"], exclude_patterns=["data/child/**", "bin/"]
+    )
+
+    assert _lines(rules) == ["- data/child/**", "- bin/", "+ data/**", "+ bin/config.toml", "- **"]
+    matcher = filters.FilterMatcher(rules)
+    assert matcher.includes("data/raw/a.csv")
+    assert not matcher.includes("data/child/a.csv")
+    assert not matcher.includes("notes.txt")
+
+
+def test_compile_rules_respects_anchoring_and_catch_all():
+    assert _lines(filters.compile_rules(exclude_patterns=["/data/**", "data/x.txt"])) == [
+        "- /data/**",
+        "- data/x.txt",
+    ]
+    assert _lines(filters.compile_rules(exclude_patterns=["data/**", "/data/x.txt"])) == [
+        "- data/**"
+    ]
+    assert _lines(filters.compile_rules(include_patterns=["**", "*.csv"])) == ["+ **"]
+    assert filters.compile_rules() == []
+
+
+def test_filter_matcher_follows_rclone_semantics():
+    matcher = filters.FilterMatcher(
+        filters.compile_rules(
+            include_patterns=["data/**", "*.{md,txt}"],
+            exclude_patterns=["data/child/", "/scratch?/**"],
+        )
+    )
+
+    assert matcher.includes("data/raw/a.parquet")
+    assert matcher.includes("notes/readme.md")
+    assert not matcher.includes("data/child/a.parquet")
+    assert not matcher.includes("scratch1/notes.txt")
+    assert matcher.includes("deep/scratch1/notes.txt")
+    assert not matcher.includes("src/main.py")
+
+
+def test_transfer_passes_patterns_as_one_filter_file(monkeypatch, tmp_path: pathlib.Path):
+    captured: dict[str, list[str]] = {}
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone.os.path, "exists", lambda _path: True)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+
+    def fake_process(command, tracker, timeout=None):
+        captured["command"] = command
+        path = pathlib.Path(command[command.index("--filter-from") + 1])
+        captured["rules"] = path.read_text(encoding="utf-8").splitlines()
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+
+    assert rclone._rclone_transfer(
+        remote_name="myproject",
+        src=str(tmp_path),
+        dst="myproject:/backup",
+        operation="copy",
+        include_patterns=["data/a.csv", "data/b.csv"],
+        exclude_patterns=["data/child/", "data/child/**"],
+        dry_run=True,
+    )
+    assert "--include" not in captured["command"]
+    assert "--exclude" not in captured["command"]
+    assert captured["rules"] == ["- data/child/**", "+ data/a.csv", "+ data/b.csv", "- **"]
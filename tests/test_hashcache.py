@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+
+from repokit_backup import verify
+from repokit_backup.hashcache import HashCache
+
+
+def test_cached_digests_are_reused_until_the_file_changes(tmp_path: pathlib.Path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"first")
+    computed: list[str] = []
+
+    def compute(target, hash_type):
+        computed.append(pathlib.Path(target).read_text())
+        return hashlib.md5(pathlib.Path(target).read_bytes()).hexdigest()
+
+    with HashCache(tmp_path / "cache.sqlite") as cache:
+        first = cache.digest(path, "md5", compute)
+        assert cache.digest(path, "md5", compute) == first
+    with HashCache(tmp_path / "cache.sqlite") as cache:
+        assert cache.digest(path, "md5", compute) == first
+        assert cache.hits == 1
+        cache.digest(path, "md5", compute, refresh=True)
+        path.write_bytes(b"second")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.digest(path, "md5", compute) == hashlib.md5(b"second").hexdigest()
+        cache.digest(path, "sha1", lambda *_args: hashlib.sha1(b"second").hexdigest())
+
+    assert computed == ["first", "first", "second"]
+
+
+def test_verify_hashes_only_changed_files_on_a_rerun(monkeypatch, tmp_path: pathlib.Path):
+    monkeypatch.chdir(tmp_path)
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(name)
+    hashed: list[str] = []
+    real_hash_file = verify.hash_file
+
+    def counting_hash_file(path, hash_type):
+        hashed.append(pathlib.Path(path).name)
+        return real_hash_file(path, hash_type)
+
+    monkeypatch.setattr(verify, "hash_file", counting_hash_file)
+    entries = {name: (5, 0, 0) for name in ("a.txt", "b.txt", "c.txt")}
+
+    def run(**kwargs):
+        cache = HashCache()
+        try:
+            return verify.hash_local(str(tmp_path), entries, "md5", 2, cache=cache, **kwargs)
+        finally:
+            cache.close()
+
+    first = run()
+    (tmp_path / "b.txt").write_text("B.txt")
+    stat = (tmp_path / "b.txt").stat()
+    os.utime(tmp_path / "b.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = run()
+
+    assert sorted(hashed) == ["a.txt", "b.txt", "b.txt", "c.txt"]
+    assert first["a.txt"] == second["a.txt"] and first["b.txt"] != second["b.txt"]
+    assert (tmp_path / "bin" / "hashcache.sqlite").exists()
+    hashed.clear()
+    run(refresh=True)
+    assert len(hashed) == 3
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+
+from repokit_backup.journal import TransferJournal, discard
+
+
+def _open(tmp_path, source, **overrides):
+    options = dict(
+        remote_name="erda",
+        src=str(source),
+        dst="erda:/backup",
+        operation="sync",
+        exclude_patterns=["bin/"],
+        directory=str(tmp_path / "journal"),
+    )
+    options.update(overrides)
+    return TransferJournal.open(**options)
+
+
+def test_journal_resumes_identical_transfer_only(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (source / name).write_text(name)
+
+    journal = _open(tmp_path, source)
+    assert not journal.resumable
+    journal.record({"level": "info", "msg": "Copied (new)", "object": "a.txt"})
+    journal.record({"level": "info", "msg": "Multi-thread Copied (new)", "object": "b.txt"})
+    journal.record({"level": "error", "msg": "Failed to copy", "object": "c.txt"})
+    journal.close()
+    # A process killed mid-write leaves a torn final line.
+    with open(journal.path, "a", encoding="utf-8") as handle:
+        handle.write('{"path": "c.t')
+
+    resumed = _open(tmp_path, source)
+    assert resumed.resumable
+    assert resumed.pending(["a.txt", "b.txt", "c.txt"]) == ["c.txt"]
+
+    (source / "a.txt").write_text("changed content")
+    assert resumed.pending(["a.txt", "b.txt", "c.txt"]) == ["a.txt", "c.txt"]
+    resumed.close()
+
+    fresh = _open(tmp_path, source, exclude_patterns=["bin/", "*.tmp"])
+    assert not fresh.resumable
+    assert fresh.pending(["a.txt"]) == ["a.txt"]
+    fresh.close()
+
+
+def test_journal_records_rc_transfers_and_completes(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.txt").write_text("a")
+
+    journal = _open(tmp_path, source)
+    journal.record_transferred(
+        [
+            {"name": "a.txt", "error": "", "checked": False},
+            {"name": "b.txt", "error": "permission denied", "checked": False},
+            {"name": "c.txt", "error": "", "checked": True},
+        ]
+    )
+    entries = [json.loads(line) for line in journal.path.read_text().splitlines()[1:]]
+    assert [entry["path"] for entry in entries] == ["a.txt"]
+
+    pending = journal.write_pending(["b.txt"])
+    assert pending.read_text() == "b.txt\n"
+    journal.complete()
+    assert not journal.path.exists() and not pending.exists()
+
+
+def test_discard_removes_leftover_journal(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    journal = _open(tmp_path, source)
+    journal.close()
+
+    discard("erda", directory=str(tmp_path / "journal"))
+
+    reopened = _open(tmp_path, source)
+    assert not reopened.resumable
+    reopened.close()
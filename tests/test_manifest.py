@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import pathlib
+
+from repokit_backup import filters, manifest, rclone
+
+
+def test_scan_applies_filters_and_diff_classifies_changes(tmp_path: pathlib.Path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "a.csv").write_text("a")
+    (tmp_path / "data" / "b.csv").write_text("b")
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "lib.py").write_text("x")
+    matcher = filters.FilterMatcher(filters.compile_rules(exclude_patterns=[".venv/"]))
+
+    before = manifest.scan(tmp_path, matcher)
+    assert sorted(before) == ["data/a.csv", "data/b.csv"]
+
+    (tmp_path / "data" / "a.csv").write_text("changed")
+    (tmp_path / "data" / "b.csv").unlink()
+    (tmp_path / "data" / "c.csv").write_text("c")
+    changes = manifest.diff(before, manifest.scan(tmp_path, matcher))
+
+    assert (changes.added, changes.modified, changes.deleted) == (
+        ["data/c.csv"],
+        ["data/a.csv"],
+        ["data/b.csv"],
+    )
+    assert not manifest.diff(before, before)
+
+
+def _push(source: pathlib.Path, operation: str = "sync"):
+    return rclone._rclone_transfer(
+        remote_name="myproject",
+        src=str(source),
+        dst="myproject:/backup",
+        operation=operation,
+    )
+
+
+def test_push_sends_only_the_change_set(monkeypatch, tmp_path: pathlib.Path):
+    source = tmp_path / "project"
+    source.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (source / name).write_text(name)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+    commands: list[list[str]] = []
+    listed: dict[str, list[str]] = {}
+
+    def fake_process(command, tracker, timeout=None):
+        commands.append(command)
+        if "--files-from" in command:
+            path = pathlib.Path(command[command.index("--files-from") + 1])
+            listed["upload"] = path.read_text(encoding="utf-8").splitlines()
+
+    def fake_run(command, **_kwargs):
+        commands.append(command)
+        path = pathlib.Path(command[command.index("--files-from") + 1])
+        listed["delete"] = path.read_text(encoding="utf-8").splitlines()
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+    monkeypatch.setattr(rclone.subprocess, "run", fake_run)
+
+    assert _push(source)
+    assert commands[0][1] == "sync" and "--files-from" not in commands[0]
+
+    assert _push(source)
+    assert len(commands) == 1
+
+    (source / "a.txt").write_text("changed")
+    (source / "b.txt").unlink()
+    (source / "d.txt").write_text("d")
+    assert _push(source)
+
+    upload, delete = commands[1], commands[2]
+    assert upload[1] == "copy" and "--no-traverse" in upload
+    assert listed["upload"] == ["a.txt", "d.txt"]
+    assert delete[:3] == ["rclone", "delete", "myproject:/backup"]
+    assert listed["delete"] == ["b.txt"]
+
+    assert _push(source)
+    assert len(commands) == 3
+
+
+def test_fan_out_scans_a_shared_source_once(monkeypatch, tmp_path: pathlib.Path):
+    source = tmp_path / "project"
+    (source / "data").mkdir(parents=True)
+    (source / "data" / "a.csv").write_text("a")
+    (source / "notes.txt").write_text("n")
+    registry = {
+        name: {"remote_path": f"{name}:/backup", "local_path": str(source), "push_policy": "full"}
+        for name in ("dropbox-main", "erda")
+    }
+    scans: list[str] = []
+    received: dict[str, dict] = {}
+    real_scan = manifest.scan
+
+    def counting_scan(src, matcher=None):
+        scans.append(str(src))
+        return real_scan(src, matcher)
+
+    def fake_transfer(**kwargs):
+        received[kwargs["remote_name"]] = manifest.select(
+            kwargs["local_scan"],
+            filters.FilterMatcher(filters.compile_rules(None, kwargs["exclude_patterns"])),
+        )
+        return True
+
+    monkeypatch.setattr(rclone, "_project_root", lambda: tmp_path)
+    monkeypatch.setattr(rclone, "install_rclone", lambda *_args, **_kwargs: True)
+    monkeypatch.setattr(rclone, "load_all_registry", lambda *_args, **_kwargs: registry)
+    monkeypatch.setattr(
+        rclone,
+        "load_registry",
+        lambda name, *_args, **_kwargs: (registry[name]["remote_path"], str(source)),
+    )
+    monkeypatch.setattr(rclone, "_exclude_patterns", lambda *_args, **_kwargs: [])
+    monkeypatch.setattr(
+        rclone,
+        "_nested_remote_excludes",
+        lambda name, *_args: ["data/**"] if name == "erda" else [],
+    )
+    monkeypatch.setattr(rclone.manifest, "scan", counting_scan)
+    monkeypatch.setattr(rclone, "_rclone_transfer", fake_transfer)
+
+    assert rclone.push_rclone(remote_name="all", fan_out=True)
+
+    assert len(scans) == 1
+    assert sorted(received["dropbox-main"]) == ["data/a.csv", "notes.txt"]
+    assert sorted(received["erda"]) == ["notes.txt"]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from repokit_backup import mounts
+
+
+class _FakeProcess:
+    pid = 4242
+
+    def __init__(self, command, **_kwargs):
+        self.command = command
+        self.terminated = False
+
+    def poll(self):
+        return None
+
+    def terminate(self):
+        self.terminated = True
+
+
+def _registry(tmp_path, meta: dict) -> str:
+    path = tmp_path / "bin" / "rclone_remote.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"lumi": meta}))
+    return str(path)
+
+
+def test_mount_command_uses_a_capped_full_vfs_cache():
+    command = mounts.mount_command("lumi:proj", "/mnt/lumi", "/p/bin/cache/lumi", "20G")
+
+    assert command[:4] == ["rclone", "mount", "lumi:proj", "/mnt/lumi"]
+    assert command[command.index("--vfs-cache-mode") + 1] == "full"
+    assert command[command.index("--vfs-cache-max-size") + 1] == "20G"
+    assert command[command.index("--cache-dir") + 1] == "/p/bin/cache/lumi"
+    assert "--read-only" in command
+    assert "--read-only" not in mounts.mount_command("lumi:", "/m", "/c", writable=True)
+
+
+@pytest.mark.parametrize("value", ["", "0", "10X", "-1G"])
+def test_invalid_cache_sizes_are_rejected(value):
+    with pytest.raises(ValueError):
+        mounts.validate_cache_size(value)
+
+
+def test_mount_records_state_and_unmount_stops_rclone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    json_path = _registry(tmp_path, {"remote_path": "lumi:proj/data", "remote_type": "lumip"})
+    started: list[_FakeProcess] = []
+    mounted: set[str] = set()
+    alive: set[int] = set()
+
+    def popen(command, **kwargs):
+        process = _FakeProcess(command, **kwargs)
+        started.append(process)
+        mounted.add(command[3])
+        alive.add(process.pid)
+        return process
+
+    def kill(pid, _signal):
+        alive.discard(pid)
+        mounted.clear()
+
+    monkeypatch.setattr(mounts.subprocess, "Popen", popen)
+    monkeypatch.setattr(mounts, "_is_mounted", lambda path: path in mounted)
+    monkeypatch.setattr(mounts, "_running", lambda _path, entry: entry["pid"] in alive)
+    monkeypatch.setattr(mounts.os, "kill", kill)
+    target = tmp_path / "mnt"
+
+    assert mounts.mount_remote("lumi", str(target), json_path=json_path)
+
+    assert started[0].command[2] == "lumi:proj/data"
+    active = mounts.active_mounts()
+    assert list(active) == [str(target.resolve())]
+    assert active[str(target.resolve())]["remote"] == "lumi"
+    # A second mount of the same remote would share its cache directory.
+    assert not mounts.mount_remote("lumi", str(tmp_path / "other"), json_path=json_path)
+
+    assert mounts.unmount(remote_name="lumi")
+    assert mounts.active_mounts() == {}
+
+
+def test_mount_rejects_snapshot_layout_and_writable_append_only(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    json_path = _registry(tmp_path, {"remote_path": "lumi:proj", "storage_layout": "snapshots"})
+    assert not mounts.mount_remote("lumi", str(tmp_path / "mnt"), json_path=json_path)
+
+    json_path = _registry(tmp_path, {"remote_path": "lumi:proj", "push_policy": "append-only"})
+    assert not mounts.mount_remote(
+        "lumi", str(tmp_path / "mnt"), writable=True, json_path=json_path
+    )
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import json
+import pathlib
 from argparse import Namespace
 from types import SimpleNamespace
 
 import pytest
 
 from repokit_backup.cli import _validate_non_interactive_add
-from repokit_backup.registry import save_registry, set_remote_pin
+from repokit_backup.registry import (
+    save_registry,
+    set_detect_renames,
+    set_remote_pin,
+    set_storage_layout,
+    set_versioning,
+)
 
 
 def _fail_prompt(*_args, **_kwargs):
@@ -78,6 +85,22 @@ def test_remote_pin_refuses_to_replace_full_mapping(tmp_path, capsys):
     assert saved["remote_path"] == "myproject:/archive/myproject"
 
 
+def test_remapping_keeps_per_remote_settings(tmp_path):
+    registry_path = str(tmp_path / "bin" / "rclone_remote.json")
+    save_registry("myproject", "/archive", str(tmp_path), "dropbox", json_path=registry_path)
+    assert set_versioning("myproject", True, json_path=registry_path)
+    assert set_storage_layout("myproject", "snapshots", json_path=registry_path)
+    assert set_detect_renames("myproject", True, json_path=registry_path)
+
+    save_registry("myproject", "/archive/v2", str(tmp_path), "dropbox", json_path=registry_path)
+
+    saved = json.loads(pathlib.Path(registry_path).read_text(encoding="utf-8"))["myproject"]
+    assert saved["remote_path"] == "myproject:/archive/v2"
+    assert saved["versioning"] is True
+    assert saved["storage_layout"] == "snapshots"
+    assert saved["detect_renames"] is True
+
+
 def test_non_interactive_folder_use_never_prompts_and_preserves_slash(monkeypatch, tmp_path):
     from repokit_backup import remotes
 
@@ -209,6 +232,7 @@ def test_push_uses_remote_pin_with_explicit_local_path(monkeypatch, tmp_path):
 
     assert captured["src"] == str(tmp_path.resolve())
     assert captured["dst"] == "myproject:/Team Folder"
+    assert captured["exclude_patterns"] == ["/.repokit-store/**"]
 
 
 def test_pull_uses_remote_pin_with_explicit_local_path(monkeypatch, tmp_path, capsys):
@@ -236,6 +260,7 @@ def test_pull_uses_remote_pin_with_explicit_local_path(monkeypatch, tmp_path, ca
     assert "Defaulting pull source" not in capsys.readouterr().out
     assert captured["src"] == "myproject:/Team Folder"
     assert captured["dst"] == str(destination)
+    assert captured["exclude_patterns"] == ["/.repokit-store/**"]
 
 
 def test_delete_never_purges_externally_owned_pin(monkeypatch):
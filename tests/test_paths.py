@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import pytest
+
+from repokit_backup.paths import join_remote, safe_name, safe_target
+
+
+def test_safe_name_replaces_unsafe_characters():
+    assert safe_name(" Lumi/Proj shard-1 ") == "lumi_proj_shard-1"
+    assert safe_name("", default="transfer") == "transfer"
+    assert safe_name(None) == "remote"
+    # Bundle state files keep the case of the directory they describe.
+    assert safe_name("Data/Raw", default="", lower=False) == "Data_Raw"
+
+
+def test_join_remote_and_safe_target(tmp_path):
+    assert join_remote("lumi:", "/proj/", "a") == "lumi:proj/a"
+    assert join_remote("lumi:proj/", "", "b.txt") == "lumi:proj/b.txt"
+    assert safe_target(tmp_path, "a/b.txt") == tmp_path.resolve() / "a" / "b.txt"
+    with pytest.raises(ValueError, match="Unsafe path"):
+        safe_target(tmp_path, "../escape.txt")
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+
+from repokit_backup import plans, rclone
+
+
+def test_dry_run_plan_is_executed_without_listing_and_rejected_when_stale(
+    monkeypatch, tmp_path: pathlib.Path, capsys
+):
+    source = tmp_path / "project"
+    source.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (source / name).write_text(name)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+    commands: list[list[str]] = []
+    listed: dict[str, list[str]] = {}
+
+    def fake_process(command, tracker, timeout=None):
+        commands.append(command)
+        if "--combined" in command:
+            report = pathlib.Path(command[command.index("--combined") + 1])
+            report.write_text("+ a.txt\n* b.txt\n= c.txt\n- old.txt\n", encoding="utf-8")
+        if "--files-from" in command:
+            path = pathlib.Path(command[command.index("--files-from") + 1])
+            listed["upload"] = path.read_text(encoding="utf-8").splitlines()
+
+    def fake_run(command, **_kwargs):
+        commands.append(command)
+        path = pathlib.Path(command[command.index("--files-from") + 1])
+        listed["delete"] = path.read_text(encoding="utf-8").splitlines()
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+    monkeypatch.setattr(rclone.subprocess, "run", fake_run)
+
+    def push(**kwargs):
+        return rclone._rclone_transfer(
+            remote_name="myproject",
+            src=str(source),
+            dst="myproject:/backup",
+            operation="sync",
+            **kwargs,
+        )
+
+    plan_path = tmp_path / "plan.json"
+    assert push(dry_run=True, plan_out=str(plan_path))
+    assert commands[0][1] == "sync" and "--dry-run" in commands[0]
+    plan = json.loads(plan_path.read_text(encoding="utf-8"))
+    assert [item["path"] for item in plan["copy"]] == ["a.txt", "b.txt"]
+    assert plan["bytes"] == 10 and plan["delete"] == ["old.txt"]
+
+    commands.clear()
+    assert push(plan=str(plan_path))
+    upload = commands[0]
+    assert upload[1] == "copy" and "--no-traverse" in upload and "--dry-run" not in upload
+    assert listed == {"upload": ["a.txt", "b.txt"], "delete": ["old.txt"]}
+    assert commands[1][:3] == ["rclone", "delete", "myproject:/backup"]
+    capsys.readouterr()
+
+    commands.clear()
+    stat = (source / "b.txt").stat()
+    os.utime(source / "b.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not push(plan=str(plan_path))
+    assert not rclone._rclone_transfer(
+        remote_name="myproject",
+        src=str(source),
+        dst="myproject:/other",
+        operation="sync",
+        plan=str(plan_path),
+    )
+    assert commands == []
+    out = capsys.readouterr().out
+    assert "is stale: 1 files changed since the dry run: b.txt (changed)" in out
+    assert "different dst (dst='myproject:/backup')" in out
+
+
+def test_executing_a_plan_leaves_bundles_alone(monkeypatch, tmp_path: pathlib.Path):
+    source = tmp_path / "project"
+    (source / "tiny").mkdir(parents=True)
+    (source / "a.txt").write_text("a")
+    (source / "tiny" / "t.txt").write_text("t")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(rclone, "_ucloud_config_args", lambda *_args: [])
+    packed: list[bool] = []
+
+    def fake_push_bundles(*_args, transfer=True, **_kwargs):
+        packed.append(transfer)
+        return True, ["/.repokit-bundles/**", "/tiny/**"]
+
+    def fake_process(command, tracker, timeout=None):
+        if "--combined" in command:
+            report = pathlib.Path(command[command.index("--combined") + 1])
+            report.write_text("+ a.txt\n", encoding="utf-8")
+
+    monkeypatch.setattr(rclone.bundle, "push_bundles", fake_push_bundles)
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+
+    def push(**kwargs):
+        return rclone._bundled_transfer(
+            (["tiny"], 1024),
+            remote_name="myproject",
+            src=str(source),
+            dst="myproject:/backup",
+            src_kind="local",
+            action="push",
+            operation="copy",
+            **kwargs,
+        )
+
+    plan_path = tmp_path / "plan.json"
+    assert push(dry_run=True, plan_out=str(plan_path))
+    assert push(plan=str(plan_path))
+    assert packed == [True, False]
+
+
+def test_plan_is_stale_when_a_planned_deletion_exists_locally_again(tmp_path: pathlib.Path):
+    plan = {"key": "k", "copy": [], "delete": ["old.txt"]}
+
+    assert plans.check_plan(plan, str(tmp_path), "myproject:/backup", "sync", "k") == []
+    (tmp_path / "old.txt").write_text("back")
+    assert plans.check_plan(plan, str(tmp_path), "myproject:/backup", "sync", "k") == [
+        "1 files changed since the dry run: old.txt (recreated)"
+    ]
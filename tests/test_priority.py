@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import pathlib
+
+import pytest
+
+from repokit_backup import filters, priority, rclone
+
+
+def _matching_classes(classes, path: str) -> list[int]:
+    return [
+        number
+        for number, restore_class in enumerate(classes, start=1)
+        if filters.FilterMatcher(
+            filters.compile_rules(restore_class.include_patterns, restore_class.exclude_patterns)
+        ).includes(path)
+    ]
+
+
+def test_glob_classes_restore_every_file_exactly_once():
+    classes = priority.plan_classes([["*.py", "*.toml"], ["config/**"]])
+
+    assert [restore_class.label for restore_class in classes] == [
+        "*.py, *.toml",
+        "config/**",
+        "remaining files",
+    ]
+    assert _matching_classes(classes, "src/main.py") == [1]
+    assert _matching_classes(classes, "config/run.py") == [1]
+    assert _matching_classes(classes, "config/run.yaml") == [2]
+    assert _matching_classes(classes, "data/raw/a.parquet") == [3]
+
+
+def test_default_classes_split_by_contiguous_size_ranges():
+    classes = priority.plan_classes(None, tiers=(1024, 4096))
+
+    assert [restore_class.size_range for restore_class in classes] == [
+        (None, 1024),
+        (1025, 4096),
+        (4097, None),
+    ]
+    assert priority.size_args(classes[1].size_range) == [
+        "--min-size",
+        "1025B",
+        "--max-size",
+        "4096B",
+    ]
+    assert priority.size_args(None) == []
+
+
+@pytest.mark.parametrize("value", ["", " , "])
+def test_empty_priority_classes_are_rejected(value):
+    with pytest.raises(ValueError):
+        priority.parse_class(value)
+
+
+def test_prioritized_pull_runs_classes_in_order_and_records_progress(
+    monkeypatch, tmp_path: pathlib.Path
+):
+    monkeypatch.chdir(tmp_path)
+    statuses: list[dict] = []
+    commands: list[list[str]] = []
+    monkeypatch.setattr(
+        rclone, "update_sync_status", lambda *_args, **kwargs: statuses.append(kwargs)
+    )
+    monkeypatch.setattr(
+        rclone,
+        "_run_rclone_process",
+        lambda command, tracker, timeout=None: commands.append(command),
+    )
+    classes = priority.plan_classes(None)
+
+    result = rclone._scoped_transfer(
+        priority_classes=classes,
+        remote_name="lumi",
+        src="lumi:proj",
+        dst=str(tmp_path / "restore"),
+        src_kind="remote",
+        action="pull",
+        exclude_patterns=[".git/**"],
+    )
+
+    assert result
+    assert len(commands) == len(classes)
+    assert "--max-size" in commands[0] and "--min-size" not in commands[0]
+    assert "--min-size" in commands[-1] and "--max-size" not in commands[-1]
+    # One combined status instead of one per class.
+    assert len(statuses) == 1 and statuses[0]["action"] == "pull"
+    progress = json.loads((tmp_path / "bin" / "restore" / "lumi.json").read_text())
+    assert [entry["ok"] for entry in progress["classes"]] == [True] * len(classes)
+    assert progress["finished"] is not None
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from repokit_backup.progress import (
+    ProgressPrinter,
+    StatsTracker,
+    TransferResult,
+    format_bytes,
+    format_duration,
+)
+
+
+def test_format_helpers():
+    assert format_bytes(512) == "512 B"
+    assert format_bytes(1536) == "1.5 KiB"
+    assert format_bytes(3 * 1024**3) == "3.0 GiB"
+    assert format_duration(3725) == "1h2m5s"
+    assert format_duration(None) == "-"
+
+
+def test_tracker_parses_stats_and_echoes_errors(capsys):
+    stream = io.StringIO()
+    tracker = StatsTracker(printer=ProgressPrinter(label="erda", stream=stream, interval=0))
+
+    tracker.feed(json.dumps({"level": "notice", "stats": {"bytes": 10, "speed": 50.0}}))
+    tracker.feed(
+        json.dumps(
+            {"level": "error", "msg": "Failed to copy: permission denied", "object": "a.txt"}
+        )
+    )
+    tracker.feed(json.dumps({"level": "info", "msg": "Copied (new)", "object": "b.txt"}))
+    tracker.feed("plain rclone output")
+    tracker.feed(
+        json.dumps(
+            {
+                "level": "notice",
+                "stats": {
+                    "bytes": 100,
+                    "totalBytes": 200,
+                    "transfers": 4,
+                    "checks": 2,
+                    "errors": 1,
+                    "elapsedTime": 2.0,
+                    "speed": 20.0,
+                    "eta": 5,
+                },
+            }
+        )
+    )
+
+    out = capsys.readouterr().out
+    assert "a.txt: Failed to copy: permission denied" in out
+    assert "b.txt" not in out
+    assert "plain rclone output" in out
+    assert "[erda] 100 B/200 B, 20 B/s, 2.0 files/s, ETA 5s" in stream.getvalue()
+
+    result = tracker.result(ok=False)
+    assert not result
+    assert (result.bytes, result.files, result.checks, result.errors) == (100, 4, 2, 1)
+    assert result.elapsed == 2.0
+    assert result.average_speed == 50.0
+    assert result.peak_speed == 50.0
+    assert result.failed == ["a.txt"]
+    assert result.status == "partial (1 failed)"
+    assert TransferResult(ok=False).status == "failed"
+
+
+def test_result_round_trips_and_combines():
+    first = TransferResult(ok=True, bytes=100, files=1, elapsed=10.0, peak_speed=30.0)
+    second = TransferResult(ok=False, bytes=300, files=2, elapsed=20.0, peak_speed=50.0)
+
+    assert TransferResult.from_dict(first.to_dict()) == first
+    assert TransferResult.from_dict({"bytes": 5}).ok is False
+
+    combined = TransferResult.combine([first, second])
+    assert not combined
+    assert (combined.bytes, combined.files, combined.elapsed) == (400, 3, 20.0)
+    assert combined.average_speed == 20.0
+    assert combined.peak_speed == 50.0
+    # A job that raised or returned False counts as one failed transfer.
+    assert TransferResult.of_job(first) is first
+    assert TransferResult.of_job(None) == TransferResult(ok=False)
+    with pytest.raises(TypeError):
+        TransferResult.combine([first, False])
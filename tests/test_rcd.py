@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from repokit_backup import rcd
+
+
+class _FakeRc(BaseHTTPRequestHandler):
+    calls: list[tuple[str, dict, str | None]] = []
+    replies: dict[str, list[tuple[int, dict]]] = {}
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        params = json.loads(self.rfile.read(length) or b"{}")
+        method = self.path.lstrip("/")
+        type(self).calls.append((method, params, self.headers.get("Authorization")))
+        queue = type(self).replies.get(method) or [(200, {})]
+        status, body = queue.pop(0) if len(queue) > 1 else queue[0]
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_args):
+        return None
+
+
+@pytest.fixture
+def fake_rc():
+    _FakeRc.calls = []
+    _FakeRc.replies = {}
+    server = HTTPServer(("127.0.0.1", 0), _FakeRc)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = rcd.RcdClient(port=server.server_address[1], user="repokit", password="secret")
+    yield client, _FakeRc
+    server.shutdown()
+    server.server_close()
+
+
+def test_run_transfer_submits_async_job_and_waits(monkeypatch, fake_rc):
+    client, handler = fake_rc
+    monkeypatch.setattr(rcd, "POLL_INTERVAL", 0)
+    handler.replies = {
+        "sync/copy": [(200, {"jobid": 7})],
+        "job/status": [(200, {"finished": False}), (200, {"finished": True, "success": True})],
+    }
+
+    rcd.run_transfer(
+        client,
+        "copy",
+        "/work/project",
+        "dropbox:backup",
+        include_patterns=["data/**"],
+        exclude_patterns=["bin/"],
+        dry_run=True,
+    )
+
+    method, params, auth = handler.calls[0]
+    assert method == "sync/copy"
+    assert auth.startswith("Basic ")
+    assert params["srcFs"].replace("\\", "/").endswith("/work/project")
+    assert params["dstFs"] == "dropbox:backup"
+    assert params["_async"] is True
+    assert params["_config"] == {"DryRun": True}
+    assert params["_filter"] == {"IncludeRule": ["data/**"], "ExcludeRule": ["bin/"]}
+    assert [call[0] for call in handler.calls[1:]] == ["job/status", "job/status"]
+
+
+def test_run_transfer_raises_on_failed_job(monkeypatch, fake_rc):
+    client, handler = fake_rc
+    monkeypatch.setattr(rcd, "POLL_INTERVAL", 0)
+    handler.replies = {
+        "sync/sync": [(200, {"jobid": 1})],
+        "job/status": [(200, {"finished": True, "success": False, "error": "quota exceeded"})],
+    }
+
+    with pytest.raises(rcd.RcdError, match="quota exceeded"):
+        rcd.run_transfer(client, "sync", "dropbox:a", "dropbox:b")
+
+
+def test_run_transfer_stops_job_after_timeout(monkeypatch, fake_rc):
+    client, handler = fake_rc
+    monkeypatch.setattr(rcd, "POLL_INTERVAL", 0)
+    handler.replies = {
+        "sync/copy": [(200, {"jobid": 3})],
+        "job/status": [(200, {"finished": False})],
+    }
+
+    with pytest.raises(TimeoutError):
+        rcd.run_transfer(client, "copy", "dropbox:a", "dropbox:b", timeout=0)
+
+    assert ("job/stop", {"jobid": 3}) in [(call[0], call[1]) for call in handler.calls]
+
+
+def test_list_entries_matches_lsf_format(fake_rc):
+    client, handler = fake_rc
+    handler.replies = {
+        "operations/list": [
+            (
+                200,
+                {
+                    "list": [
+                        {"Path": "data", "IsDir": True},
+                        {"Path": "notes.txt", "IsDir": False},
+                    ]
+                },
+            )
+        ]
+    }
+
+    assert rcd.list_entries(client, "dropbox:project") == ["data/", "notes.txt"]
+    assert handler.calls[0][1]["opt"] == {"recurse": False}
+
+
+def test_http_errors_surface_rclone_message(fake_rc):
+    client, handler = fake_rc
+    handler.replies = {"operations/mkdir": [(500, {"error": "permission denied"})]}
+
+    with pytest.raises(rcd.RcdError, match="permission denied"):
+        rcd.mkdir(client, "erda:/locked")
+
+
+def test_active_client_is_opt_in_and_skips_ucloud(monkeypatch):
+    monkeypatch.delenv(rcd.EXECUTOR_ENV, raising=False)
+    monkeypatch.setattr(rcd, "ensure_daemon", lambda: "client")
+    assert rcd.active_client("dropbox") is None
+
+    monkeypatch.setenv(rcd.EXECUTOR_ENV, "rcd")
+    assert rcd.active_client("dropbox") == "client"
+    assert rcd.active_client("ucloud-main") is None
+    assert rcd.active_client("hpc", registry={"hpc": {"remote_type": "ucloud"}}) is None
+
+
+def test_unreachable_daemon_reports_not_running(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert not rcd.daemon_status()
+
+
+def test_run_transfer_reports_job_stats(monkeypatch, fake_rc):
+    client, handler = fake_rc
+    monkeypatch.setattr(rcd, "POLL_INTERVAL", 0)
+    handler.replies = {
+        "sync/copy": [(200, {"jobid": 9})],
+        "job/status": [(200, {"finished": True, "success": True})],
+        "core/stats": [(200, {"bytes": 2048, "transfers": 2})],
+    }
+    seen: list[dict] = []
+
+    rcd.run_transfer(client, "copy", "dropbox:a", "dropbox:b", on_stats=seen.append)
+
+    assert seen == [{"bytes": 2048, "transfers": 2}]
+    assert ("core/stats", {"group": "job/9"}) in [(call[0], call[1]) for call in handler.calls]
@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import hashlib
 import io
+import json
 import pathlib
 import subprocess
 import sys
@@ -104,16 +105,47 @@ def test_rclone_archive_rejects_path_traversal(tmp_path: pathlib.Path):
     assert not (tmp_path.parent / "outside").exists()
 
 
-def test_transfer_failure_returns_false(monkeypatch, tmp_path: pathlib.Path):
-    monkeypatch.setattr(rclone.os.path, "exists", lambda _path: True)
-    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+class _FakeProcess:
+    """Stand-in for an rclone process that writes JSON log lines to stderr."""
+
+    instances: list["_FakeProcess"] = []
+
+    def __init__(self, command, *, returncode=0, stderr_lines=(), wait_error=None, **kwargs):
+        self.command = command
+        self.kwargs = kwargs
+        self.returncode = returncode
+        self.stderr = io.StringIO("".join(f"{line}\n" for line in stderr_lines))
+        self.wait_error = wait_error
+        self.wait_timeout = "not called"
+        self.killed = False
+        _FakeProcess.instances.append(self)
+
+    def wait(self, timeout=None):
+        if self.wait_timeout == "not called":
+            self.wait_timeout = timeout
+            if self.wait_error is not None:
+                raise self.wait_error
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+
+
+def _fake_popen(monkeypatch, **process_kwargs) -> list[_FakeProcess]:
+    _FakeProcess.instances = []
     monkeypatch.setattr(
         rclone.subprocess,
-        "run",
-        lambda *_args, **_kwargs: (_ for _ in ()).throw(
-            subprocess.CalledProcessError(returncode=1, cmd="rclone")
-        ),
+        "Popen",
+        lambda command, **kwargs: _FakeProcess(command, **process_kwargs, **kwargs),
     )
+    return _FakeProcess.instances
+
+
+def test_transfer_failure_returns_false(monkeypatch, tmp_path: pathlib.Path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone.os.path, "exists", lambda _path: True)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+    _fake_popen(monkeypatch, returncode=1)
 
     assert not rclone._rclone_transfer(
         remote_name="myproject",
@@ -124,15 +156,10 @@ def test_transfer_failure_returns_false(monkeypatch, tmp_path: pathlib.Path):
 
 
 def test_transfer_has_no_default_total_timeout(monkeypatch, tmp_path: pathlib.Path):
-    captured: dict[str, object] = {}
+    monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(rclone.os.path, "exists", lambda _path: True)
     monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
-
-    def fake_run(command, **kwargs):
-        captured["command"] = command
-        captured["kwargs"] = kwargs
-
-    monkeypatch.setattr(rclone.subprocess, "run", fake_run)
+    processes = _fake_popen(monkeypatch)
 
     assert rclone._rclone_transfer(
         remote_name="myproject",
@@ -140,19 +167,14 @@ def test_transfer_has_no_default_total_timeout(monkeypatch, tmp_path: pathlib.Pa
         dst="myproject:/backup",
         operation="copy",
     )
-    assert captured["kwargs"] == {"check": True}
+    assert processes[0].wait_timeout is None
 
 
 def test_transfer_uses_explicit_total_timeout(monkeypatch, tmp_path: pathlib.Path):
-    captured: dict[str, object] = {}
+    monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(rclone.os.path, "exists", lambda _path: True)
     monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
-
-    def fake_run(command, **kwargs):
-        captured["command"] = command
-        captured["kwargs"] = kwargs
-
-    monkeypatch.setattr(rclone.subprocess, "run", fake_run)
+    processes = _fake_popen(monkeypatch)
 
     assert rclone._rclone_transfer(
         remote_name="myproject",
@@ -161,23 +183,20 @@ def test_transfer_uses_explicit_total_timeout(monkeypatch, tmp_path: pathlib.Pat
         operation="copy",
         transfer_timeout=7200,
     )
-    assert captured["kwargs"] == {"check": True, "timeout": 7200}
+    assert processes[0].wait_timeout == 7200
 
 
 def test_transfer_timeout_marks_transfer_failed(monkeypatch, tmp_path: pathlib.Path, capsys):
     status: dict[str, object] = {}
+    monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(rclone.os.path, "exists", lambda _path: True)
     monkeypatch.setattr(
         rclone,
         "update_sync_status",
         lambda *_args, **kwargs: status.update(kwargs),
     )
-    monkeypatch.setattr(
-        rclone.subprocess,
-        "run",
-        lambda *_args, **_kwargs: (_ for _ in ()).throw(
-            subprocess.TimeoutExpired(cmd="rclone", timeout=45)
-        ),
+    processes = _fake_popen(
+        monkeypatch, wait_error=subprocess.TimeoutExpired(cmd="rclone", timeout=45)
     )
 
     assert not rclone._rclone_transfer(
@@ -189,6 +208,166 @@ def test_transfer_timeout_marks_transfer_failed(monkeypatch, tmp_path: pathlib.P
     )
     assert "exceeded the configured total transfer timeout of 45 seconds" in capsys.readouterr().out
     assert status["success"] is False
+    assert processes[0].killed
+
+
+def test_transfer_returns_and_records_parsed_stats(monkeypatch, tmp_path: pathlib.Path):
+    status: dict[str, object] = {}
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone.os.path, "exists", lambda _path: True)
+    monkeypatch.setattr(
+        rclone,
+        "update_sync_status",
+        lambda *_args, **kwargs: status.update(kwargs),
+    )
+    stats_lines = [
+        json.dumps({"level": "notice", "stats": {"bytes": 1024, "speed": 4096.0}}),
+        json.dumps(
+            {
+                "level": "notice",
+                "stats": {
+                    "bytes": 4096,
+                    "transfers": 3,
+                    "checks": 5,
+                    "errors": 0,
+                    "elapsedTime": 2.0,
+                    "speed": 1024.0,
+                },
+            }
+        ),
+    ]
+    processes = _fake_popen(monkeypatch, stderr_lines=stats_lines)
+
+    result = rclone._rclone_transfer(
+        remote_name="myproject",
+        src=str(tmp_path),
+        dst="myproject:/backup",
+        operation="copy",
+    )
+
+    assert result
+    assert "--use-json-log" in processes[0].command
+    assert (result.bytes, result.files, result.checks) == (4096, 3, 5)
+    assert result.average_speed == 2048.0
+    assert result.peak_speed == 4096.0
+    assert status["result"]["bytes"] == 4096
+
+
+def test_failed_files_are_retried_alone_with_backoff(monkeypatch, tmp_path: pathlib.Path):
+    source = tmp_path / "project"
+    source.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (source / name).write_text(name)
+    status: dict[str, object] = {}
+    delays: list[float] = []
+    listed: list[list[str]] = []
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_a, **kwargs: status.update(kwargs))
+    monkeypatch.setattr(rclone.time, "sleep", delays.append)
+
+    def fake_process(command, tracker, timeout=None):
+        if "--files-from" in command:
+            path = pathlib.Path(command[command.index("--files-from") + 1])
+            listed.append(path.read_text(encoding="utf-8").splitlines())
+            failing = ["a.txt"]
+        else:
+            failing = ["a.txt", "b.txt"]
+        assert command[command.index("--retries") + 1] == "1"
+        for name in failing:
+            tracker.feed(
+                json.dumps({"level": "error", "msg": "Failed to copy: 503", "object": name})
+            )
+        raise subprocess.CalledProcessError(1, command)
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+
+    result = rclone._rclone_transfer(
+        remote_name="myproject", src=str(source), dst="myproject:/backup", operation="sync"
+    )
+
+    assert not result and result.failed == ["a.txt"]
+    assert listed == [["a.txt", "b.txt"], ["a.txt"], ["a.txt"]]
+    assert delays == [5.0, 10.0, 20.0]
+    assert status["result"]["failed"] == ["a.txt"] and status["result"]["failed_count"] == 1
+    saved = tmp_path / "bin" / "failed" / "myproject.txt"
+    assert saved.read_text(encoding="utf-8").splitlines() == ["a.txt"]
+
+
+def test_successful_retries_of_a_sync_end_with_a_deleting_sync(monkeypatch, tmp_path: pathlib.Path):
+    source = tmp_path / "project"
+    source.mkdir()
+    (source / "a.txt").write_text("a")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(rclone.time, "sleep", lambda _delay: None)
+    commands: list[list[str]] = []
+
+    def fake_process(command, tracker, timeout=None):
+        commands.append(command)
+        if len(commands) == 1:
+            tracker.feed(json.dumps({"level": "error", "msg": "503", "object": "a.txt"}))
+            raise subprocess.CalledProcessError(1, command)
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+
+    assert rclone._rclone_transfer(
+        remote_name="myproject", src=str(source), dst="myproject:/backup", operation="sync"
+    )
+    assert [command[1] for command in commands] == ["sync", "copy", "sync"]
+    assert "--files-from" not in commands[-1]
+
+
+def test_interrupted_push_resumes_with_pending_files(monkeypatch, tmp_path: pathlib.Path):
+    source = tmp_path / "project"
+    source.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (source / name).write_text(name)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_args, **_kwargs: None)
+    copied = [
+        json.dumps({"level": "info", "msg": "Copied (new)", "object": name})
+        for name in ("a.txt", "b.txt")
+    ]
+    processes = _fake_popen(
+        monkeypatch,
+        stderr_lines=copied,
+        wait_error=subprocess.TimeoutExpired(cmd="rclone", timeout=5),
+    )
+
+    assert not rclone._rclone_transfer(
+        remote_name="myproject",
+        src=str(source),
+        dst="myproject:/backup",
+        operation="sync",
+        transfer_timeout=5,
+    )
+    assert "-v" in processes[0].command
+
+    monkeypatch.setattr(
+        rclone.journal,
+        "list_files",
+        lambda *_args: ["a.txt", "b.txt", "c.txt"],
+    )
+    pending: list[str] = []
+
+    def popen(command, **kwargs):
+        files_from = pathlib.Path(command[command.index("--files-from") + 1])
+        pending.append(files_from.read_text())
+        return _FakeProcess(command, **kwargs)
+
+    monkeypatch.setattr(rclone.subprocess, "Popen", popen)
+    assert rclone._rclone_transfer(
+        remote_name="myproject",
+        src=str(source),
+        dst="myproject:/backup",
+        operation="sync",
+    )
+
+    command = _FakeProcess.instances[-1].command
+    assert command[1] == "copy"
+    assert "--no-traverse" in command
+    assert pending == ["c.txt\n"]
+    assert not (tmp_path / "bin" / "journal" / "myproject.jsonl").exists()
 
 
 @pytest.mark.parametrize(
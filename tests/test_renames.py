@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+
+from repokit_backup import manifest, renames
+
+
+class _Remote:
+    def __init__(self, features: dict, listing: list[dict] | None = None):
+        self.features = features
+        self.listing = listing or []
+        self.calls: list[list[str]] = []
+
+    def __call__(self, command: list[str]) -> str:
+        self.calls.append(command)
+        if command[1:3] == ["backend", "features"]:
+            return json.dumps(self.features)
+        if command[1] == "lsjson":
+            return json.dumps(self.listing)
+        return ""
+
+
+def _tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "project"
+    (source / "data" / "raw").mkdir(parents=True)
+    (source / "data" / "raw" / "a.csv").write_text("alpha\n" * 100)
+    (source / "data" / "raw" / "b.csv").write_text("beta\n" * 100)
+    (source / "empty.txt").write_text("")
+    return source
+
+
+def test_renamed_directory_becomes_server_side_moves(tmp_path, monkeypatch):
+    source = _tree(tmp_path, monkeypatch)
+    previous = manifest.scan(source)
+    os.rename(source / "data" / "raw", source / "data" / "archive")
+    (source / "data" / "new.csv").write_text("fresh")
+    current = manifest.scan(source)
+    changes = manifest.diff(previous, current)
+    remote = _Remote({"Features": {"Move": True, "Copy": True}, "Hashes": ["md5"]})
+
+    moved = renames.detect_and_apply(
+        "store", changes, previous, current, str(source), "store:backup", runner=remote
+    )
+
+    assert moved == 2
+    assert changes.added == ["data/new.csv"]
+    assert changes.deleted == []
+    moves = sorted(call[2:4] for call in remote.calls if call[1] == "moveto")
+    assert moves == [
+        ["store:backup/data/raw/a.csv", "store:backup/data/archive/a.csv"],
+        ["store:backup/data/raw/b.csv", "store:backup/data/archive/b.csv"],
+    ]
+    # Inode matches need no hashes from the remote.
+    assert not [call for call in remote.calls if call[1] == "lsjson"]
+
+
+def test_copied_file_is_matched_by_size_and_hash_with_copy_fallback(tmp_path, monkeypatch):
+    source = _tree(tmp_path, monkeypatch)
+    previous = manifest.scan(source)
+    old = source / "data" / "raw" / "a.csv"
+    (source / "a-moved.csv").write_bytes(old.read_bytes())
+    old.unlink()
+    current = manifest.scan(source)
+    changes = manifest.diff(previous, current)
+    digest = hashlib.md5(("alpha\n" * 100).encode()).hexdigest()
+    remote = _Remote(
+        {"Features": {"Move": False, "Copy": True}, "Hashes": ["md5"]},
+        [{"Path": "data/raw/a.csv", "Size": 600, "Hashes": {"md5": digest}}],
+    )
+
+    moved = renames.detect_and_apply(
+        "store", changes, previous, current, str(source), "store:backup", runner=remote
+    )
+
+    assert moved == 1
+    assert changes.added == [] and changes.deleted == []
+    verbs = [call[1] for call in remote.calls if call[1] in {"copyto", "deletefile", "moveto"}]
+    assert verbs == ["copyto", "deletefile"]
+
+
+def test_backends_without_server_side_operations_upload_as_before(tmp_path, monkeypatch):
+    source = _tree(tmp_path, monkeypatch)
+    previous = manifest.scan(source)
+    os.rename(source / "data" / "raw", source / "data" / "archive")
+    current = manifest.scan(source)
+    changes = manifest.diff(previous, current)
+    remote = _Remote({"Features": {"Move": False, "Copy": False}, "Hashes": []})
+
+    moved = renames.detect_and_apply(
+        "store", changes, previous, current, str(source), "store:backup", runner=remote
+    )
+
+    assert moved == 0
+    assert len(changes.added) == 2 and len(changes.deleted) == 2
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from repokit_backup.scheduler import Job, parse_backend_limit, resolve_backend_limits, run_jobs
+
+
+def _tracking_job(name: str, backend: str, state: dict, lock: threading.Lock) -> Job:
+    def run():
+        with lock:
+            state["active"] += 1
+            state[backend] = state.get(backend, 0) + 1
+            state["peak"] = max(state["peak"], state["active"])
+            state[f"peak-{backend}"] = max(state.get(f"peak-{backend}", 0), state[backend])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+            state[backend] -= 1
+        return True
+
+    return Job(name=name, backend=backend, run=run)
+
+
+def test_run_jobs_respects_global_and_backend_limits():
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+    jobs = [_tracking_job(f"dropbox-{i}", "dropbox", state, lock) for i in range(4)]
+    jobs += [_tracking_job(f"erda-{i}", "erda", state, lock) for i in range(4)]
+
+    outcomes = run_jobs(jobs, max_jobs=4, backend_limits={"dropbox": 1})
+
+    assert [outcome.name for outcome in outcomes] == [job.name for job in jobs]
+    assert all(outcome.ok for outcome in outcomes)
+    assert state["peak"] <= 4
+    assert state["peak-dropbox"] == 1
+    assert state["peak-erda"] >= 2
+
+
+def test_run_jobs_records_failures_and_exceptions():
+    def boom():
+        raise RuntimeError("rclone vanished")
+
+    outcomes = run_jobs(
+        [
+            Job(name="good", backend="s3", run=lambda: True),
+            Job(name="bad", backend="s3", run=lambda: False),
+            Job(name="broken", backend="s3", run=boom),
+        ],
+        max_jobs=2,
+    )
+
+    assert [outcome.ok for outcome in outcomes] == [True, False, False]
+    assert outcomes[2].error == "rclone vanished"
+
+
+def test_parse_backend_limit_normalizes_aliases():
+    assert parse_backend_limit("lumi-o=3") == ("lumio", 3)
+    assert resolve_backend_limits({"dropbox": 5})["dropbox"] == 5
+    with pytest.raises(ValueError, match="BACKEND=N"):
+        parse_backend_limit("dropbox")
+    with pytest.raises(ValueError, match="at least 1"):
+        parse_backend_limit("dropbox=0")
+
+
+def test_push_all_runs_remotes_concurrently_and_aggregates(monkeypatch, capsys):
+    from repokit_backup import rclone
+
+    registry = {
+        "dropbox-main": {
+            "remote_path": "dropbox-main:backup",
+            "local_path": "/work/project",
+            "remote_type": "dropbox",
+            "push_policy": "full",
+        },
+        "erda": {
+            "remote_path": "erda:/backup",
+            "local_path": "/work/project",
+            "remote_type": "erda",
+            "push_policy": "full",
+        },
+        "archive": {
+            "remote_path": "archive:/backup",
+            "local_path": "/work/project",
+            "remote_type": "s3",
+            "push_policy": "pull-only",
+        },
+    }
+    started = threading.Barrier(2, timeout=5)
+    calls: list[str] = []
+
+    def fake_transfer(**kwargs):
+        calls.append(kwargs["remote_name"])
+        started.wait()
+        return kwargs["remote_name"] != "erda"
+
+    monkeypatch.setattr(rclone, "install_rclone", lambda *_args, **_kwargs: True)
+    monkeypatch.setattr(rclone, "load_all_registry", lambda *_args, **_kwargs: registry)
+    monkeypatch.setattr(
+        rclone,
+        "load_registry",
+        lambda name, *_args, **_kwargs: (
+            registry[name]["remote_path"],
+            registry[name]["local_path"],
+        ),
+    )
+    monkeypatch.setattr(rclone, "_exclude_patterns", lambda *_args, **_kwargs: [])
+    monkeypatch.setattr(rclone, "_nested_remote_excludes", lambda *_args, **_kwargs: [])
+    monkeypatch.setattr(rclone, "_rclone_transfer", fake_transfer)
+
+    assert not rclone.push_rclone(remote_name="all", jobs=2)
+
+    out = capsys.readouterr().out
+    assert sorted(calls) == ["dropbox-main", "erda"]
+    assert "dropbox-main (dropbox): ok" in out
+    assert "erda (erda): FAILED" in out
+    assert "archive: skipped (pull-only policy)" in out
+    assert "1/3 remotes succeeded." in out
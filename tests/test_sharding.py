@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import pathlib
+import subprocess
+
+from repokit_backup import filters, rclone, sharding
+
+FILES = {
+    "code/main.py": 10,
+    "data/raw/a.bin": 400,
+    "data/raw/b.bin": 300,
+    "data/proc/c.bin": 250,
+    "data/proc/d.bin": 50,
+    "docs/readme.md": 5,
+    "setup.cfg": 1,
+}
+
+
+def test_plan_units_splits_oversized_directories_and_packs_by_size():
+    index = sharding.build_size_index(FILES)
+    units = sharding.plan_units(index, 3)
+
+    assert "data/" not in units
+    assert units["data/raw/a.bin"] == 400
+    assert sum(units.values()) == sum(FILES.values())
+
+    bins = sharding.pack(units, 3)
+    loads = sorted(sum(units[unit] for unit in group) for group in bins)
+    assert loads == [306, 310, 400]
+
+
+def test_shard_filters_cover_every_file_exactly_once():
+    index = sharding.build_size_index(FILES)
+    bins = sharding.pack(sharding.plan_units(index, 3), 3)
+    matchers = [
+        filters.FilterMatcher(filters.compile_rules(include, exclude + ["docs/**"]))
+        for include, exclude in sharding.shard_filters(bins)
+    ]
+
+    for path in list(FILES) + ["new-top-level/file.txt", "data/raw/new.bin"]:
+        owners = [number for number, matcher in enumerate(matchers) if matcher.includes(path)]
+        expected = 0 if path.startswith("docs/") else 1
+        assert len(owners) == expected, path
+    assert matchers[0].includes("new-top-level/file.txt")
+
+
+def test_sharded_push_runs_concurrent_scoped_transfers(monkeypatch, tmp_path: pathlib.Path):
+    source = tmp_path / "project"
+    for relative, size in FILES.items():
+        (source / relative).parent.mkdir(parents=True, exist_ok=True)
+        (source / relative).write_bytes(b"x" * size)
+    calls: list[dict] = []
+    status: list[dict] = []
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_a, **kwargs: status.append(kwargs))
+
+    def fake_transfer(**kwargs):
+        calls.append(kwargs)
+        return rclone.TransferResult(ok=True, bytes=100, files=1)
+
+    monkeypatch.setattr(rclone, "_rclone_transfer", fake_transfer)
+
+    result = rclone._sharded_transfer(
+        shards=3, remote_name="myproject", src=str(source), dst="myproject:/backup"
+    )
+
+    assert result.ok and result.bytes == 300
+    assert sorted(call["shard_label"] for call in calls) == [
+        "shard-1-of-3",
+        "shard-2-of-3",
+        "shard-3-of-3",
+    ]
+    assert all(call["local_scan"] is calls[0]["local_scan"] for call in calls)
+    assert len(status) == 1 and status[0]["success"] is True
+
+
+def test_parse_slice_and_stable_partition():
+    assert sharding.parse_slice("3/16") == (3, 16)
+    for value in ("0/4", "5/4", "1", "a/b"):
+        try:
+            sharding.parse_slice(value)
+        except ValueError:
+            continue
+        raise AssertionError(value)
+
+    owners = {path: sharding.slice_of(path, 4) for path in FILES}
+    assert all(1 <= owner <= 4 for owner in owners.values())
+    assert owners == {path: sharding.slice_of(f"/{path}", 4) for path in FILES}
+
+
+def test_sliced_push_covers_every_file_once_and_finalize_records_status(
+    monkeypatch, tmp_path: pathlib.Path
+):
+    source = tmp_path / "project"
+    for relative, size in FILES.items():
+        (source / relative).parent.mkdir(parents=True, exist_ok=True)
+        (source / relative).write_bytes(b"x" * size)
+    monkeypatch.chdir(tmp_path)
+    uploaded: list[str] = []
+    status: list[tuple] = []
+
+    def fake_process(command, tracker, timeout=None):
+        assert "--no-traverse" in command
+        path = pathlib.Path(command[command.index("--files-from") + 1])
+        uploaded.extend(path.read_text(encoding="utf-8").splitlines())
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+    monkeypatch.setattr(
+        "repokit_backup.registry.update_sync_status",
+        lambda name, **kwargs: status.append((name, kwargs)),
+    )
+
+    for index in (1, 2, 3):
+        assert rclone._scoped_transfer(
+            slice_spec=(index, 3),
+            remote_name="myproject",
+            src=str(source),
+            dst="myproject:/backup",
+        )
+
+    assert sorted(uploaded) == sorted(FILES)
+    assert status == []
+    assert sharding.finalize("myproject")
+    assert len(status) == 1 and status[0][1]["success"] is True
+    assert not sharding.finalize("myproject")
+
+    status.clear()
+    (source / "setup.cfg").write_text("changed")
+    for index in (1, 2):
+        rclone._scoped_transfer(
+            slice_spec=(index, 3), remote_name="myproject", src=str(source), dst="x:/b"
+        )
+    assert not sharding.finalize("myproject")
+    assert status[-1][1]["success"] is False
+
+    rclone._scoped_transfer(slice_spec=(3, 3), remote_name="myproject", src=str(source), dst="x:/b")
+    assert sharding.finalize("myproject")
+
+
+def test_first_sliced_sync_deletes_remote_files_missing_locally(
+    monkeypatch, tmp_path: pathlib.Path
+):
+    source = tmp_path / "project"
+    source.mkdir()
+    (source / "keep.txt").write_text("x")
+    monkeypatch.chdir(tmp_path)
+    deleted: list[str] = []
+
+    def fake_run(command, **_kwargs):
+        if command[1] == "delete":
+            listing = pathlib.Path(command[command.index("--files-from") + 1])
+            deleted.extend(listing.read_text(encoding="utf-8").splitlines())
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", lambda command, tracker, timeout=None: None)
+    monkeypatch.setattr(rclone.subprocess, "run", fake_run)
+    monkeypatch.setattr(rclone.journal, "list_files", lambda _path, _args: ["keep.txt", "gone.txt"])
+    monkeypatch.setattr("repokit_backup.registry.update_sync_status", lambda *_a, **_k: None)
+
+    assert rclone._scoped_transfer(
+        slice_spec=(1, 1), remote_name="myproject", src=str(source), dst="myproject:/backup"
+    )
+
+    # Without a manifest of the slice, the remote listing stands in for it.
+    assert deleted == ["gone.txt"]
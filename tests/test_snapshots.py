@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from repokit_backup import snapshots
+
+
+class _LocalRemote:
+    """rclone stand-in serving ``store:`` paths from a local directory."""
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self.calls: list[list[str]] = []
+
+    def resolve(self, path: str) -> pathlib.Path:
+        if path.startswith("store:"):
+            return self.root / path.partition(":")[2].lstrip("/")
+        return pathlib.Path(path)
+
+    def __call__(self, command: list[str]) -> bytes:
+        self.calls.append(command)
+        verb = command[1]
+        args = [arg for arg in command[2:] if arg not in {"-R", "--files-only", "--no-traverse"}]
+        if verb == "copy" and "--files-from" in args:
+            listing = pathlib.Path(args[args.index("--files-from") + 1])
+            src, dst = self.resolve(args[-2]), self.resolve(args[-1])
+            for relative in listing.read_text().split():
+                (dst / relative).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(src / relative, dst / relative)
+        elif verb == "copy":
+            shutil.copytree(self.resolve(args[0]), self.resolve(args[1]), dirs_exist_ok=True)
+        elif verb == "copyto":
+            target = self.resolve(args[1])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.resolve(args[0]), target)
+        elif verb == "cat":
+            path = self.resolve(args[-1])
+            if not path.exists():
+                raise subprocess.CalledProcessError(3, command)
+            return path.read_bytes()
+        elif verb == "lsf":
+            root = self.resolve(args[-1])
+            if not root.exists():
+                raise subprocess.CalledProcessError(3, command)
+            names = sorted(p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file())
+            return "".join(f"{name}\n" for name in names).encode()
+        return b""
+
+    def uploaded_chunks(self) -> list[pathlib.Path]:
+        return [
+            p
+            for p in (self.root / "backup" / ".repokit-store" / "chunks").rglob("*")
+            if p.is_file()
+        ]
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "project"
+    raw = source / "data" / "raw"
+    raw.mkdir(parents=True)
+    for index in range(3):
+        (raw / f"f{index}.txt").write_text(f"sample {index}\n" * 200)
+    (raw / "copy.txt").write_text("sample 0\n" * 200)
+    (source / "notes.md").write_text("notes")
+    return source, _LocalRemote(tmp_path / "store")
+
+
+def _chunks(data: bytes) -> list[bytes]:
+    chunks = []
+    while data:
+        cut = snapshots.cut_point(data, min_size=64, avg_size=256, max_size=1024)
+        chunks.append(data[:cut])
+        data = data[cut:]
+    return chunks
+
+
+def test_chunk_boundaries_resynchronize_after_an_insertion():
+    data = random.Random(7).randbytes(64 * 1024)
+    original = _chunks(data)
+    shifted = _chunks(data[:1000] + b"inserted" + data[1000:])
+
+    assert b"".join(shifted) == data[:1000] + b"inserted" + data[1000:]
+    assert all(64 <= len(chunk) <= 1024 for chunk in original[:-1])
+    # Only the chunks around the insertion differ.
+    assert len(set(original) - set(shifted)) <= 2
+
+
+def test_renamed_and_duplicate_files_upload_no_new_chunks(project):
+    source, remote = project
+
+    first = snapshots.push_snapshot("store", str(source), "store:backup", runner=remote)
+    # copy.txt duplicates f0.txt and is stored once.
+    assert first.ok and first.files == 4
+    shutil.move(str(source / "data" / "raw"), str(source / "data" / "archive"))
+    second = snapshots.push_snapshot("store", str(source), "store:backup", runner=remote)
+
+    assert second.ok and second.files == 0 and second.bytes == 0
+    assert len(remote.uploaded_chunks()) == 4
+    store = snapshots.store_path("store:backup")
+    assert len(snapshots.list_snapshots(store, runner=remote)) == 2
+
+
+def test_modified_large_file_uploads_only_new_chunks(project):
+    source, remote = project
+    big = source / "data" / "big.bin"
+    data = bytearray(random.Random(3).randbytes(3 * 1024 * 1024))
+    big.write_bytes(bytes(data))
+    snapshots.push_snapshot("store", str(source), "store:backup", runner=remote)
+
+    data[2_000_000:2_000_016] = b"x" * 16
+    big.write_bytes(bytes(data))
+    result = snapshots.push_snapshot("store", str(source), "store:backup", runner=remote)
+
+    assert result.ok
+    assert 0 < result.bytes < len(data) // 2
+
+
+def test_pull_restores_the_latest_or_an_earlier_snapshot(project, tmp_path):
+    source, remote = project
+    snapshots.push_snapshot("store", str(source), "store:backup", runner=remote)
+    (source / "notes.md").write_text("changed notes")
+    os.remove(source / "data" / "raw" / "f1.txt")
+    snapshots.push_snapshot("store", str(source), "store:backup", runner=remote)
+    first_id = snapshots.list_snapshots(snapshots.store_path("store:backup"), runner=remote)[0]
+
+    latest = tmp_path / "latest"
+    assert snapshots.pull_snapshot("store", "store:backup", str(latest), runner=remote)
+    assert (latest / "notes.md").read_text() == "changed notes"
+    assert not (latest / "data" / "raw" / "f1.txt").exists()
+    assert (latest / "notes.md").stat().st_mtime_ns == (source / "notes.md").stat().st_mtime_ns
+
+    earlier = tmp_path / "earlier"
+    result = snapshots.pull_snapshot(
+        "store", "store:backup", str(earlier), snapshot_id=first_id, runner=remote
+    )
+    assert result.ok and result.files == 5
+    assert (earlier / "notes.md").read_text() == "notes"
+    assert (earlier / "data" / "raw" / "f1.txt").read_text() == "sample 1\n" * 200
+
+    again = snapshots.pull_snapshot(
+        "store", "store:backup", str(earlier), snapshot_id=first_id, runner=remote
+    )
+    assert again.ok and again.files == 0
+
+
+def test_pull_rejects_a_corrupt_chunk(project, tmp_path):
+    source, remote = project
+    snapshots.push_snapshot("store", str(source), "store:backup", runner=remote)
+    for chunk in remote.uploaded_chunks():
+        chunk.write_bytes(b"tampered")
+
+    result = snapshots.pull_snapshot("store", "store:backup", str(tmp_path / "out"), runner=remote)
+
+    assert not result.ok
+    assert not list((tmp_path / "out").rglob("*.txt"))
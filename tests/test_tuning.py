@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from repokit_backup import registry, tuning
+
+
+def test_transfer_args_apply_backend_defaults_and_overrides():
+    entries = {
+        "lumi": {"remote_type": "lumio", "tuning": {"transfers": 32}},
+        "erda": {"remote_type": "erda"},
+    }
+
+    args = tuning.transfer_args(tuning.endpoint_profiles(["lumi", "/local/path"], entries))
+    assert args[args.index("--transfers") + 1] == "32"
+    assert args[args.index("--s3-chunk-size") + 1] == "64M"
+    assert "--tpslimit" not in args
+
+    args = tuning.transfer_args(tuning.endpoint_profiles(["erda"], entries))
+    assert args[args.index("--sftp-chunk-size") + 1] == "255k"
+
+    dropbox = tuning.transfer_args([("dropbox", tuning.default_profile("dropbox"))])
+    assert dropbox[dropbox.index("--tpslimit") + 1] == "12"
+    assert dropbox[dropbox.index("--dropbox-chunk-size") + 1] == "64M"
+
+
+def test_remote_to_remote_takes_conservative_limits():
+    profiles = [
+        ("lumio", tuning.default_profile("lumio")),
+        ("dropbox", tuning.default_profile("dropbox")),
+    ]
+
+    merged = tuning.rc_config(profiles)
+    assert merged["Transfers"] == 4
+    assert merged["BufferSize"] == "64M"
+    assert merged["TPSLimit"] == 12
+
+
+def test_retries_override_is_a_cli_flag_only():
+    profiles = tuning.endpoint_profiles(["lumi"], {"lumi": {"tuning": {"retries": 3}}})
+
+    args = tuning.transfer_args(profiles)
+    assert args[args.index("--retries") + 1] == "3"
+    assert "Retries" not in tuning.rc_config(profiles)
+
+
+def test_rc_fs_uses_connection_string_for_chunk_size():
+    entries = {"dropbox-main": {"remote_type": "dropbox"}, "disk": {"remote_type": "local"}}
+
+    assert tuning.rc_fs("dropbox-main:backup", entries) == "dropbox-main,chunk_size=64M:backup"
+    assert tuning.rc_fs("disk:/srv", entries) == "disk:/srv"
+    assert tuning.rc_fs("/work/project", entries) == "/work/project"
+
+
+def test_validate_tuning_rejects_bad_values():
+    assert tuning.validate_tuning({"tpslimit": "0", "buffer_size": "16M"}) == {
+        "tpslimit": 0.0,
+        "buffer_size": "16M",
+    }
+    with pytest.raises(ValueError, match="Unknown tuning key"):
+        tuning.validate_tuning({"streams": 4})
+    with pytest.raises(ValueError, match="positive integer"):
+        tuning.validate_tuning({"transfers": 0})
+    with pytest.raises(ValueError, match="rclone size"):
+        tuning.validate_tuning({"chunk_size": "lots"})
+
+
+def test_configure_tuning_stores_only_overrides(tmp_path, capsys):
+    json_path = tmp_path / "rclone_remote.json"
+    json_path.write_text(json.dumps({"erda": {"remote_type": "erda", "status": "ok"}}))
+
+    assert tuning.configure_tuning(
+        "erda", {"transfers": 12, "checkers": 16}, json_path=str(json_path)
+    )
+    data = registry.load_all_registry(str(json_path))
+    assert data["erda"]["tuning"] == {"transfers": 12}
+    assert "transfers=12, checkers=16" in capsys.readouterr().out
+
+    assert tuning.configure_tuning("erda", reset=True, json_path=str(json_path))
+    assert registry.load_all_registry(str(json_path))["erda"]["tuning"] is None
+    assert not tuning.configure_tuning("missing", json_path=str(json_path))
+
+
+def test_bwlimit_timetables_are_validated_and_overridable():
+    assert tuning.validate_bwlimit("08:00,10M  18:00,off") == "08:00,10M 18:00,off"
+    assert tuning.validate_bwlimit("Mon-07:30,512k:2M Sat-00:00,off") == (
+        "Mon-07:30,512k:2M Sat-00:00,off"
+    )
+    assert tuning.validate_bwlimit("10M") == "10M"
+    for bad in ("fast", "25:00,10M", "08:00 10M", ""):
+        with pytest.raises(ValueError, match="bandwidth limit"):
+            tuning.validate_bwlimit(bad)
+
+    profiles = [("erda", {**tuning.default_profile("erda"), "bwlimit": "08:00,10M 18:00,off"})]
+    args = tuning.transfer_args(profiles)
+    assert args[args.index("--bwlimit") + 1] == "08:00,10M 18:00,off"
+    args = tuning.transfer_args(profiles, {"bwlimit": "off"})
+    assert args[args.index("--bwlimit") + 1] == "off"
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pathlib
+
+from repokit_backup import verify
+
+
+def test_hashers_match_rclone_formats(monkeypatch, tmp_path: pathlib.Path):
+    data = bytes(range(256)) * (verify.DROPBOX_BLOCK // 256) + b"tail"
+    hasher = verify.new_hasher("dropbox")
+    for offset in range(0, len(data), 1_000_003):
+        hasher.update(data[offset : offset + 1_000_003])
+    blocks = [data[: verify.DROPBOX_BLOCK], data[verify.DROPBOX_BLOCK :]]
+    expected = hashlib.sha256(b"".join(hashlib.sha256(block).digest() for block in blocks))
+    assert hasher.hexdigest() == expected.hexdigest()
+
+    path = tmp_path / "large.bin"
+    path.write_bytes(data)
+    monkeypatch.setattr(verify, "MMAP_THRESHOLD", 1024)
+    assert verify.hash_file(path, "md5") == hashlib.md5(data).hexdigest()
+    assert verify.hash_file(path, "dropbox") == expected.hexdigest()
+    (tmp_path / "empty").write_bytes(b"")
+    assert verify.hash_file(tmp_path / "empty", "crc32") == "00000000"
+
+
+def test_verify_compares_local_and_remote_hashes(monkeypatch, tmp_path: pathlib.Path):
+    local = tmp_path / "project"
+    local.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt", "e.txt"):
+        (local / name).write_text(name)
+    registry = tmp_path / "rclone_remote.json"
+    registry.write_text(
+        json.dumps({"s3": {"remote_path": "s3:bucket/project", "local_path": str(local)}})
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(verify, "_exclude_patterns", lambda _path: [])
+    commands: list[list[str]] = []
+
+    def md5(text: str) -> str:
+        return hashlib.md5(text.encode()).hexdigest()
+
+    def runner(command: list[str]) -> str:
+        commands.append(command)
+        if command[1] == "backend":
+            return json.dumps({"Name": "s3", "Hashes": ["sha1", "md5"]})
+        return json.dumps(
+            [
+                {"Path": "a.txt", "Size": 5, "Hashes": {"md5": md5("a.txt")}},
+                {"Path": "b.txt", "Size": 5, "Hashes": {"md5": md5("tampered")}},
+                {"Path": "d.txt", "Size": 5, "Hashes": {"md5": md5("d.txt")}},
+                {"Path": "e.txt", "Size": 5, "Hashes": {"md5": ""}},
+            ]
+        )
+
+    assert not verify.verify_remote("s3", jobs=2, runner=runner, json_path=str(registry))
+
+    assert commands[0][:4] == ["rclone", "backend", "features", "s3:"]
+    listing = commands[1]
+    assert listing[listing.index("--hash-type") + 1] == "md5" and "-R" in listing
+    report = json.loads((tmp_path / "bin" / "verify" / "s3.json").read_text())
+    assert report["hash_type"] == "md5" and report["matched"] == 1
+    assert report["mismatched"] == ["b.txt"] and report["missing"] == ["c.txt"]
+    assert report["extra"] == ["d.txt"] and report["unverifiable"] == ["e.txt"]
+    assert report["ok"] is False
+
+
+def test_verify_rejects_snapshot_remotes(tmp_path: pathlib.Path, capsys):
+    registry = tmp_path / "rclone_remote.json"
+    registry.write_text(
+        json.dumps(
+            {
+                "vault": {
+                    "remote_path": "vault:project",
+                    "local_path": str(tmp_path),
+                    "storage_layout": "snapshots",
+                }
+            }
+        )
+    )
+    commands: list[list[str]] = []
+
+    assert not verify.verify_remote("vault", runner=commands.append, json_path=str(registry))
+    assert commands == []
+    assert "stores deduplicated snapshots" in capsys.readouterr().out
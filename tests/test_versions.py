@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import pathlib
+from datetime import datetime, timedelta, timezone
+
+from repokit_backup import versions
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class _Remote:
+    def __init__(self, listing: list[dict]):
+        self.listing = listing
+        self.calls: list[list[str]] = []
+        self.deleted: list[str] = []
+
+    def __call__(self, command: list[str]) -> str:
+        self.calls.append(command)
+        if command[1] == "delete":
+            listing = pathlib.Path(command[command.index("--files-from") + 1])
+            self.deleted = listing.read_text().split()
+        if command[1] == "lsjson":
+            return json.dumps(self.listing)
+        return ""
+
+
+def _stamp(days_ago: float) -> str:
+    return versions.new_stamp(NOW - timedelta(days=days_ago))
+
+
+def _registry(tmp_path, meta: dict) -> str:
+    path = tmp_path / "bin" / "rclone_remote.json"
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"lumi": meta}))
+    return str(path)
+
+
+def test_backup_dir_sits_next_to_the_remote_path_and_mirrors_the_target():
+    assert versions.backup_dir("lumi:proj/data", "lumi:proj/data", "S") == (
+        "lumi:proj/data.versions/S"
+    )
+    assert versions.backup_dir("lumi:proj/data/", "lumi:proj/data/raw", "S") == (
+        "lumi:proj/data.versions/S/raw"
+    )
+    assert versions.backup_dir("lumi:", "lumi:", "S") is None
+    assert versions.backup_dir("lumi:/", "lumi:/data", "S") is None
+
+
+def test_retention_keeps_newest_bucket_per_day_and_per_week():
+    same_day_old, same_day_new = _stamp(1.4), _stamp(1.1)
+    recent = [_stamp(0), same_day_old, same_day_new, _stamp(13)]
+    weekly = [_stamp(days) for days in (20, 21, 22, 50)]
+    expired = [_stamp(80), _stamp(200)]
+    stamps = recent + weekly + expired + ["notes"]
+
+    prunable = versions.select_prunable(stamps, NOW, keep_daily=14, keep_weekly=8)
+
+    assert same_day_old in prunable and same_day_new not in prunable
+    assert set(expired) <= set(prunable)
+    assert not set(prunable) & {_stamp(0), _stamp(13), _stamp(50), "notes"}
+    # Of the buckets 20 to 22 days old, only the newest of each ISO week is kept.
+    kept_weekly = [stamp for stamp in weekly[:3] if stamp not in prunable]
+    weeks = {versions.parse_stamp(stamp).isocalendar()[:2] for stamp in weekly[:3]}
+    assert len(kept_weekly) == len(weeks)
+    assert prunable == sorted(prunable)
+
+
+def test_prune_lists_once_and_deletes_pruned_buckets_in_one_call(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    json_path = _registry(
+        tmp_path, {"remote_path": "lumi:proj/data", "local_path": str(tmp_path), "versioning": True}
+    )
+    old, kept = _stamp(100), _stamp(0)
+    remote = _Remote(
+        [
+            {"Path": f"{old}/a.csv", "Size": 10},
+            {"Path": f"{old}/raw/b.csv", "Size": 20},
+            {"Path": f"{kept}/a.csv", "Size": 30},
+        ]
+    )
+
+    assert versions.prune_versions("lumi", runner=remote, json_path=json_path, now=NOW)
+
+    assert [call[1] for call in remote.calls] == ["lsjson", "delete", "rmdirs"]
+    assert remote.calls[0][-1] == "lumi:proj/data.versions"
+    assert remote.deleted == [f"{old}/a.csv", f"{old}/raw/b.csv"]
+
+
+def test_prune_dry_run_deletes_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    json_path = _registry(tmp_path, {"remote_path": "lumi:proj/data", "versioning": True})
+    remote = _Remote([{"Path": f"{_stamp(100)}/a.csv", "Size": 10}])
+
+    assert versions.prune_versions(
+        "lumi", dry_run=True, runner=remote, json_path=json_path, now=NOW
+    )
+
+    assert [call[1] for call in remote.calls] == ["lsjson"]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import sys
+import time
+
+import pytest
+
+from repokit_backup import rclone, watchdog
+from repokit_backup.progress import StatsTracker
+from repokit_backup.watchdog import StallError, StallWatchdog
+
+
+def test_parse_rate():
+    assert watchdog.parse_rate("512") == 512
+    assert watchdog.parse_rate("10K") == 10 * 1024
+    assert watchdog.parse_rate("1.5MiB/s") == 1.5 * 1024**2
+    with pytest.raises(ValueError):
+        watchdog.parse_rate("fast")
+
+
+def test_watchdog_tells_slow_progress_from_a_stall(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(watchdog.time, "monotonic", lambda: clock[0])
+    dog = StallWatchdog(window=60, floor=1024)
+
+    def tick(seconds: float, **stats) -> None:
+        clock[0] += seconds
+        dog.observe(stats)
+
+    # Listing and checking move no bytes but are progress.
+    tick(30, listed=500)
+    tick(40, listed=900, checks=10)
+    assert not dog.stalled()
+    # 8 KiB/s is slow but above the floor.
+    for step in range(1, 11):
+        tick(10, listed=900, checks=10, bytes=step * 80 * 1024)
+    assert not dog.stalled()
+
+    # The window average stays above the floor until a whole window is idle.
+    transferring = [{"name": "data/big.h5", "size": 2 * 1024**3, "bytes": 800 * 1024}]
+    for _ in range(5):
+        tick(10, listed=900, checks=10, bytes=800 * 1024, transferring=transferring)
+    assert not dog.stalled()
+    tick(10, listed=900, checks=10, bytes=800 * 1024, transferring=transferring)
+    assert dog.stalled()
+    assert dog.error().in_flight == ["data/big.h5 (800.0 KiB of 2.0 GiB)"]
+
+
+def test_silent_rclone_is_killed_when_it_stalls():
+    tracker = StatsTracker(watchdog=StallWatchdog(window=0.3))
+    started = time.monotonic()
+
+    with pytest.raises(StallError):
+        rclone._run_rclone_process(
+            [sys.executable, "-c", "import time; time.sleep(60)"], tracker, timeout=30
+        )
+
+    assert time.monotonic() - started < 10
+
+
+def test_stalled_push_restarts_with_pending_files(monkeypatch, tmp_path: pathlib.Path, capsys):
+    source = tmp_path / "project"
+    source.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (source / name).write_text(name)
+    monkeypatch.chdir(tmp_path)
+    status: dict[str, object] = {}
+    monkeypatch.setattr(rclone, "update_sync_status", lambda *_a, **kwargs: status.update(kwargs))
+    monkeypatch.setattr(rclone.journal, "list_files", lambda *_args: ["a.txt", "b.txt", "c.txt"])
+    runs: list[tuple[str, list[str] | None]] = []
+    stalls = [1]
+
+    def fake_process(command, tracker, timeout=None):
+        listed = None
+        if "--files-from" in command:
+            path = pathlib.Path(command[command.index("--files-from") + 1])
+            listed = path.read_text(encoding="utf-8").splitlines()
+        runs.append((command[1], listed))
+        assert tracker.watchdog is not None and tracker.watchdog.window == 120
+        tracker.feed(json.dumps({"level": "info", "msg": "Copied (new)", "object": "a.txt"}))
+        if len(runs) <= stalls[0]:
+            stats = {"bytes": 1, "transferring": [{"name": "b.txt", "size": 5, "bytes": 1}]}
+            tracker.feed(json.dumps({"level": "notice", "stats": stats}))
+            raise tracker.watchdog.error()
+
+    monkeypatch.setattr(rclone, "_run_rclone_process", fake_process)
+
+    def push():
+        return rclone._rclone_transfer(
+            remote_name="myproject",
+            src=str(source),
+            dst="myproject:/backup",
+            operation="sync",
+            stall_timeout=120,
+        )
+
+    assert push()
+    assert runs == [("sync", None), ("copy", ["b.txt", "c.txt"])]
+    assert "stalled: no progress above 1.0 KiB/s for 2m0s; in flight: b.txt" in (
+        capsys.readouterr().out
+    )
+
+    runs.clear()
+    stalls[0] = 10
+    (source / "c.txt").write_text("changed")
+    result = push()
+
+    assert not result and len(runs) == rclone.STALL_RESTARTS + 1
+    assert result.stalled == ["b.txt (1 B of 5 B)"]
+    assert status["success"] is False and status["result"]["stalled"] == result.stalled